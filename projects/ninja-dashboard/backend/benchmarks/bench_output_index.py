@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Benchmark: startup-recovery output lookup, glob+sort vs output_index.
+
+Creates N dummy mp4s in a temp dir (one per job plus unrelated renders) and
+resolves the output of each job both ways.
+
+Usage:
+    python3 benchmarks/bench_output_index.py [--files 5000] [--jobs 500]
+"""
+import argparse
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from output_index import DirIndex  # noqa: E402
+
+
+def _find_output_glob(output_dir: Path, job_id: str) -> Optional[str]:
+    """The pre-index lookup from main._find_output_for_job."""
+    prefix = f"ninja_dash_{job_id[:8]}_"
+    mp4s = sorted(output_dir.glob("*.mp4"), key=lambda f: f.stat().st_mtime, reverse=True)
+    for mp4 in mp4s[:10]:
+        if mp4.stem.startswith(prefix):
+            return str(mp4)
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--jobs", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        job_ids = [str(uuid.uuid4()) for _ in range(args.jobs)]
+        for job_id in job_ids:
+            (output_dir / f"ninja_dash_{job_id[:8]}_20260101_120000.mp4").touch()
+        for i in range(args.files - args.jobs):
+            (output_dir / f"ninja_content_{i:05d}.mp4").touch()
+
+        start = time.perf_counter()
+        found_glob = sum(1 for j in job_ids if _find_output_glob(output_dir, j))
+        glob_sec = time.perf_counter() - start
+
+        index = DirIndex(output_dir)
+        start = time.perf_counter()
+        found_index = sum(
+            1 for j in job_ids
+            if index.newest_with_prefix(f"ninja_dash_{j[:8]}_", ".mp4")
+        )
+        index_sec = time.perf_counter() - start
+
+    print(f"{args.jobs} jobs x {args.files} files")
+    print(f"  glob + mtime sort: {glob_sec:8.3f}s  found {found_glob}/{args.jobs} (only scans newest 10)")
+    print(f"  output_index:      {index_sec:8.3f}s  found {found_index}/{args.jobs}  ({index.scans} dir scan)")
+    print(f"  speedup:           {glob_sec / index_sec:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
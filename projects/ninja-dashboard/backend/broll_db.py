@@ -229,6 +229,44 @@ def create_candidate(slot_id: str, source: str, source_url: Optional[str] = None
             return _row_to_dict(cur.fetchone(), CANDIDATE_COLS)
 
 
+def create_candidates_bulk(rows: list[dict]) -> list[dict]:
+    """Insert many candidates in one transaction; returns them in input order.
+
+    Each row needs slot_id and source; source_url, title, preview_url and
+    duration_sec are optional (same fields as create_candidate).
+
+    now() is fixed for the whole transaction, so each row gets now() plus its
+    ordinal in microseconds: readers sort candidates by created_at and must
+    see them in the order they were inserted.
+    """
+    if not rows:
+        return []
+    values = [
+        (r["slot_id"], r["source"], r.get("source_url"), r.get("title"),
+         r.get("preview_url"), r.get("duration_sec"), ordinal)
+        for ordinal, r in enumerate(rows)
+    ]
+    conn = _conn()
+    conn.autocommit = False
+    try:
+        with conn:  # commit on success, roll back on error
+            with conn.cursor() as cur:
+                inserted = psycopg2.extras.execute_values(
+                    cur,
+                    f"""INSERT INTO broll_candidates
+                           (slot_id, source, source_url, title, preview_url, duration_sec, created_at)
+                       VALUES %s
+                       RETURNING {', '.join(CANDIDATE_COLS)}""",
+                    values,
+                    template="(%s::uuid, %s, %s, %s, %s, %s, now() + %s * interval '1 microsecond')",
+                    page_size=len(values),
+                    fetch=True,
+                )
+    finally:
+        conn.close()
+    return [_row_to_dict(row, CANDIDATE_COLS) for row in inserted]
+
+
 def get_candidates_for_slot(slot_id: str) -> list[dict]:
     with _conn() as conn:
         with conn.cursor() as cur:
@@ -270,12 +308,48 @@ def get_candidate(candidate_id: str) -> Optional[dict]:
 # ---------------------------------------------------------------------------
 
 def get_full_session(job_id: str) -> Optional[dict]:
-    """Return session dict with nested slots, each slot with nested candidates."""
-    session = get_session_by_job(job_id)
-    if not session:
+    """Return session dict with nested slots, each slot with nested candidates.
+
+    One round-trip: the latest session for the job LEFT JOINed to its slots and
+    their candidates, folded back into the nested shape in Python.
+    """
+    n_sess, n_slot = len(SESSION_COLS), len(SLOT_COLS)
+    cols = (
+        [f"s.{c}" for c in SESSION_COLS]
+        + [f"sl.{c}" for c in SLOT_COLS]
+        + [f"c.{c}" for c in CANDIDATE_COLS]
+    )
+    with _conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""WITH s AS (
+                       SELECT * FROM broll_sessions WHERE job_id = %s
+                       ORDER BY created_at DESC LIMIT 1
+                   )
+                   SELECT {', '.join(cols)}
+                   FROM s
+                   LEFT JOIN broll_slots sl ON sl.session_id = s.id
+                   LEFT JOIN broll_candidates c ON c.slot_id = sl.id
+                   ORDER BY sl.slot_index, c.created_at""",
+                (job_id,),
+            )
+            rows = cur.fetchall()
+    if not rows:
         return None
-    slots = get_slots_for_session(session["id"])
-    for slot in slots:
-        slot["candidates"] = get_candidates_for_slot(slot["id"])
-    session["slots"] = slots
+
+    session = _row_to_dict(rows[0][:n_sess], SESSION_COLS)
+    slots: dict[str, dict] = {}
+    for row in rows:
+        slot_row = row[n_sess:n_sess + n_slot]
+        if slot_row[0] is None:
+            continue  # session without slots yet
+        slot_id = str(slot_row[0])
+        slot = slots.get(slot_id)
+        if slot is None:
+            slot = slots[slot_id] = _row_to_dict(slot_row, SLOT_COLS)
+            slot["candidates"] = []
+        cand_row = row[n_sess + n_slot:]
+        if cand_row[0] is not None:
+            slot["candidates"].append(_row_to_dict(cand_row, CANDIDATE_COLS))
+    session["slots"] = list(slots.values())
     return session
@@ -14,7 +14,7 @@ from pathlib import Path
 from typing import Optional
 
 from broll_db import (
-    create_candidate,
+    create_candidates_bulk,
     create_session,
     create_slot,
     get_candidate,
@@ -24,12 +24,37 @@ from broll_db import (
     update_session,
     update_slot,
 )
+from search_cache import SearchCache
 
 BROLL_DIR = Path(os.environ.get("BROLL_DIR", Path.home() / "output" / "broll"))
 BROLL_DIR.mkdir(parents=True, exist_ok=True)
 
 PEXELS_API_KEY = os.environ.get("PEXELS_API_KEY", "")
 
+# Results per source per slot
+PEXELS_RESULTS = 3
+YOUTUBE_RESULTS = 3
+
+# Search results are consulted here before any HTTP call / yt-dlp spawn
+SEARCH_CACHE = SearchCache()
+
+
+async def _search_cache_get(provider: str, keyword: str, limit: int) -> Optional[list[dict]]:
+    """SEARCH_CACHE lookup; a broken cache is logged and treated as a miss."""
+    try:
+        return await asyncio.to_thread(SEARCH_CACHE.get, provider, keyword, None, limit)
+    except Exception as e:
+        print(f"[broll-wingman] Search cache read failed for '{keyword}': {e}")
+        return None
+
+
+async def _search_cache_put(provider: str, keyword: str, limit: int, candidates: list[dict]) -> None:
+    """Store search results; a failed write only costs the next lookup a network call."""
+    try:
+        await asyncio.to_thread(SEARCH_CACHE.put, provider, keyword, None, limit, candidates)
+    except Exception as e:
+        print(f"[broll-wingman] Search cache write failed for '{keyword}': {e}")
+
 
 # ---------------------------------------------------------------------------
 # Keyword extraction
@@ -167,15 +192,19 @@ async def _extract_keywords(script_text: str, count: int) -> list[dict]:
 # Source search — Pexels
 # ---------------------------------------------------------------------------
 
-async def _search_pexels(keyword: str, slot_id: str) -> list[dict]:
-    """Search Pexels for stock video clips. Returns created candidate dicts."""
+async def _search_pexels(keyword: str) -> list[dict]:
+    """Search Pexels for stock video clips. Returns candidate field dicts (not yet stored)."""
     if not PEXELS_API_KEY:
         return []
 
+    cached = await _search_cache_get("pexels", keyword, PEXELS_RESULTS)
+    if cached is not None:
+        return cached
+
     import urllib.request
     import urllib.parse
 
-    url = f"https://api.pexels.com/videos/search?query={urllib.parse.quote(keyword)}&per_page=3&size=small"
+    url = f"https://api.pexels.com/videos/search?query={urllib.parse.quote(keyword)}&per_page={PEXELS_RESULTS}&size=small"
     req = urllib.request.Request(url, headers={"Authorization": PEXELS_API_KEY})
 
     try:
@@ -185,22 +214,20 @@ async def _search_pexels(keyword: str, slot_id: str) -> list[dict]:
 
         data = await asyncio.to_thread(_fetch)
         candidates = []
-        for video in data.get("videos", [])[:3]:
+        for video in data.get("videos", [])[:PEXELS_RESULTS]:
             # Get smallest video file for preview
             files = video.get("video_files", [])
             preview_file = min(files, key=lambda f: f.get("width", 9999)) if files else None
             best_file = max(files, key=lambda f: f.get("width", 0)) if files else None
 
-            cand = await asyncio.to_thread(
-                create_candidate,
-                slot_id=slot_id,
-                source="pexels",
-                source_url=best_file["link"] if best_file else None,
-                title=video.get("url", "").split("/")[-1].replace("-", " ").title() if video.get("url") else keyword,
-                preview_url=video.get("image", preview_file["link"] if preview_file else None),
-                duration_sec=video.get("duration"),
-            )
-            candidates.append(cand)
+            candidates.append({
+                "source": "pexels",
+                "source_url": best_file["link"] if best_file else None,
+                "title": video.get("url", "").split("/")[-1].replace("-", " ").title() if video.get("url") else keyword,
+                "preview_url": video.get("image", preview_file["link"] if preview_file else None),
+                "duration_sec": video.get("duration"),
+            })
+        await _search_cache_put("pexels", keyword, PEXELS_RESULTS, candidates)
         return candidates
     except Exception as e:
         print(f"[broll-wingman] Pexels search failed for '{keyword}': {e}")
@@ -211,8 +238,15 @@ async def _search_pexels(keyword: str, slot_id: str) -> list[dict]:
 # Source search — YouTube via yt-dlp
 # ---------------------------------------------------------------------------
 
-async def _search_youtube(keyword: str, slot_id: str) -> list[dict]:
-    """Search YouTube for gameplay/trailer clips via yt-dlp flat playlist."""
+async def _search_youtube(keyword: str) -> list[dict]:
+    """Search YouTube for gameplay/trailer clips via yt-dlp flat playlist.
+
+    Returns candidate field dicts (not yet stored).
+    """
+    cached = await _search_cache_get("youtube", keyword, YOUTUBE_RESULTS)
+    if cached is not None:
+        return cached
+
     # Use keyword as-is — Gemini already generates search-friendly terms.
     # Only append "trailer" if keyword is very short/generic.
     search_query = keyword if len(keyword.split()) >= 2 else f"{keyword} trailer"
@@ -254,20 +288,20 @@ async def _search_youtube(keyword: str, slot_id: str) -> list[dict]:
             if not thumbnail and video_id:
                 thumbnail = f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
 
-            cand = await asyncio.to_thread(
-                create_candidate,
-                slot_id=slot_id,
-                source="youtube",
-                source_url=f"https://www.youtube.com/watch?v={video_id}" if video_id else None,
-                title=title[:100],
-                preview_url=thumbnail,
-                duration_sec=duration,
-            )
-            candidates.append(cand)
+            candidates.append({
+                "source": "youtube",
+                "source_url": f"https://www.youtube.com/watch?v={video_id}" if video_id else None,
+                "title": title[:100],
+                "preview_url": thumbnail,
+                "duration_sec": duration,
+            })
 
-            if len(candidates) >= 3:
+            if len(candidates) >= YOUTUBE_RESULTS:
                 break
 
+        # Only cache searches yt-dlp actually completed
+        if proc.returncode == 0:
+            await _search_cache_put("youtube", keyword, YOUTUBE_RESULTS, candidates)
         return candidates
     except asyncio.TimeoutError:
         print(f"[broll-wingman] yt-dlp search timed out for '{keyword}'")
@@ -543,11 +577,15 @@ async def run_discovery(job_id: str, script_text: str, slot_count: int, ws_manag
             keyword = slot["keyword"]
 
             # Search both sources in parallel
-            pexels_task = asyncio.create_task(_search_pexels(keyword, slot_id))
-            youtube_task = asyncio.create_task(_search_youtube(keyword, slot_id))
+            pexels_task = asyncio.create_task(_search_pexels(keyword))
+            youtube_task = asyncio.create_task(_search_youtube(keyword))
             pexels_results, youtube_results = await asyncio.gather(pexels_task, youtube_task)
 
-            all_candidates = pexels_results + youtube_results
+            # Persist the slot's candidates in one transaction
+            all_candidates = await asyncio.to_thread(
+                create_candidates_bulk,
+                [{**c, "slot_id": slot_id} for c in pexels_results + youtube_results],
+            )
 
             if all_candidates:
                 await asyncio.to_thread(update_slot, slot_id, status="candidates_ready")
@@ -1,5 +1,5 @@
 """The Dojo — Content Pipeline Dashboard backend.
-FastAPI app: all routes + WebSocket manager.
+FastAPI app: all routes (WebSocket fan-out lives in ws.py).
 Run with: uvicorn main:app --host 0.0.0.0 --port 8090 --workers 1
 """
 import asyncio
@@ -17,8 +17,32 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
-from jobs import create_job, delete_job, get_job, init_db, list_jobs, transition, update_job
-from media import OUTPUT_DIR, get_thumbnail_for_video, safe_resolve, serve_thumb, serve_video
+from jobs import (
+    ACTIVE_STATUSES,
+    LIST_PAGE_SIZE,
+    RENDERED_STATUSES,
+    close_pool,
+    create_job,
+    delete_job,
+    get_job,
+    get_job_by_output_path,
+    init_db,
+    iter_jobs,
+    list_jobs,
+    page_cursor,
+    parse_page_cursor,
+    transition,
+    update_job,
+)
+from media import (
+    OUTPUT_DIR,
+    RenderedOutputCache,
+    get_thumbnail_for_video,
+    safe_resolve,
+    serve_thumb,
+    serve_video,
+)
+from output_index import dir_index
 from pipeline import BROLL_DIR, run_pipeline
 from scriptgen import generate_script
 
@@ -52,6 +76,7 @@ from broll_db import (
 )
 from broll_discovery import clip_youtube, download_clip, run_discovery
 from thumbnail_studio import router as thumbnail_studio_router, THUMBNAILS_DIR
+from ws import WSManager
 
 # Rasengan event emitter (fire-and-forget, never blocks)
 def _rasengan_emit(event_type: str, payload: dict | None = None) -> None:
@@ -75,6 +100,8 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # Keyset cursor of /api/jobs pages — unreadable cross-origin unless exposed
+    expose_headers=["X-Next-After-Created-At", "X-Next-After-Id"],
 )
 
 
@@ -82,28 +109,6 @@ app.add_middleware(
 # WebSocket connection manager
 # ---------------------------------------------------------------------------
 
-class WSManager:
-    def __init__(self) -> None:
-        self._connections: set[WebSocket] = set()
-
-    async def connect(self, ws: WebSocket) -> None:
-        await ws.accept()
-        self._connections.add(ws)
-
-    def disconnect(self, ws: WebSocket) -> None:
-        self._connections.discard(ws)
-
-    async def broadcast(self, event_type: str, data: object) -> None:
-        msg = json.dumps({"type": event_type, "data": data})
-        dead: set[WebSocket] = set()
-        for ws in self._connections:
-            try:
-                await ws.send_text(msg)
-            except Exception:
-                dead.add(ws)
-        self._connections -= dead
-
-
 ws_manager = WSManager()
 
 
@@ -144,22 +149,28 @@ async def startup() -> None:
         init_broll_db()
     except Exception as e:
         print(f"⚠️ B-roll Wingman DB init failed (feature degraded): {e}")
-    # Recover any jobs that were stuck when the server last died.
-    all_jobs = list_jobs()
+    # Recover any jobs that were stuck when the server last died — only the
+    # in-flight states are paged in, not the whole history.
+    in_flight = await asyncio.to_thread(
+        lambda: list(iter_jobs(status=("uploading", "generating")))
+    )
 
     # Uploads that were in progress — no way to resume, mark as error
-    for job in [j for j in all_jobs if j["status"] == "uploading"]:
+    for job in [j for j in in_flight if j["status"] == "uploading"]:
         await asyncio.to_thread(
             update_job, job["id"], status="error",
             error_msg="Server restarted during upload — retry upload",
         )
 
     # Generating jobs — check if output was produced before crash
-    stuck = [j for j in all_jobs if j["status"] == "generating"]
+    stuck = [j for j in in_flight if j["status"] == "generating"]
     for job in stuck:
-        output_path = await asyncio.to_thread(_find_output_for_job, job["id"])
+        # The pipeline records output_path as soon as the render lands; the
+        # directory index only covers renders that finished before that write.
+        output_path = job.get("output_path")
+        if not output_path or not Path(output_path).exists():
+            output_path = await asyncio.to_thread(_find_output_for_job, job["id"])
         if output_path:
-            from media import get_thumbnail_for_video
             thumb = get_thumbnail_for_video(Path(output_path))
             await asyncio.to_thread(
                 transition, job["id"], "ready_for_review",
@@ -173,15 +184,24 @@ async def startup() -> None:
             )
 
 
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    close_pool()
+
+
 def _find_output_for_job(job_id: str) -> Optional[str]:
-    """Scan output dir for a completed mp4 matching this job's prefix."""
+    """Look up the newest completed mp4 matching this job's prefix in the output dir index."""
     from pipeline import OUTPUT_DIR
-    prefix = f"ninja_dash_{job_id[:8]}_"
-    mp4s = sorted(OUTPUT_DIR.glob("*.mp4"), key=lambda f: f.stat().st_mtime, reverse=True)
-    for mp4 in mp4s[:10]:
-        if mp4.stem.startswith(prefix):
-            return str(mp4)
-    return None
+    mp4 = dir_index(OUTPUT_DIR).newest_with_prefix(f"ninja_dash_{job_id[:8]}_", ".mp4")
+    return str(mp4) if mp4 else None
+
+
+def _job_snapshot() -> list[dict]:
+    """Every active job plus the most recent page of history, newest first."""
+    by_id = {j["id"]: j for j in list_jobs(limit=LIST_PAGE_SIZE)}
+    for job in iter_jobs(status=ACTIVE_STATUSES):
+        by_id.setdefault(job["id"], job)
+    return sorted(by_id.values(), key=lambda j: (j["created_at"], j["id"]), reverse=True)
 
 
 # ---------------------------------------------------------------------------
@@ -193,7 +213,7 @@ async def websocket_endpoint(ws: WebSocket) -> None:
     await ws_manager.connect(ws)
     try:
         # Send full job list + active summons immediately on connect
-        jobs = await asyncio.to_thread(list_jobs)
+        jobs = await asyncio.to_thread(_job_snapshot)
         await ws.send_text(json.dumps({"type": "job_list", "data": jobs}))
         if _summons:
             await ws.send_text(json.dumps({
@@ -257,8 +277,34 @@ async def api_list_summons() -> list[dict]:
 
 
 @app.get("/api/jobs")
-async def api_list_jobs() -> list[dict]:
-    return await asyncio.to_thread(list_jobs)
+async def api_list_jobs(
+    status: Optional[str] = None,
+    after_created_at: Optional[str] = None,
+    after_id: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> JSONResponse:
+    """Without params: same snapshot as the WS job_list. With any of status
+    (comma-separated), after_created_at/after_id or limit: one keyset page, with
+    the cursor for the next page in X-Next-After-Created-At / X-Next-After-Id."""
+    if status is None and after_created_at is None and limit is None:
+        return JSONResponse(await asyncio.to_thread(_job_snapshot))
+
+    try:
+        after = parse_page_cursor(after_created_at, after_id)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    limit = max(1, min(limit or LIST_PAGE_SIZE, 500))
+    page = await asyncio.to_thread(
+        list_jobs,
+        status=status.split(",") if status else None,
+        after=after,
+        limit=limit,
+    )
+    headers = {}
+    cursor = page_cursor(page) if len(page) == limit else None
+    if cursor:
+        headers = {"X-Next-After-Created-At": cursor[0], "X-Next-After-Id": cursor[1]}
+    return JSONResponse(page, headers=headers)
 
 
 @app.post("/api/jobs/article")
@@ -362,9 +408,20 @@ async def api_download_video(filename: str):
     return await serve_video_download(filename)
 
 
+def _is_rendered_output(output_path: str) -> bool:
+    job = get_job_by_output_path(output_path)
+    return bool(job and job["status"] in RENDERED_STATUSES)
+
+
+_rendered_outputs = RenderedOutputCache(_is_rendered_output)
+
+
 @app.get("/api/video/{filename:path}")
 async def api_stream_video(filename: str, request: Request):
-    return await serve_video(filename, request)
+    # Outputs of jobs past the render step never change — let browsers keep them
+    video_path = safe_resolve(filename, OUTPUT_DIR)
+    immutable = bool(video_path) and await _rendered_outputs.is_rendered(video_path)
+    return await serve_video(filename, request, immutable=immutable)
 
 
 @app.get("/api/thumb/{filename:path}")
@@ -883,10 +940,23 @@ async def _run_pipeline_task(job_id: str, script_text: str) -> None:
         job_data = await asyncio.to_thread(get_job, job_id)
         is_dual = bool((job_data or {}).get("dual_anchor", False))
 
+        async def _record_output(path: str) -> None:
+            # Persist as soon as the render lands so a crash before the
+            # transition below can still be recovered without a directory scan
+            await asyncio.to_thread(update_job, job_id, output_path=path)
+
+        async def _record_progress(event: dict, timings: dict[str, float]) -> None:
+            if event.get("event") == "stage":
+                await ws_manager.broadcast("job_progress", {
+                    "id": job_id, "stage": event.get("stage"), "pct": event.get("pct"),
+                })
+            if timings:
+                await asyncio.to_thread(update_job, job_id, stage_timings=timings)
+
         if is_dual:
             # Dual-anchor pipeline — no B-roll, uses ninja_dual_anchor.py
             from pipeline import run_dual_anchor_pipeline
-            output_path, error_msg = await run_dual_anchor_pipeline(script_text, job_id)
+            output_path, error_msg = await run_dual_anchor_pipeline(script_text, job_id, on_output=_record_output)
         else:
             # Standard solo pipeline
             broll_count = int((job_data or {}).get("broll_count") or 4)
@@ -906,7 +976,11 @@ async def _run_pipeline_task(job_id: str, script_text: str) -> None:
             except Exception:
                 pass  # Wingman DB unavailable — fall back to directory scan
 
-            output_path, error_msg = await run_pipeline(script_text, job_id, broll_count, broll_duration, broll_map=broll_map or None)
+            output_path, error_msg = await run_pipeline(
+                script_text, job_id, broll_count, broll_duration,
+                broll_map=broll_map or None,
+                on_output=_record_output, on_progress=_record_progress,
+            )
         if output_path:
             video_path = Path(output_path)
             thumb = get_thumbnail_for_video(video_path)
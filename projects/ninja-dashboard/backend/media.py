@@ -1,15 +1,23 @@
 """Byte-range video/thumb serving + safe_resolve — ported from preview_server.py."""
 import asyncio
+import os
+import time
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
-from typing import AsyncGenerator, Optional, Tuple
+from typing import AsyncGenerator, Callable, Optional, Tuple
 
 from fastapi import HTTPException, Request
 from fastapi.responses import StreamingResponse, Response
 
-import os
+from output_index import dir_index
 
 OUTPUT_DIR = Path(os.environ.get("OUTPUT_DIR", Path.home() / "output"))
 CHUNK_SIZE = 64 * 1024  # 64 KB — good for iPhone Safari streaming
+# Finished renders are never rewritten (re-renders get a new timestamped name)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# "Not a finished render (yet)" answers are re-checked after this many seconds
+RENDERED_LOOKUP_NEGATIVE_TTL_SEC = 30.0
+RENDERED_LOOKUP_MAX_ENTRIES = 2048
 
 
 def safe_resolve(filename: str, base_dir: Path = OUTPUT_DIR) -> Optional[Path]:
@@ -29,19 +37,21 @@ def get_thumbnail_for_video(video_path: Path) -> Optional[Path]:
         return None
     stem = video_path.stem
     parent = video_path.parent
+    index = dir_index(parent)
+    siblings = {p.name for p in index.with_prefix(stem)}
     for pattern in [
         f"{stem}.thumb.png", f"{stem}.thumb.jpg",
         f"{stem}_thumb.png", f"{stem}_thumb.jpg",
         f"{stem}_thumb_v2.png", f"{stem}_thumb_v2.jpg",
     ]:
-        thumb = parent / pattern
-        if thumb.exists():
-            return thumb
+        if pattern in siblings:
+            return parent / pattern
     # Also check for thumbnails sharing the base name prefix (before timestamp)
     base = stem.rsplit("_", 2)[0] if "_" in stem else stem
     for ext in ("png", "jpg"):
-        for thumb in parent.glob(f"{base}*thumb*.{ext}"):
-            return thumb
+        for thumb in index.with_prefix(base, f".{ext}"):
+            if "thumb" in thumb.name[len(base):]:
+                return thumb
     return None
 
 
@@ -59,35 +69,122 @@ def _parse_range_header(range_header: str, file_size: int) -> Tuple[int, int]:
 
 
 async def _stream_file(path: Path, start: int, end: int) -> AsyncGenerator[bytes, None]:
-    """Async generator that streams a byte range from a file in 64 KB chunks."""
-    loop = asyncio.get_event_loop()
-
-    def _read_chunks() -> list[bytes]:
-        chunks = []
-        with open(path, "rb") as f:
-            f.seek(start)
-            remaining = end - start + 1
-            while remaining > 0:
-                chunk = f.read(min(CHUNK_SIZE, remaining))
-                if not chunk:
-                    break
-                chunks.append(chunk)
-                remaining -= len(chunk)
-        return chunks
-
-    chunks = await loop.run_in_executor(None, _read_chunks)
-    for chunk in chunks:
-        yield chunk
-
-
-async def serve_video(filename: str, request: Request) -> StreamingResponse:
-    """Serve a video file with HTTP 206 byte-range support (required for iPhone Safari)."""
+    """Async generator that streams a byte range from a file in 64 KB chunks.
+
+    Each chunk is read in its own executor hop and yielded straight away, so
+    memory stays at one chunk and the first byte goes out without waiting for
+    the whole range.
+    """
+    loop = asyncio.get_running_loop()
+    f = await loop.run_in_executor(None, open, path, "rb")
+    try:
+        await loop.run_in_executor(None, f.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await loop.run_in_executor(None, f.read, min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def _etag(st: os.stat_result) -> str:
+    """Strong validator from (inode, size, mtime) — changes if the file is replaced."""
+    return f'"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match comparison (weak, per RFC 9110 §13.1.2)."""
+    if header.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag
+        for tag in header.split(",")
+    )
+
+
+def _not_modified(request: Request, st: os.stat_result, etag: str) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(st.st_mtime) <= since
+    return False
+
+
+class RenderedOutputCache:
+    """Per-path memo of "is this file a finished render?" for serve_video(immutable=...).
+
+    A video player issues many range requests per file, so the (blocking, DB
+    backed) lookup runs at most once per path: a finished render never changes,
+    so a yes is kept for good and a no only for RENDERED_LOOKUP_NEGATIVE_TTL_SEC.
+    A failing lookup is logged and answers no — playback never depends on it.
+    """
+
+    def __init__(
+        self,
+        lookup: Callable[[str], bool],
+        negative_ttl: float = RENDERED_LOOKUP_NEGATIVE_TTL_SEC,
+        max_entries: int = RENDERED_LOOKUP_MAX_ENTRIES,
+    ) -> None:
+        self._lookup = lookup
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[bool, float]] = {}  # path -> (rendered, expires_at)
+
+    async def is_rendered(self, path: Path) -> bool:
+        key = str(path)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and entry[1] > now:
+            return entry[0]
+        try:
+            rendered = bool(await asyncio.to_thread(self._lookup, key))
+        except Exception as e:
+            print(f"[media] Render lookup failed for {path.name} ({e}), serving as no-cache")
+            return False
+        if len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))  # oldest first
+        self._entries[key] = (rendered, float("inf") if rendered else now + self.negative_ttl)
+        return rendered
+
+
+async def serve_video(filename: str, request: Request, immutable: bool = False) -> Response:
+    """Serve a video file with HTTP 206 byte-range support (required for iPhone Safari).
+
+    Responses carry a strong ETag + Last-Modified and conditional requests get a
+    304. Pass immutable=True for outputs of finished jobs so browsers keep them
+    without revalidating; everything else is `no-cache` (revalidate every time).
+    """
     video_path = safe_resolve(filename, OUTPUT_DIR)
     if not video_path or not video_path.exists() or not video_path.is_file():
         raise HTTPException(404, "Video not found")
 
-    file_size = video_path.stat().st_size
+    st = video_path.stat()
+    file_size = st.st_size
+    etag = _etag(st)
+    cache_headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else "no-cache",
+    }
+
+    if _not_modified(request, st, etag):
+        return Response(status_code=304, headers=cache_headers)
+
     range_header = request.headers.get("range")
+    # If-Range: only honour the range if the client's copy is still current
+    if_range = request.headers.get("if-range")
+    if range_header and if_range and if_range.strip() != etag:
+        range_header = None
 
     if range_header:
         start, end = _parse_range_header(range_header, file_size)
@@ -96,6 +193,7 @@ async def serve_video(filename: str, request: Request) -> StreamingResponse:
             "Accept-Ranges": "bytes",
             "Content-Length": str(end - start + 1),
             "Content-Type": "video/mp4",
+            **cache_headers,
         }
         return StreamingResponse(
             _stream_file(video_path, start, end),
@@ -107,7 +205,7 @@ async def serve_video(filename: str, request: Request) -> StreamingResponse:
             "Accept-Ranges": "bytes",
             "Content-Length": str(file_size),
             "Content-Type": "video/mp4",
-            "Cache-Control": "no-cache, no-store, must-revalidate",
+            **cache_headers,
         }
         return StreamingResponse(
             _stream_file(video_path, 0, file_size - 1),
@@ -0,0 +1,76 @@
+"""In-process filename index for output directories.
+
+Replaces per-call glob + stat-sort scans of OUTPUT_DIR. Each directory's entry
+names are kept sorted so a prefix lookup is a bisect; the listing is rebuilt
+only when the directory's mtime changes (entries added/removed/renamed) or the
+snapshot is older than REFRESH_SEC, as a guard for coarse-mtime filesystems.
+"""
+import bisect
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+REFRESH_SEC = float(os.environ.get("OUTPUT_INDEX_REFRESH_SEC", "30"))
+
+
+class DirIndex:
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self._names: list[str] = []
+        self._dir_mtime_ns: Optional[int] = None
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+        self.scans = 0  # exposed for tests/benchmarks
+
+    def _refresh(self) -> None:
+        try:
+            mtime_ns = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            self._names, self._dir_mtime_ns = [], None
+            return
+        if mtime_ns == self._dir_mtime_ns and time.monotonic() - self._scanned_at < REFRESH_SEC:
+            return
+        with os.scandir(self.directory) as it:
+            names = sorted(e.name for e in it if e.is_file(follow_symlinks=False))
+        self._names = names
+        self._dir_mtime_ns = mtime_ns
+        self._scanned_at = time.monotonic()
+        self.scans += 1
+
+    def with_prefix(self, prefix: str, suffix: str = "") -> list[Path]:
+        """Files whose name starts with prefix (and ends with suffix), in name order."""
+        with self._lock:
+            self._refresh()
+            names = self._names
+        lo = bisect.bisect_left(names, prefix)
+        hi = bisect.bisect_left(names, prefix + "\U0010ffff", lo)
+        return [self.directory / n for n in names[lo:hi] if n.endswith(suffix)]
+
+    def newest_with_prefix(self, prefix: str, suffix: str = "") -> Optional[Path]:
+        """Most recently modified file matching prefix/suffix, or None."""
+        newest: Optional[Path] = None
+        newest_mtime = -1.0
+        for path in self.with_prefix(prefix, suffix):
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue  # deleted since the last refresh
+            if mtime > newest_mtime:
+                newest, newest_mtime = path, mtime
+        return newest
+
+
+_indexes: dict[Path, DirIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def dir_index(directory: Path) -> DirIndex:
+    """Shared DirIndex for a directory (one per process)."""
+    key = Path(directory)
+    with _indexes_lock:
+        idx = _indexes.get(key)
+        if idx is None:
+            idx = _indexes[key] = DirIndex(key)
+        return idx
@@ -1,11 +1,16 @@
 """Pipeline runner for ninja_content.py — Celery dispatch or local subprocess."""
 import asyncio
+import json
 import os
 import re
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Awaitable, Callable, Optional, Tuple
+
+from output_index import dir_index
 
 LOG_DIR = Path("/tmp")
 
@@ -17,6 +22,22 @@ DUAL_ANCHOR_SCRIPT = Path(os.environ.get("DUAL_ANCHOR_SCRIPT", Path.home() / "sc
 # Matches: DONE! Output: /path/to/file.mp4
 _DONE_RE = re.compile(r"DONE!\s+Output:\s+(.+\.mp4)", re.IGNORECASE)
 
+# Called with the output path as soon as the subprocess reports it
+OutputCallback = Callable[[str], Awaitable[None]]
+# Called per progress event with (event, per-stage timings in seconds so far)
+ProgressCallback = Callable[[dict, dict[str, float]], Awaitable[None]]
+
+# Celery result polling — backoff between result-backend checks while a render runs
+CELERY_TIMEOUT_SEC = 1800
+CELERY_POLL_INITIAL_SEC = 0.5
+CELERY_POLL_MAX_SEC = 10.0
+# Result-backend reads run here, not on the default executor: however many
+# renders are in flight, polling costs at most this many threads
+CELERY_POLL_THREADS = 2
+_celery_poll_executor = ThreadPoolExecutor(
+    max_workers=CELERY_POLL_THREADS, thread_name_prefix="celery-poll",
+)
+
 # Celery client — initialized lazily when CELERY_BROKER_URL is set
 _celery_app = None
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL")
@@ -38,6 +59,8 @@ async def run_pipeline(
     broll_count: int = 4,
     broll_duration: float = 10.0,
     broll_map: Optional[list[str]] = None,
+    on_output: Optional[OutputCallback] = None,
+    on_progress: Optional[ProgressCallback] = None,
 ) -> Tuple[Optional[str], Optional[str]]:
     """
     Run ninja_content.py via Celery worker (if configured) or local subprocess.
@@ -46,7 +69,10 @@ async def run_pipeline(
     celery = _get_celery()
     if celery:
         return await _run_via_celery(celery, script_text, job_id, broll_count, broll_duration)
-    return await _run_local(script_text, job_id, broll_count, broll_duration, broll_map=broll_map)
+    return await _run_local(
+        script_text, job_id, broll_count, broll_duration,
+        broll_map=broll_map, on_output=on_output, on_progress=on_progress,
+    )
 
 
 async def _run_via_celery(
@@ -63,7 +89,7 @@ async def _run_via_celery(
             args=[script_text, job_id, broll_count, broll_duration],
             queue="content",
         )
-        result = await asyncio.to_thread(task.get, timeout=1800)
+        result = await _await_celery_result(task)
         if isinstance(result, dict):
             if "error" in result:
                 return None, result["error"]
@@ -73,14 +99,105 @@ async def _run_via_celery(
         return None, f"Celery task failed: {exc}"
 
 
+async def _await_celery_result(task, timeout: float = CELERY_TIMEOUT_SEC) -> object:
+    """Wait for a Celery AsyncResult without parking a thread on task.get().
+
+    Polls task.ready() (a single result-backend read) with exponential backoff.
+    Reads run on the small _celery_poll_executor, so in-flight renders cost a
+    timer each, and a slow backend never stalls the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = CELERY_POLL_INITIAL_SEC
+    while not await loop.run_in_executor(_celery_poll_executor, task.ready):
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise TimeoutError(f"Celery task {task.id} not done after {timeout:.0f}s")
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 1.5, CELERY_POLL_MAX_SEC)
+    # Already finished — returns (or re-raises the task's exception) promptly
+    return await loop.run_in_executor(_celery_poll_executor, partial(task.get, timeout=1))
+
+
+class _ProgressTracker:
+    """Folds ninja_content.py progress events into per-stage timings + the output path."""
+
+    def __init__(
+        self,
+        on_output: Optional[OutputCallback] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> None:
+        self.on_output = on_output
+        self.on_progress = on_progress
+        self.output_path: Optional[str] = None
+        self.timings: dict[str, float] = {}
+        self._stage: Optional[str] = None
+        self._stage_started = 0.0
+
+    async def report_output(self, path: str) -> None:
+        if path == self.output_path:
+            return
+        self.output_path = path
+        if self.on_output:
+            await self._notify("on_output", self.on_output, path)
+
+    async def handle(self, event: dict) -> None:
+        kind = event.get("event")
+        t = float(event.get("t") or 0.0)
+        if kind in ("stage", "done", "error") and self._stage is not None:
+            self.timings[self._stage] = round(t - self._stage_started, 3)
+            self._stage = None
+        if kind == "stage" and event.get("stage"):
+            self._stage, self._stage_started = event["stage"], t
+        if kind == "done" and event.get("output_path"):
+            await self.report_output(event["output_path"])
+        if self.on_progress:
+            await self._notify("on_progress", self.on_progress, event, dict(self.timings))
+
+    @staticmethod
+    async def _notify(name: str, callback: Callable[..., Awaitable[None]], *args) -> None:
+        # A failing callback (e.g. a DB hiccup while saving timings) must not
+        # fail the render or stop the pipes from being drained.
+        try:
+            await callback(*args)
+        except Exception as e:
+            print(f"[pipeline] {name} callback failed: {e!r}")
+
+
+async def _read_progress(fd: int, handle: Callable[[dict], Awaitable[None]]) -> None:
+    """Read newline-delimited JSON events from a pipe fd until EOF (takes ownership of fd)."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    transport, _ = await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(fd, "rb", 0),
+    )
+    try:
+        async for line in reader:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(event, dict):
+                await handle(event)
+    finally:
+        transport.close()
+
+
 async def _run_local(
     script_text: str,
     job_id: str,
     broll_count: int,
     broll_duration: float,
     broll_map: Optional[list[str]] = None,
+    on_output: Optional[OutputCallback] = None,
+    on_progress: Optional[ProgressCallback] = None,
 ) -> Tuple[Optional[str], Optional[str]]:
-    """Fallback: run ninja_content.py as local async subprocess."""
+    """Fallback: run ninja_content.py as local async subprocess.
+
+    Progress comes back as NDJSON on a dedicated pipe (--progress-fd), which
+    gives the exact output path and stage timings; the stdout DONE line is
+    still honoured in case the "done" event never arrives.
+    """
     if not CONTENT_SCRIPT.exists():
         return None, f"Pipeline script not found: {CONTENT_SCRIPT}"
 
@@ -117,41 +234,57 @@ async def _run_local(
     elif BROLL_DIR.exists() and any(BROLL_DIR.glob("*.mp4")):
         cmd += ["--broll", "--broll-dir", str(BROLL_DIR)]
 
+    progress_r, progress_w = os.pipe()
+    cmd += ["--progress-fd", str(progress_w)]
+    progress = _ProgressTracker(on_output, on_progress)
+
     try:
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.STDOUT,
-        )
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                pass_fds=(progress_w,),
+            )
+        except BaseException:
+            os.close(progress_r)
+            raise
+        finally:
+            os.close(progress_w)  # child holds its own copy; EOF arrives when it exits
+        progress_task = asyncio.create_task(_read_progress(progress_r, progress.handle))
 
-        output_path: Optional[str] = None
         stdout_lines: list[str] = []
 
         log_path = LOG_DIR / f"ninja_job_{job_id[:8]}.log"
-        log_fh = open(log_path, "w", buffering=1)
-        log_fh.write(f"=== Dojo Pipeline Log — job {job_id} ===\n")
-        log_fh.write(f"=== CMD: {' '.join(cmd)} ===\n\n")
-
-        assert proc.stdout is not None
-        async for line_bytes in proc.stdout:
-            line = line_bytes.decode("utf-8", errors="replace").rstrip()
-            stdout_lines.append(line)
-            log_fh.write(line + "\n")
-            match = _DONE_RE.search(line)
-            if match:
-                output_path = match.group(1).strip()
-
-        log_fh.write(f"\n=== Process exited with code {proc.returncode} ===\n")
-        log_fh.close()
-
-        await proc.wait()
+        with open(log_path, "w", buffering=1) as log_fh:
+            log_fh.write(f"=== Dojo Pipeline Log — job {job_id} ===\n")
+            log_fh.write(f"=== CMD: {' '.join(cmd)} ===\n\n")
+
+            try:
+                assert proc.stdout is not None
+                async for line_bytes in proc.stdout:
+                    line = line_bytes.decode("utf-8", errors="replace").rstrip()
+                    stdout_lines.append(line)
+                    log_fh.write(line + "\n")
+                    match = _DONE_RE.search(line)
+                    if match:
+                        await progress.report_output(match.group(1).strip())
+
+                await proc.wait()
+                await progress_task
+            finally:
+                if not progress_task.done():
+                    progress_task.cancel()
+
+            log_fh.write(f"\n=== Process exited with code {proc.returncode} ===\n")
+            if progress.timings:
+                log_fh.write(f"=== Stage timings: {json.dumps(progress.timings)} ===\n")
 
         if proc.returncode != 0:
             snippet = "\n".join(stdout_lines[-15:])
             return None, f"Pipeline exited {proc.returncode}:\n{snippet[-800:]}"
 
-        if not output_path:
-            output_path = _find_newest_mp4(output_prefix)
+        output_path = progress.output_path or _find_newest_mp4(output_prefix)
 
         if output_path and Path(output_path).exists():
             return output_path, None
@@ -169,6 +302,7 @@ async def run_dual_anchor_pipeline(
     script_text: str,
     job_id: str,
     kling_model: str = "pro",
+    on_output: Optional[OutputCallback] = None,
 ) -> Tuple[Optional[str], Optional[str]]:
     """Run ninja_dual_anchor.py as local async subprocess."""
     if not DUAL_ANCHOR_SCRIPT.exists():
@@ -192,6 +326,11 @@ async def run_dual_anchor_pipeline(
         "--kling-model", kling_model,
     ]
 
+    # Same guarded output callback as the solo path: a failed DB write is logged,
+    # never mistaken for a failed render
+    progress = _ProgressTracker(on_output)
+    proc = None
+
     try:
         proc = await asyncio.create_subprocess_exec(
             *cmd,
@@ -199,34 +338,30 @@ async def run_dual_anchor_pipeline(
             stderr=asyncio.subprocess.STDOUT,
         )
 
-        output_path: Optional[str] = None
         stdout_lines: list[str] = []
 
         log_path = LOG_DIR / f"ninja_dual_{job_id[:8]}.log"
-        log_fh = open(log_path, "w", buffering=1)
-        log_fh.write(f"=== Dual Anchor Pipeline Log — job {job_id} ===\n")
-        log_fh.write(f"=== CMD: {' '.join(cmd)} ===\n\n")
-
-        assert proc.stdout is not None
-        async for line_bytes in proc.stdout:
-            line = line_bytes.decode("utf-8", errors="replace").rstrip()
-            stdout_lines.append(line)
-            log_fh.write(line + "\n")
-            match = _DONE_RE.search(line)
-            if match:
-                output_path = match.group(1).strip()
-
-        log_fh.write(f"\n=== Process exited with code {proc.returncode} ===\n")
-        log_fh.close()
-
-        await proc.wait()
+        with open(log_path, "w", buffering=1) as log_fh:
+            log_fh.write(f"=== Dual Anchor Pipeline Log — job {job_id} ===\n")
+            log_fh.write(f"=== CMD: {' '.join(cmd)} ===\n\n")
+
+            assert proc.stdout is not None
+            async for line_bytes in proc.stdout:
+                line = line_bytes.decode("utf-8", errors="replace").rstrip()
+                stdout_lines.append(line)
+                log_fh.write(line + "\n")
+                match = _DONE_RE.search(line)
+                if match:
+                    await progress.report_output(match.group(1).strip())
+
+            await proc.wait()
+            log_fh.write(f"\n=== Process exited with code {proc.returncode} ===\n")
 
         if proc.returncode != 0:
             snippet = "\n".join(stdout_lines[-15:])
             return None, f"Dual-anchor pipeline exited {proc.returncode}:\n{snippet[-800:]}"
 
-        if not output_path:
-            output_path = _find_newest_mp4(output_prefix)
+        output_path = progress.output_path or _find_newest_mp4(output_prefix)
 
         if output_path and Path(output_path).exists():
             return output_path, None
@@ -234,6 +369,13 @@ async def run_dual_anchor_pipeline(
         return None, "Dual-anchor pipeline completed but output file not found"
 
     finally:
+        if proc is not None and proc.returncode is None:
+            # Bailed out mid-run (cancelled, log write failed): don't orphan the render
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            await proc.wait()
         try:
             os.unlink(script_file)
         except OSError:
@@ -241,16 +383,12 @@ async def run_dual_anchor_pipeline(
 
 
 def _find_newest_mp4(hint_prefix: str) -> Optional[str]:
-    """Fallback: scan output dir for newest .mp4 matching the job prefix."""
-    mp4s = sorted(OUTPUT_DIR.glob("*.mp4"), key=lambda f: f.stat().st_mtime, reverse=True)
-    if not mp4s:
+    """Fallback: newest .mp4 in the output dir index matching the job prefix."""
+    mp4 = dir_index(OUTPUT_DIR).newest_with_prefix(hint_prefix.replace(".mp4", ""), ".mp4")
+    if not mp4:
         return None
     # Only consider files created in the last 30 minutes (prevent stale fallback)
     import time
-    cutoff = time.time() - 1800
-    for mp4 in mp4s[:5]:
-        if mp4.stat().st_mtime < cutoff:
-            continue
-        if mp4.stem.startswith(hint_prefix.replace(".mp4", "")):
-            return str(mp4)
-    return None
+    if mp4.stat().st_mtime < time.time() - 1800:
+        return None
+    return str(mp4)
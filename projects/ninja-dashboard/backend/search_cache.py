@@ -0,0 +1,114 @@
+"""B-roll Wingman — on-disk TTL cache for source search results (Pexels, yt-dlp).
+
+SQLite file keyed by a hash of (provider, normalized keyword, orientation,
+limit), so re-running discovery on the same script skips every HTTP call and
+yt-dlp spawn. Entries expire after BROLL_SEARCH_CACHE_TTL_SEC; once the table
+exceeds BROLL_SEARCH_CACHE_MAX_ENTRIES the least recently used rows are dropped.
+
+All methods are synchronous — call via asyncio.to_thread() from async code.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+CACHE_PATH = Path(os.environ.get(
+    "BROLL_SEARCH_CACHE", Path.home() / ".cache" / "dojo" / "broll_search.sqlite",
+))
+TTL_SEC = float(os.environ.get("BROLL_SEARCH_CACHE_TTL_SEC", str(7 * 24 * 3600)))
+MAX_ENTRIES = int(os.environ.get("BROLL_SEARCH_CACHE_MAX_ENTRIES", "5000"))
+
+
+def normalize_keyword(keyword: str) -> str:
+    return re.sub(r"\s+", " ", keyword).strip().lower()
+
+
+def cache_key(provider: str, keyword: str, orientation: Optional[str], limit: int) -> str:
+    raw = json.dumps([provider, normalize_keyword(keyword), orientation or "", limit])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class SearchCache:
+    def __init__(
+        self,
+        path: Path = CACHE_PATH,
+        ttl_sec: float = TTL_SEC,
+        max_entries: int = MAX_ENTRIES,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_results (
+                    key        TEXT PRIMARY KEY,
+                    provider   TEXT NOT NULL,
+                    keyword    TEXT NOT NULL,
+                    results    TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_hit   REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_search_results_last_hit ON search_results(last_hit)"
+            )
+            self._ready = True
+        return conn
+
+    def get(
+        self, provider: str, keyword: str, orientation: Optional[str], limit: int,
+    ) -> Optional[list[dict]]:
+        """Cached results, or None on a miss / expired entry."""
+        key = cache_key(provider, keyword, orientation, limit)
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute(
+                    "SELECT results, created_at FROM search_results WHERE key = ?", (key,),
+                ).fetchone()
+                if not row:
+                    return None
+                if now - row[1] > self.ttl_sec:
+                    conn.execute("DELETE FROM search_results WHERE key = ?", (key,))
+                    return None
+                conn.execute("UPDATE search_results SET last_hit = ? WHERE key = ?", (now, key))
+                return json.loads(row[0])
+        finally:
+            conn.close()
+
+    def put(
+        self, provider: str, keyword: str, orientation: Optional[str], limit: int,
+        results: list[dict],
+    ) -> None:
+        key = cache_key(provider, keyword, orientation, limit)
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    """INSERT OR REPLACE INTO search_results
+                       (key, provider, keyword, results, created_at, last_hit)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    (key, provider, normalize_keyword(keyword), json.dumps(results), now, now),
+                )
+                conn.execute(
+                    """DELETE FROM search_results WHERE key IN (
+                           SELECT key FROM search_results ORDER BY last_hit DESC
+                           LIMIT -1 OFFSET ?
+                       )""",
+                    (self.max_entries,),
+                )
+        finally:
+            conn.close()
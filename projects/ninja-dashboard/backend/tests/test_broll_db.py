@@ -0,0 +1,112 @@
+"""broll_db against a real PostgreSQL (see conftest.py)."""
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+import psycopg2.extensions  # noqa: E402
+
+
+@pytest.fixture
+def query_counter(broll_db, monkeypatch):
+    """Count execute() calls made through broll_db._conn()."""
+    calls: list[str] = []
+
+    class CountingCursor(psycopg2.extensions.cursor):
+        def execute(self, query, vars=None):
+            calls.append(query)
+            return super().execute(query, vars)
+
+    def counting_conn():
+        conn = psycopg2.connect(broll_db.DATABASE_URL, cursor_factory=CountingCursor)
+        conn.autocommit = True
+        return conn
+
+    monkeypatch.setattr(broll_db, "_conn", counting_conn)
+    return calls
+
+
+def _seed(broll_db, slot_count: int, cands_per_slot: int) -> dict:
+    session = broll_db.create_session("job-1", "script", slot_count)
+    for i in range(slot_count):
+        slot = broll_db.create_slot(session["id"], i, f"kw {i}", f"sentence {i}", i / 10)
+        for j in range(cands_per_slot):
+            broll_db.create_candidate(slot["id"], "youtube", f"https://yt/{i}/{j}", f"t{i}{j}")
+    return session
+
+
+@pytest.mark.parametrize("slot_count", [1, 5, 20])
+def test_get_full_session_query_count_is_constant(broll_db, query_counter, slot_count):
+    _seed(broll_db, slot_count, 3)
+    query_counter.clear()
+
+    session = broll_db.get_full_session("job-1")
+
+    assert len(query_counter) <= 2
+    assert len(session["slots"]) == slot_count
+    assert [s["slot_index"] for s in session["slots"]] == list(range(slot_count))
+    assert all(len(s["candidates"]) == 3 for s in session["slots"])
+
+
+def test_get_full_session_shape_matches_per_table_getters(broll_db):
+    seeded = _seed(broll_db, 3, 2)
+    # A slot with no candidates must still appear, with an empty list
+    broll_db.create_slot(seeded["id"], 3, "empty", None, 0.9)
+
+    full = broll_db.get_full_session("job-1")
+
+    expected = broll_db.get_session_by_job("job-1")
+    expected["slots"] = broll_db.get_slots_for_session(expected["id"])
+    for slot in expected["slots"]:
+        slot["candidates"] = broll_db.get_candidates_for_slot(slot["id"])
+    assert full == expected
+    assert full["slots"][-1]["candidates"] == []
+
+
+def test_get_full_session_missing_and_empty(broll_db):
+    assert broll_db.get_full_session("nope") is None
+    broll_db.create_session("job-2", "script", 0)
+    assert broll_db.get_full_session("job-2")["slots"] == []
+
+
+def test_create_candidates_bulk_returns_rows_in_order(broll_db, query_counter):
+    session = broll_db.create_session("job-3", "script", 2)
+    slots = [broll_db.create_slot(session["id"], i, f"kw {i}") for i in range(2)]
+    rows = [
+        {"slot_id": slots[i % 2]["id"], "source": "pexels", "source_url": f"https://p/{i}",
+         "title": f"clip {i}", "duration_sec": float(i)}
+        for i in range(25)
+    ]
+    query_counter.clear()
+
+    created = broll_db.create_candidates_bulk(rows)
+
+    assert len(query_counter) == 1
+    assert [c["title"] for c in created] == [f"clip {i}" for i in range(25)]
+    assert all(c["download_status"] == "pending" and c["preview_url"] is None for c in created)
+    assert len(broll_db.get_candidates_for_slot(slots[0]["id"])) == 13
+    assert broll_db.create_candidates_bulk([]) == []
+
+
+def test_create_candidates_bulk_is_all_or_nothing(broll_db):
+    session = broll_db.create_session("job-4", "script", 1)
+    slot = broll_db.create_slot(session["id"], 0, "kw")
+    rows = [
+        {"slot_id": slot["id"], "source": "youtube"},
+        {"slot_id": slot["id"], "source": None},  # violates NOT NULL
+    ]
+    with pytest.raises(psycopg2.IntegrityError):
+        broll_db.create_candidates_bulk(rows)
+    assert broll_db.get_candidates_for_slot(slot["id"]) == []
+
+
+def test_create_candidates_bulk_reads_back_in_insert_order(broll_db):
+    session = broll_db.create_session("job-5", "script", 1)
+    slot = broll_db.create_slot(session["id"], 0, "kw")
+    # Titles deliberately not in sorted order, so only insert order can explain the result
+    titles = ["zeta", "alpha", "mid", "beta", "omega"]
+    created = broll_db.create_candidates_bulk(
+        [{"slot_id": slot["id"], "source": "pexels", "title": t} for t in titles])
+
+    assert len({c["created_at"] for c in created}) == len(titles)
+    assert [c["title"] for c in broll_db.get_candidates_for_slot(slot["id"])] == titles
+    full = broll_db.get_full_session("job-5")
+    assert [c["title"] for c in full["slots"][0]["candidates"]] == titles
@@ -0,0 +1,67 @@
+"""jobs.py state machine against a real PostgreSQL (see conftest.py)."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+def test_transition_follows_state_machine(jobs_db):
+    job = jobs_db.create_job(article_text="hello")
+
+    moved = jobs_db.transition(job["id"], "script_ready", script_text="script")
+    assert moved["status"] == "script_ready"
+    assert moved["script_text"] == "script"
+
+    with pytest.raises(ValueError, match="script_ready"):
+        jobs_db.transition(job["id"], "uploaded")
+    assert jobs_db.get_job(job["id"])["status"] == "script_ready"
+
+
+def test_transition_missing_job_returns_none(jobs_db):
+    assert jobs_db.transition("no-such-job", "generating") is None
+
+
+def test_concurrent_transitions_exactly_one_wins(jobs_db):
+    job = jobs_db.create_job(article_text="race")
+    start = threading.Barrier(50)
+
+    def attempt(_: int) -> bool:
+        start.wait()
+        try:
+            return jobs_db.transition(job["id"], "generating") is not None
+        except ValueError:
+            return False
+
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        results = list(pool.map(attempt, range(50)))
+
+    assert results.count(True) == 1
+    assert jobs_db.get_job(job["id"])["status"] == "generating"
+
+
+def test_unfiltered_listing_pages_off_an_index(jobs_db):
+    for i in range(3):
+        jobs_db.create_job(article_text=f"job {i}")
+    with jobs_db._conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SET enable_seqscan = off")
+            cur.execute(
+                "EXPLAIN SELECT id FROM jobs WHERE (created_at, id) < (now(), 'z')"
+                " ORDER BY created_at DESC, id DESC LIMIT 2"
+            )
+            plan = "\n".join(row[0] for row in cur.fetchall())
+    assert "idx_jobs_created_id" in plan
+    assert "Sort" not in plan
+
+
+def test_parse_page_cursor_rejects_malformed_input():
+    jobs = pytest.importorskip("jobs")
+
+    assert jobs.parse_page_cursor(None, None) is None
+    assert jobs.parse_page_cursor("2026-10-16T12:00:00.123+00:00", "abc") == (
+        "2026-10-16T12:00:00.123000+00:00", "abc")
+    assert jobs.parse_page_cursor("2026-10-16T12:00:00", "abc")[0].endswith("+00:00")
+    for created_at, job_id in [("yesterday", "abc"), ("2026-10-16", None), (None, "abc"),
+                               ("'; DROP TABLE jobs; --", "abc")]:
+        with pytest.raises(ValueError):
+            jobs.parse_page_cursor(created_at, job_id)
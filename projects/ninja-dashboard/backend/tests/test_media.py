@@ -0,0 +1,164 @@
+"""media.py byte-range streaming."""
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+import media
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * _PAGE_SIZE
+
+
+@pytest.mark.skipif(not Path("/proc/self/statm").exists(), reason="needs /proc (Linux)")
+def test_stream_file_memory_is_constant(tmp_path):
+    size = 200 * 1024 * 1024
+    video = tmp_path / "big.mp4"
+    with open(video, "wb") as f:
+        f.truncate(size)  # sparse — no real disk usage
+
+    async def consume() -> tuple[int, int]:
+        baseline = _rss_bytes()
+        peak = baseline
+        total = 0
+        async for chunk in media._stream_file(video, 0, size - 1):
+            total += len(chunk)
+            peak = max(peak, _rss_bytes())
+        return total, peak - baseline
+
+    total, growth = asyncio.run(consume())
+    assert total == size
+    assert growth < 32 * 1024 * 1024
+
+
+def test_stream_file_honours_range(tmp_path):
+    data = os.urandom(3 * media.CHUNK_SIZE + 123)
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(data)
+
+    async def collect(start: int, end: int) -> bytes:
+        return b"".join([c async for c in media._stream_file(video, start, end)])
+
+    assert asyncio.run(collect(0, len(data) - 1)) == data
+    assert asyncio.run(collect(100, media.CHUNK_SIZE + 200)) == data[100:media.CHUNK_SIZE + 201]
+
+
+# ---------------------------------------------------------------------------
+# serve_video validators / conditional requests
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def video_client(tmp_path, monkeypatch):
+    from fastapi import FastAPI, Request
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(media, "OUTPUT_DIR", tmp_path)
+    (tmp_path / "render.mp4").write_bytes(bytes(range(256)) * 40)
+
+    app = FastAPI()
+
+    @app.get("/video/{filename:path}")
+    async def video(filename: str, request: Request, immutable: bool = False):
+        return await media.serve_video(filename, request, immutable=immutable)
+
+    return TestClient(app)
+
+
+def test_serve_video_200_has_validators(video_client):
+    r = video_client.get("/video/render.mp4")
+    assert r.status_code == 200
+    assert len(r.content) == 10240
+    assert r.headers["etag"].startswith('"') and r.headers["etag"].endswith('"')
+    assert r.headers["last-modified"].endswith("GMT")
+    assert r.headers["cache-control"] == "no-cache"
+
+
+def test_serve_video_immutable_for_finished_renders(video_client):
+    r = video_client.get("/video/render.mp4", params={"immutable": "true"})
+    assert r.status_code == 200
+    assert "immutable" in r.headers["cache-control"]
+    assert "max-age=" in r.headers["cache-control"]
+
+
+def test_serve_video_304_on_if_none_match(video_client):
+    etag = video_client.get("/video/render.mp4").headers["etag"]
+    r = video_client.get("/video/render.mp4", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+
+    r = video_client.get("/video/render.mp4", headers={"If-None-Match": '"stale"'})
+    assert r.status_code == 200
+
+
+def test_serve_video_304_on_if_modified_since(video_client):
+    last_modified = video_client.get("/video/render.mp4").headers["last-modified"]
+    r = video_client.get("/video/render.mp4", headers={"If-Modified-Since": last_modified})
+    assert r.status_code == 304
+
+    r = video_client.get(
+        "/video/render.mp4", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"},
+    )
+    assert r.status_code == 200
+
+
+def test_serve_video_206_range(video_client):
+    r = video_client.get("/video/render.mp4", headers={"Range": "bytes=256-511"})
+    assert r.status_code == 206
+    assert r.headers["content-range"] == "bytes 256-511/10240"
+    assert r.content == bytes(range(256))
+    assert "etag" in r.headers
+
+    # If-Range with a stale validator falls back to the full body
+    r = video_client.get(
+        "/video/render.mp4", headers={"Range": "bytes=0-9", "If-Range": '"stale"'},
+    )
+    assert r.status_code == 200
+    assert len(r.content) == 10240
+
+
+# ---------------------------------------------------------------------------
+# RenderedOutputCache — the immutable decision behind /api/video
+# ---------------------------------------------------------------------------
+
+def test_rendered_lookup_runs_once_per_finished_render(tmp_path):
+    calls = []
+
+    def lookup(path):
+        calls.append(path)
+        return path.endswith("done.mp4")
+
+    cache = media.RenderedOutputCache(lookup, negative_ttl=60)
+
+    async def range_requests():
+        done = [await cache.is_rendered(tmp_path / "done.mp4") for _ in range(20)]
+        pending = [await cache.is_rendered(tmp_path / "pending.mp4") for _ in range(20)]
+        return done, pending
+
+    done, pending = asyncio.run(range_requests())
+    assert all(done) and not any(pending)
+    assert calls == [str(tmp_path / "done.mp4"), str(tmp_path / "pending.mp4")]
+
+
+def test_rendered_lookup_rechecks_unfinished_after_ttl(tmp_path):
+    state = {"rendered": False}
+    cache = media.RenderedOutputCache(lambda p: state["rendered"], negative_ttl=0)
+
+    assert asyncio.run(cache.is_rendered(tmp_path / "r.mp4")) is False
+    state["rendered"] = True
+    assert asyncio.run(cache.is_rendered(tmp_path / "r.mp4")) is True
+
+
+def test_rendered_lookup_failure_serves_mutable(tmp_path):
+    def lookup(path):
+        raise RuntimeError("connection pool exhausted")
+
+    cache = media.RenderedOutputCache(lookup)
+    assert asyncio.run(cache.is_rendered(tmp_path / "r.mp4")) is False
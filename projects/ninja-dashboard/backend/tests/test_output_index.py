@@ -0,0 +1,37 @@
+"""output_index.DirIndex prefix lookups and refresh-on-change."""
+import os
+
+from output_index import DirIndex
+
+
+def test_newest_with_prefix_picks_latest_mtime(tmp_path):
+    old = tmp_path / "ninja_dash_abcd1234_20260101_000000.mp4"
+    new = tmp_path / "ninja_dash_abcd1234_20260102_000000.mp4"
+    for p in (old, new, tmp_path / "ninja_dash_ffff0000_x.mp4", tmp_path / "ninja_dash_abcd1234_x.log"):
+        p.touch()
+    os.utime(old, (2_000_000_000, 2_000_000_000))
+    os.utime(new, (1_000_000_000, 1_000_000_000))
+
+    index = DirIndex(tmp_path)
+    assert index.newest_with_prefix("ninja_dash_abcd1234_", ".mp4") == old
+    assert index.newest_with_prefix("ninja_dash_00000000_", ".mp4") is None
+    assert [p.name for p in index.with_prefix("ninja_dash_abcd1234_", ".log")] == [
+        "ninja_dash_abcd1234_x.log",
+    ]
+
+
+def test_index_rescans_only_when_directory_changes(tmp_path):
+    index = DirIndex(tmp_path)
+    assert index.with_prefix("clip") == []
+    for _ in range(5):
+        index.with_prefix("clip")
+    assert index.scans == 1
+
+    (tmp_path / "clip_1.mp4").touch()
+    os.utime(tmp_path, ns=(0, os.stat(tmp_path).st_mtime_ns + 1_000_000))
+    assert [p.name for p in index.with_prefix("clip")] == ["clip_1.mp4"]
+    assert index.scans == 2
+
+
+def test_missing_directory_is_empty(tmp_path):
+    assert DirIndex(tmp_path / "nope").with_prefix("x") == []
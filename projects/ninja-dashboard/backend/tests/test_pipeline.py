@@ -0,0 +1,221 @@
+"""pipeline.py Celery dispatch — waiting on results must not cost a thread per render."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+import pipeline
+
+
+class FakeAsyncResult:
+    """Stands in for celery.result.AsyncResult of a slow content.generate_video task."""
+
+    def __init__(self, task_id: str, duration: float, result: object) -> None:
+        self.id = task_id
+        self._done_at = time.monotonic() + duration
+        self._result = result
+
+    def ready(self) -> bool:
+        return time.monotonic() >= self._done_at
+
+    def get(self, timeout=None):
+        if not self.ready():
+            raise AssertionError("get() called before the task was ready")
+        if isinstance(self._result, Exception):
+            raise self._result
+        return self._result
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(pipeline, "CELERY_POLL_INITIAL_SEC", 0.02)
+    monkeypatch.setattr(pipeline, "CELERY_POLL_MAX_SEC", 0.1)
+
+
+@pytest.fixture(scope="module")
+def celery_app():
+    """A real Celery app on the in-memory broker, with an in-process worker."""
+    celery = pytest.importorskip("celery")
+    from celery.contrib.testing.worker import start_worker
+
+    app = celery.Celery("dojo-test", broker="memory://", backend="cache+memory://")
+    app.conf.broker_transport_options = {"polling_interval": 0.01}
+
+    @app.task(name="content.generate_video")
+    def generate_video(script_text, job_id, broll_count, broll_duration):
+        if script_text == "fail":
+            return {"error": "kling down"}
+        if script_text == "crash":
+            raise RuntimeError("worker lost")
+        time.sleep(0.01)
+        return {"output_path": f"/out/{job_id}.mp4"}
+
+    with start_worker(app, pool="solo", perform_ping_check=False, queues=["content"]):
+        yield app
+
+
+def test_fifty_concurrent_renders_use_at_most_two_threads(celery_app):
+    peak_threads = 0
+
+    async def scenario():
+        nonlocal peak_threads
+        baseline = threading.active_count()
+        tasks = [
+            asyncio.create_task(pipeline._run_via_celery(celery_app, "script", f"job{i}", 4, 10.0))
+            for i in range(50)
+        ]
+        while not all(t.done() for t in tasks):
+            peak_threads = max(peak_threads, threading.active_count() - baseline)
+            await asyncio.sleep(0.01)
+        return [t.result() for t in tasks]
+
+    results = asyncio.run(scenario())
+
+    assert results == [(f"/out/job{i}.mp4", None) for i in range(50)]
+    assert peak_threads <= pipeline.CELERY_POLL_THREADS == 2
+
+
+def test_task_error_and_timeout_are_reported(celery_app):
+    assert asyncio.run(pipeline._run_via_celery(celery_app, "fail", "j", 4, 10.0)) == (None, "kling down")
+    out, err = asyncio.run(pipeline._run_via_celery(celery_app, "crash", "j", 4, 10.0))
+    assert out is None and "worker lost" in err
+
+    slow = FakeAsyncResult("slow", 60, {})
+    with pytest.raises(TimeoutError):
+        asyncio.run(pipeline._await_celery_result(slow, timeout=0.1))
+
+
+def test_slow_result_backend_does_not_block_the_event_loop():
+    class SlowBackendResult(FakeAsyncResult):
+        def ready(self) -> bool:
+            time.sleep(0.2)  # e.g. a Redis round trip under load
+            return super().ready()
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        tick_task = asyncio.create_task(ticker())
+        result = await pipeline._await_celery_result(SlowBackendResult("t", 0.3, {"ok": 1}), timeout=5)
+        tick_task.cancel()
+        return result
+
+    assert asyncio.run(scenario()) == {"ok": 1}
+    assert ticks >= 20
+
+
+# ---------------------------------------------------------------------------
+# Local subprocess — structured progress over --progress-fd
+# ---------------------------------------------------------------------------
+
+FAKE_CONTENT_SCRIPT = '''
+import argparse, json, os, sys, time
+p = argparse.ArgumentParser()
+p.add_argument("--script-file"); p.add_argument("--output")
+p.add_argument("--broll-count"); p.add_argument("--broll-duration")
+p.add_argument("--kling-model"); p.add_argument("--progress-fd", type=int)
+a = p.parse_args()
+out = os.path.join(os.environ["FAKE_OUT_DIR"], a.output + "_final.mp4")
+with os.fdopen(a.progress_fd, "w", buffering=1) as prog:
+    for stage, t in [("tts", 0.0), ("avatar", 1.5), ("music", 4.0)]:
+        prog.write(json.dumps({"event": "stage", "stage": stage, "pct": 10, "t": t}) + "\\n")
+    open(out, "wb").close()
+    prog.write("not json\\n")
+    prog.write(json.dumps({"event": "done", "pct": 100, "output_path": out, "t": 4.25}) + "\\n")
+print("all good, no DONE line on stdout")
+'''
+
+
+def test_run_local_takes_output_and_timings_from_progress_fd(tmp_path, monkeypatch):
+    script = tmp_path / "ninja_content.py"
+    script.write_text(FAKE_CONTENT_SCRIPT)
+    monkeypatch.setattr(pipeline, "CONTENT_SCRIPT", script)
+    monkeypatch.setattr(pipeline, "BROLL_DIR", tmp_path / "no-broll")
+    monkeypatch.setattr(pipeline, "LOG_DIR", tmp_path)
+    monkeypatch.setenv("FAKE_OUT_DIR", str(tmp_path))
+
+    def no_scan(prefix):
+        raise AssertionError("filesystem fallback must not run")
+
+    monkeypatch.setattr(pipeline, "_find_newest_mp4", no_scan)
+
+    outputs: list[str] = []
+    progress: list[tuple[dict, dict]] = []
+
+    async def on_output(path):
+        outputs.append(path)
+
+    async def on_progress(event, timings):
+        progress.append((event, timings))
+
+    output_path, error = asyncio.run(pipeline._run_local(
+        "script", "abcd1234-job", 4, 10.0, on_output=on_output, on_progress=on_progress,
+    ))
+
+    assert error is None
+    assert output_path.endswith("_final.mp4")
+    assert outputs == [output_path]
+    assert [e["event"] for e, _ in progress] == ["stage", "stage", "stage", "done"]
+    assert progress[-1][1] == {"tts": 1.5, "avatar": 2.5, "music": 0.25}
+
+
+def test_run_local_survives_failing_callbacks(tmp_path, monkeypatch):
+    script = tmp_path / "ninja_content.py"
+    script.write_text(FAKE_CONTENT_SCRIPT)
+    monkeypatch.setattr(pipeline, "CONTENT_SCRIPT", script)
+    monkeypatch.setattr(pipeline, "BROLL_DIR", tmp_path / "no-broll")
+    monkeypatch.setattr(pipeline, "LOG_DIR", tmp_path)
+    monkeypatch.setenv("FAKE_OUT_DIR", str(tmp_path))
+
+    async def broken(*args):
+        raise RuntimeError("database is down")
+
+    output_path, error = asyncio.run(pipeline._run_local(
+        "script", "flaky001-job", 4, 10.0, on_output=broken, on_progress=broken,
+    ))
+
+    assert error is None
+    assert output_path.endswith("_final.mp4")
+    log = (tmp_path / "ninja_job_flaky001.log").read_text()
+    assert "Process exited with code 0" in log
+    assert '"music": 0.25' in log
+
+
+FAKE_DUAL_SCRIPT = '''
+import argparse, os
+p = argparse.ArgumentParser()
+p.add_argument("--script-file"); p.add_argument("--output"); p.add_argument("--kling-model")
+a = p.parse_args()
+out = os.path.join(os.environ["FAKE_OUT_DIR"], a.output + "_dual.mp4")
+open(out, "wb").close()
+print("DONE! Output: " + out)
+for i in range(2000):
+    print("post-render chatter", i)
+'''
+
+
+def test_dual_anchor_survives_failing_output_callback(tmp_path, monkeypatch):
+    script = tmp_path / "ninja_dual_anchor.py"
+    script.write_text(FAKE_DUAL_SCRIPT)
+    monkeypatch.setattr(pipeline, "DUAL_ANCHOR_SCRIPT", script)
+    monkeypatch.setattr(pipeline, "LOG_DIR", tmp_path)
+    monkeypatch.setenv("FAKE_OUT_DIR", str(tmp_path))
+
+    async def broken(path):
+        raise RuntimeError("database is down")
+
+    output_path, error = asyncio.run(pipeline.run_dual_anchor_pipeline(
+        "script", "dual0001-job", on_output=broken,
+    ))
+
+    assert error is None
+    assert output_path.endswith("_dual.mp4")
+    log = (tmp_path / "ninja_dual_dual0001.log").read_text()
+    assert "post-render chatter 1999" in log
+    assert "Process exited with code 0" in log
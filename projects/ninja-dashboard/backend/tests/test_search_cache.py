@@ -0,0 +1,133 @@
+"""B-roll search result cache: SearchCache itself + cache-first Pexels/yt-dlp search."""
+import asyncio
+import io
+import json
+
+import pytest
+
+from search_cache import SearchCache
+
+
+def test_hit_after_put_with_normalized_keyword(tmp_path):
+    cache = SearchCache(tmp_path / "c.sqlite", ttl_sec=60, max_entries=10)
+    assert cache.get("pexels", "Space Combat", None, 3) is None
+    cache.put("pexels", "Space Combat", None, 3, [{"title": "a"}])
+
+    assert cache.get("pexels", "  space   combat ", None, 3) == [{"title": "a"}]
+    assert cache.get("youtube", "space combat", None, 3) is None
+    assert cache.get("pexels", "space combat", "portrait", 3) is None
+    assert cache.get("pexels", "space combat", None, 5) is None
+
+
+def test_expired_entries_miss(tmp_path):
+    cache = SearchCache(tmp_path / "c.sqlite", ttl_sec=0, max_entries=10)
+    cache.put("youtube", "kw", None, 3, [])
+    assert cache.get("youtube", "kw", None, 3) is None
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    cache = SearchCache(tmp_path / "c.sqlite", ttl_sec=60, max_entries=2)
+    cache.put("youtube", "a", None, 3, [{"n": 1}])
+    cache.put("youtube", "b", None, 3, [{"n": 2}])
+    assert cache.get("youtube", "a", None, 3)  # a is now more recent than b
+    cache.put("youtube", "c", None, 3, [{"n": 3}])
+
+    assert cache.get("youtube", "b", None, 3) is None
+    assert cache.get("youtube", "a", None, 3) == [{"n": 1}]
+    assert cache.get("youtube", "c", None, 3) == [{"n": 3}]
+
+
+# ---------------------------------------------------------------------------
+# broll_discovery searches consult the cache before the network
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def discovery(tmp_path, monkeypatch):
+    pytest.importorskip("psycopg2")
+    monkeypatch.setenv("BROLL_DIR", str(tmp_path / "broll"))
+    import broll_discovery
+
+    monkeypatch.setattr(broll_discovery, "SEARCH_CACHE", SearchCache(tmp_path / "c.sqlite"))
+    monkeypatch.setattr(broll_discovery, "PEXELS_API_KEY", "test-key")
+    return broll_discovery
+
+
+def test_pexels_cache_hit_makes_no_http_call(discovery, monkeypatch):
+    import urllib.request
+
+    calls = []
+    body = {"videos": [{
+        "url": "https://www.pexels.com/video/space-battle-123/",
+        "image": "https://images.pexels.com/123.jpg",
+        "duration": 12,
+        "video_files": [
+            {"width": 640, "link": "https://p/small.mp4"},
+            {"width": 1920, "link": "https://p/big.mp4"},
+        ],
+    }]}
+
+    def fake_urlopen(req, timeout=None):
+        calls.append(req.full_url)
+        return io.BytesIO(json.dumps(body).encode())
+
+    monkeypatch.setattr(urllib.request, "urlopen", fake_urlopen)
+
+    first = asyncio.run(discovery._search_pexels("space battle"))
+    second = asyncio.run(discovery._search_pexels("Space Battle"))
+
+    assert len(calls) == 1
+    assert second == first
+    assert first[0]["source_url"] == "https://p/big.mp4"
+
+
+class _FakeProc:
+    returncode = 0
+
+    def __init__(self, stdout: bytes) -> None:
+        self._stdout = stdout
+
+    async def communicate(self):
+        return self._stdout, b""
+
+
+def test_youtube_cache_hit_spawns_no_subprocess(discovery, monkeypatch):
+    spawned = []
+    lines = "\n".join(json.dumps({
+        "id": f"vid{i}", "title": f"Trailer {i}", "duration": 30,
+    }) for i in range(5))
+
+    async def fake_exec(*cmd, **kwargs):
+        spawned.append(cmd)
+        return _FakeProc(lines.encode())
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+
+    first = asyncio.run(discovery._search_youtube("nioh 3 gameplay"))
+    second = asyncio.run(discovery._search_youtube("nioh 3 gameplay"))
+
+    assert len(spawned) == 1
+    assert second == first
+    assert [c["source_url"] for c in first] == [
+        f"https://www.youtube.com/watch?v=vid{i}" for i in range(3)
+    ]
+
+
+def test_broken_cache_is_a_miss_not_a_failed_search(discovery, monkeypatch):
+    import sqlite3
+
+    class BrokenCache:
+        def get(self, *args):
+            raise sqlite3.OperationalError("database is locked")
+
+        def put(self, *args):
+            raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(discovery, "SEARCH_CACHE", BrokenCache())
+
+    async def fake_exec(*cmd, **kwargs):
+        return _FakeProc(json.dumps({"id": "vid0", "title": "Trailer", "duration": 30}).encode())
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+
+    results = asyncio.run(discovery._search_youtube("nioh 3 gameplay"))
+    assert [c["source_url"] for c in results] == ["https://www.youtube.com/watch?v=vid0"]
@@ -0,0 +1,77 @@
+"""WSManager fan-out: one stalled tab must not hold up everyone else."""
+import asyncio
+import json
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from ws import WSManager
+
+
+class FakeSocket:
+    def __init__(self, delay: float = 0.0, fail: bool = False) -> None:
+        self.delay = delay
+        self.fail = fail
+        self.received: list[tuple[float, str]] = []
+        self.closed = False
+
+    async def accept(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        if self.fail:
+            raise RuntimeError("socket closed")
+        self.closed = True
+
+    async def send_text(self, msg: str) -> None:
+        if self.fail:
+            raise RuntimeError("socket closed")
+        await asyncio.sleep(self.delay)
+        self.received.append((time.monotonic(), msg))
+
+
+def test_stalled_socket_does_not_block_others():
+    async def scenario():
+        manager = WSManager(send_timeout=0.2)
+        stalled = FakeSocket(delay=60)
+        healthy = [FakeSocket() for _ in range(5)]
+        for ws in [stalled, *healthy]:
+            await manager.connect(ws)
+
+        started = time.monotonic()
+        await manager.broadcast("job_updated", {"id": "abc"})
+        elapsed = time.monotonic() - started
+        return manager, stalled, healthy, started, elapsed
+
+    manager, stalled, healthy, started, elapsed = asyncio.run(scenario())
+
+    assert elapsed < 1.0
+    for ws in healthy:
+        assert len(ws.received) == 1
+        sent_at, msg = ws.received[0]
+        assert sent_at - started < 0.2
+        assert json.loads(msg) == {"type": "job_updated", "data": {"id": "abc"}}
+    assert stalled.received == []
+    # The stalled socket is evicted; healthy ones stay connected
+    assert stalled not in manager._connections
+    assert stalled.closed
+    assert set(healthy) <= manager._connections
+    assert not any(ws.closed for ws in healthy)
+
+
+def test_erroring_socket_is_evicted():
+    async def scenario():
+        manager = WSManager(send_timeout=0.2)
+        broken, ok = FakeSocket(fail=True), FakeSocket()
+        await manager.connect(broken)
+        await manager.connect(ok)
+        await manager.broadcast("job_deleted", {"id": "x"})
+        await manager.broadcast("job_deleted", {"id": "y"})
+        return manager, broken, ok
+
+    manager, broken, ok = asyncio.run(scenario())
+    # close() on the already-broken socket raised; that must not escape broadcast
+    assert manager._connections == {ok}
+    assert len(ok.received) == 2
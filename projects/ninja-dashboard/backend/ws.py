@@ -0,0 +1,47 @@
+"""WebSocket connection manager — fan-out of job/B-roll events to every open tab."""
+import asyncio
+import contextlib
+import json
+import os
+
+from fastapi import WebSocket
+
+# Per-socket send budget; a tab that can't take a frame within this is evicted
+SEND_TIMEOUT_SEC = float(os.environ.get("WS_SEND_TIMEOUT_SEC", "5"))
+
+
+class WSManager:
+    def __init__(self, send_timeout: float = SEND_TIMEOUT_SEC) -> None:
+        self._connections: set[WebSocket] = set()
+        self.send_timeout = send_timeout
+
+    async def connect(self, ws: WebSocket) -> None:
+        await ws.accept()
+        self._connections.add(ws)
+
+    def disconnect(self, ws: WebSocket) -> None:
+        self._connections.discard(ws)
+
+    async def _send(self, ws: WebSocket, msg: str) -> bool:
+        try:
+            await asyncio.wait_for(ws.send_text(msg), timeout=self.send_timeout)
+            return True
+        except Exception:  # includes TimeoutError
+            return False
+
+    async def _close(self, ws: WebSocket) -> None:
+        # Best effort: the socket is already dead or stalled, so don't wait on it long
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(ws.close(), timeout=self.send_timeout)
+
+    async def broadcast(self, event_type: str, data: object) -> None:
+        """Serialize once, send to all sockets concurrently, evict and close slow/dead ones."""
+        msg = json.dumps({"type": event_type, "data": data})
+        targets = list(self._connections)
+        if not targets:
+            return
+        results = await asyncio.gather(*(self._send(ws, msg) for ws in targets))
+        evicted = {ws for ws, ok in zip(targets, results) if not ok}
+        if evicted:
+            self._connections -= evicted
+            await asyncio.gather(*(self._close(ws) for ws in evicted))
@@ -28,10 +28,11 @@ export interface Job {
   youtube_title: string | null;
   youtube_privacy: string | null;
   dual_anchor: boolean;
+  stage_timings: Record<string, number> | null;
 }
 
 export interface WSMessage {
-  type: 'job_list' | 'job_created' | 'job_updated' | 'job_deleted'
+  type: 'job_list' | 'job_created' | 'job_updated' | 'job_deleted' | 'job_progress'
     | 'summon_list' | 'summon_appeared' | 'summon_updated' | 'summon_dismissed';
   data: Job | Job[] | unknown;
 }
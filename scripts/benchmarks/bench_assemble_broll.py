@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Benchmark: single-pass filtergraph vs per-segment assemble_with_broll().
+
+Generates a synthetic 60 s portrait avatar (testsrc + sine) and 6 landscape
+B-roll clips with ffmpeg lavfi, assembles them both ways, and prints wall time
+plus bytes written by every ffmpeg output (temp segments included).
+
+Usage:
+    python3 benchmarks/bench_assemble_broll.py [--duration 60] [--clips 6]
+
+Needs ffmpeg and ffprobe on PATH.
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ninja_content  # noqa: E402
+
+
+def _lavfi(args, out):
+    subprocess.run(["ffmpeg", "-y", "-v", "error", *args, str(out)], check=True)
+
+
+def _make_inputs(workdir: Path, duration: float, clips: int):
+    avatar = workdir / "avatar.mp4"
+    _lavfi([
+        "-f", "lavfi", "-i", f"testsrc=size=1080x1920:rate=30:duration={duration}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", "-shortest",
+    ], avatar)
+    moments = []
+    slot = duration / (clips + 1)
+    for i in range(clips):
+        clip = workdir / f"broll_{i}.mp4"
+        _lavfi([
+            "-f", "lavfi", "-i", f"testsrc2=size=1920x1080:rate=30:duration={slot}",
+            "-c:v", "libx264", "-preset", "ultrafast",
+        ], clip)
+        moments.append({
+            "timestamp": slot * (i + 0.5),
+            "duration": slot / 2,
+            "clip_path": str(clip),
+            "crop_mode": "center",
+        })
+    return avatar, moments
+
+
+class _WriteMeter:
+    """Wraps subprocess.run to total the size of each ffmpeg output file."""
+
+    def __init__(self, run):
+        self._run = run
+        self.bytes_written = 0
+
+    def __call__(self, cmd, *args, **kwargs):
+        result = self._run(cmd, *args, **kwargs)
+        if cmd and cmd[0] == "ffmpeg":
+            out = Path(cmd[-1])
+            if out.exists():
+                self.bytes_written += out.stat().st_size
+        return result
+
+
+def _run(fn, avatar, moments, out: Path):
+    meter = _WriteMeter(subprocess.run)
+    ninja_content.subprocess.run = meter
+    try:
+        start = time.perf_counter()
+        ok = fn(str(avatar), [dict(m) for m in moments], str(out))
+        elapsed = time.perf_counter() - start
+    finally:
+        ninja_content.subprocess.run = meter._run
+    if not ok:
+        raise SystemExit(f"{fn.__name__} failed")
+    return elapsed, meter.bytes_written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--clips", type=int, default=6)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as td:
+        workdir = Path(td)
+        avatar, moments = _make_inputs(workdir, args.duration, args.clips)
+        seg_t, seg_b = _run(ninja_content._assemble_with_broll_segments,
+                            avatar, moments, workdir / "segments.mp4")
+        one_t, one_b = _run(ninja_content._assemble_with_broll_single_pass,
+                            avatar, moments, workdir / "single.mp4")
+
+    print(f"assemble_with_broll: {args.duration:.0f}s avatar + {args.clips} B-roll clips")
+    print(f"  per-segment: {seg_t:8.2f}s  {seg_b / 1e6:8.1f} MB written")
+    print(f"  single-pass: {one_t:8.2f}s  {one_b / 1e6:8.1f} MB written")
+    print(f"  speedup:     {seg_t / one_t:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
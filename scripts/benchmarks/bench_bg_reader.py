@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Benchmark: BackgroundVideoReader vs per-frame seek for video backgrounds.
+
+Generates a 30 s lavfi background (testsrc2, libx264, 2 s GOP) and fetches one
+background frame per output frame both ways: the old path (set
+CAP_PROP_POS_FRAMES, read, resize, convert on every frame) and the sequential
+reader. Prints wall time and frames per second for each.
+
+Usage:
+    python3 benchmarks/bench_bg_reader.py [--frames 300] [--size 540x960]
+
+Needs ffmpeg on PATH.
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ninja_background  # noqa: E402
+
+FPS = 30
+
+
+def _make_background(path, size, seconds=30):
+    subprocess.run([
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={size}:rate={FPS}:duration={seconds}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-g", str(2 * FPS), "-keyint_min", str(2 * FPS),
+        "-pix_fmt", "yuv420p", str(path),
+    ], check=True)
+
+
+def _seek_path(path, frames, size):
+    """The pre-reader loop from process_video."""
+    cv2 = ninja_background.cv2
+    bg_cap = cv2.VideoCapture(str(path))
+    bg_frame_count = int(bg_cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    for i in range(frames):
+        bg_cap.set(cv2.CAP_PROP_POS_FRAMES, i % bg_frame_count)
+        ret_bg, bg_frame = bg_cap.read()
+        if not ret_bg:
+            bg_cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            _, bg_frame = bg_cap.read()
+        bg_frame = cv2.resize(bg_frame, size, interpolation=cv2.INTER_LANCZOS4)
+        cv2.cvtColor(bg_frame, cv2.COLOR_BGR2RGB)
+    bg_cap.release()
+
+
+def _reader_path(path, frames, size):
+    reader = ninja_background.BackgroundVideoReader(str(path), FPS, size)
+    for i in range(frames):
+        reader.read(i)
+    reader.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300, help="output frames to fetch")
+    parser.add_argument("--size", default="540x960", help="background WxH")
+    args = parser.parse_args()
+
+    ninja_background.import_deps()
+    size = tuple(int(x) for x in args.size.split("x"))
+    with tempfile.TemporaryDirectory(prefix="bench_bg_reader_") as tmp:
+        bg = Path(tmp) / "bg.mp4"
+        _make_background(bg, args.size)
+        print(f"{args.frames} frames from a 30 s {args.size} background, 2 s GOP")
+        for name, fn in (("seek", _seek_path), ("sequential", _reader_path)):
+            start = time.perf_counter()
+            fn(bg, args.frames, size)
+            elapsed = time.perf_counter() - start
+            print(f"  {name:<11} {elapsed:7.2f} s   {args.frames / elapsed:7.1f} fps")
+
+
+if __name__ == "__main__":
+    main()
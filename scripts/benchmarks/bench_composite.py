@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark: float32 buffered compositing vs the original float64 path.
+
+Composites 300 synthetic 1080x1920 frames (random avatar colors under a fixed
+soft-edged mask, as with --cache-mask) over a static background with the
+cyberpunk effects (vignette + glow + ambient), and prints fps and peak RSS.
+Each implementation runs in its own child process so peak RSS is its own.
+
+Usage:
+    python3 benchmarks/bench_composite.py [--frames 300] [--preset cyberpunk]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ninja_background  # noqa: E402
+
+W, H = 1080, 1920
+
+
+def _legacy_composite(avatar_rgba, background_rgb, effects):
+    """composite_frame before the float32 rewrite (float64, masks rebuilt per frame)."""
+    cv2 = ninja_background.cv2
+    h, w = avatar_rgba.shape[:2]
+    alpha = avatar_rgba[:, :, 3:4].astype(float) / 255.0
+    result = avatar_rgba[:, :, :3].astype(float) * alpha + background_rgb.copy().astype(float) * (1 - alpha)
+    mask = avatar_rgba[:, :, 3]
+    if "vignette" in effects:
+        Y, X = np.ogrid[:h, :w]
+        dist = np.sqrt(((X - w / 2) / (w / 2)) ** 2 + ((Y - h / 2) / (h / 2)) ** 2)
+        vignette = 1.0 - effects.get("vignette_strength", 0.3) * np.clip(dist - 0.5, 0, 1) ** 2
+        result = result * np.expand_dims(vignette, axis=2)
+    if "glow" in effects:
+        edges = cv2.GaussianBlur(cv2.dilate(cv2.Canny(mask, 50, 150), None, iterations=2), (23, 23), 0)
+        glow = np.zeros_like(result)
+        for c in range(3):
+            glow[:, :, c] = effects["glow_color"][c] * (edges.astype(float) / 255.0) * 0.4
+        result = result + glow
+    if "ambient" in effects:
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (30, 30))
+        dilated = cv2.GaussianBlur(cv2.dilate(mask, kernel, iterations=3), (81, 81), 0)
+        spill = (dilated.astype(float) / 255.0) * (1.0 - mask.astype(float) / 255.0)
+        ambient = np.zeros_like(result)
+        for c in range(3):
+            ambient[:, :, c] = effects["ambient_color"][c] * spill * 0.15
+        result = result + ambient
+    return np.clip(result, 0, 255).astype(np.uint8)
+
+
+def _run(impl, frames, preset):
+    ninja_background.import_deps()
+    cv2 = ninja_background.cv2
+    effects = ninja_background.EFFECT_PRESETS[preset]
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 256, (H, W, 3), dtype=np.uint8)
+    mask = np.zeros((H, W), dtype=np.uint8)
+    cv2.ellipse(mask, (W // 2, H // 2), (W // 3, H // 3), 0, 0, 360, 255, -1)
+    mask = cv2.GaussianBlur(mask, (17, 17), 0)
+    palette = [rng.integers(0, 256, (H, W, 3), dtype=np.uint8) for _ in range(4)]
+    avatar = np.empty((H, W, 4), dtype=np.uint8)
+
+    compositor = ninja_background.FrameCompositor(effects)
+    start = time.perf_counter()
+    for i in range(frames):
+        avatar[:, :, :3] = palette[i % len(palette)]
+        avatar[:, :, 3] = mask
+        if impl == "legacy":
+            out = _legacy_composite(avatar, background, effects)
+        else:
+            out = compositor.composite(avatar, background)
+        cv2.cvtColor(out, cv2.COLOR_RGB2BGR)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"impl": impl, "fps": frames / elapsed, "peak_rss_mb": peak_mb}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--preset", default="cyberpunk", choices=list(ninja_background.EFFECT_PRESETS))
+    parser.add_argument("--impl", choices=["legacy", "compositor"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.impl:
+        _run(args.impl, args.frames, args.preset)
+        return
+
+    print(f"{args.frames} frames @ {W}x{H}, effects={args.preset}")
+    for impl in ("legacy", "compositor"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--impl", impl, "--frames", str(args.frames), "--preset", args.preset],
+            capture_output=True, text=True, check=True,
+        )
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"  {impl:<11} {r['fps']:6.1f} fps   peak RSS {r['peak_rss_mb']:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,19 +14,24 @@ Usage:
 Supports:
     - AI-based background removal (rembg/u2net) — best quality
     - Luminance-based keying — fast fallback
+    - Adaptive mask reuse for moving subjects (--adaptive-mask)
     - Static image or video backgrounds
     - Vignette, glow, and edge softening effects
     - Source-resolution compositing (288×512) for pipeline integration
 """
 
 import argparse
+import functools
 import json
+import multiprocessing
 import os
+import queue
 import sys
 import subprocess
 import tempfile
-import shutil
+import threading
 import time
+from collections import deque
 import numpy as np
 
 # Lazy imports for optional dependencies
@@ -72,6 +77,18 @@ SRC_W, SRC_H = 288, 512
 # Final resolution (9:16 vertical)
 FINAL_W, FINAL_H = 1080, 1920
 
+# Per-frame matting pipeline (used when the mask is not cached)
+# Conservative default: each worker runs its own onnxruntime session, so more
+# processes mostly add memory and contention once the cores are shared out.
+MATTE_WORKERS = int(os.environ.get("NINJA_BG_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+MATTE_QUEUE_DEPTH = int(os.environ.get("NINJA_BG_QUEUE_DEPTH", "8"))
+
+# Adaptive mask reuse: re-matte when the downscaled frame drifts this far
+# (mean abs gray difference, 0-255) from the last keyframe, or every N frames
+MASK_DIFF_THRESHOLD = 3.0
+MASK_KEYFRAME_INTERVAL = 30
+MASK_DIFF_WIDTH = 64  # width of the downscaled frames used for gating/tracking
+
 
 ###############################################################################
 # Scene loading (layered backgrounds)
@@ -129,102 +146,134 @@ def composite_frame_layered(avatar_rgba, background_rgb, foreground_rgba=None,
     Returns:
         RGB numpy array with composited result
     """
-    h, w = background_rgb.shape[:2]
-    avatar_h, avatar_w = avatar_rgba.shape[:2]
+    compositor = SceneCompositor(background_rgb, foreground_rgba, avatar_zone, effects)
+    return compositor.composite(avatar_rgba)
+
+
+def avatar_placement(avatar_shape, frame_shape, avatar_zone=None):
+    """
+    Scaled avatar size and top-left position inside the frame.
+    Returns (new_w, new_h, x_start, y_start); the position may be off-frame.
+    """
+    h, w = frame_shape[:2]
+    avatar_h, avatar_w = avatar_shape[:2]
     
-    # Position and scale avatar according to avatar_zone
     if avatar_zone:
         # Target scale: avatar should fill this fraction of height
         target_scale = avatar_zone.get("scale", 0.6)
-        target_h = int(h * target_scale)
-        scale_factor = target_h / avatar_h
-        new_w = int(avatar_w * scale_factor)
-        new_h = target_h
-        
-        # Resize avatar
-        avatar_resized = cv2.resize(avatar_rgba, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
+        new_h = int(h * target_scale)
+        new_w = int(avatar_w * (new_h / avatar_h))
         
         # Position: center on x_center, y_center
         x_center = int(w * avatar_zone.get("x_center", 0.5))
         y_center = int(h * avatar_zone.get("y_center", 0.45))
+        return new_w, new_h, x_center - new_w // 2, y_center - new_h // 2
+    
+    # Default: center avatar, scale to fit
+    scale_factor = min(w / avatar_w, h / avatar_h) * 0.8
+    new_w = int(avatar_w * scale_factor)
+    new_h = int(avatar_h * scale_factor)
+    return new_w, new_h, (w - new_w) // 2, (h - new_h) // 2
+
+
+class SceneCompositor:
+    """
+    Layered compositing state for one video: background → avatar → foreground.
+    
+    The static layers are converted to float32 once (foreground premultiplied),
+    effect masks are built once per avatar placement, and every frame blends
+    into the same preallocated buffers. composite() returns a uint8 buffer that
+    is overwritten by the next call.
+    """
+    
+    def __init__(self, background_rgb, foreground_rgba=None, avatar_zone=None, effects=None):
+        h, w = background_rgb.shape[:2]
+        self.shape = (h, w)
+        self.avatar_zone = avatar_zone
+        self.effects = effects or {}
+        self._bg = background_rgb.astype(np.float32)
         
-        x_start = x_center - new_w // 2
-        y_start = y_center - new_h // 2
-    else:
-        # Default: center avatar, scale to fit
-        scale_factor = min(w / avatar_w, h / avatar_h) * 0.8
-        new_w = int(avatar_w * scale_factor)
-        new_h = int(avatar_h * scale_factor)
+        self._fg_premul = self._fg_keep = None
+        if foreground_rgba is not None:
+            if foreground_rgba.shape[:2] != (h, w):
+                foreground_rgba = cv2.resize(foreground_rgba, (w, h), interpolation=cv2.INTER_LANCZOS4)
+            fg_alpha = foreground_rgba[:, :, 3:4].astype(np.float32) / 255.0
+            self._fg_premul = foreground_rgba[:, :, :3].astype(np.float32) * fg_alpha
+            self._fg_keep = 1.0 - fg_alpha
+        
+        self._vignette = None
+        if "vignette" in self.effects:
+            self._vignette = vignette_mask(h, w, self.effects.get("vignette_strength", 0.3))
+        self._tint = None
+        if "warm_tint" in self.effects:
+            self._tint = warm_tint_gains(self.effects.get("warm_tint_strength", 0.1))
         
+        self._placement = None
+        self._glow = None
+        self._acc = np.empty((h, w, 3), dtype=np.float32)
+        self._out = np.empty((h, w, 3), dtype=np.uint8)
+    
+    def _glow_layer(self, box):
+        """Additive glow for an avatar box (x0, y0, x1, y1), built once per placement."""
+        h, w = self.shape
+        glow_mask = np.zeros((h, w), dtype=np.uint8)
+        if self.avatar_zone:
+            # Approximate mask at avatar position
+            cv2.rectangle(glow_mask, box[:2], box[2:], 255, -1)
+            glow_mask = cv2.GaussianBlur(glow_mask, (51, 51), 0)
+        return edge_glow_layer(glow_mask, color=self.effects.get("glow_color", (200, 100, 50)))
+    
+    def composite(self, avatar_rgba):
+        h, w = self.shape
+        new_w, new_h, x_start, y_start = avatar_placement(avatar_rgba.shape, self.shape, self.avatar_zone)
         avatar_resized = cv2.resize(avatar_rgba, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
         
-        x_start = (w - new_w) // 2
-        y_start = (h - new_h) // 2
-    
-    # Create result starting with background
-    result = background_rgb.astype(float).copy()
-    
-    # Composite avatar onto background
-    x_end = min(x_start + new_w, w)
-    y_end = min(y_start + new_h, h)
-    x_start_clamped = max(0, x_start)
-    y_start_clamped = max(0, y_start)
-    
-    # Adjust avatar slice for clamping
-    av_x_start = x_start_clamped - x_start
-    av_y_start = y_start_clamped - y_start
-    av_x_end = av_x_start + (x_end - x_start_clamped)
-    av_y_end = av_y_start + (y_end - y_start_clamped)
-    
-    avatar_slice = avatar_resized[av_y_start:av_y_end, av_x_start:av_x_end]
-    alpha = avatar_slice[:, :, 3:4].astype(float) / 255.0
-    fg = avatar_slice[:, :, :3].astype(float)
-    
-    bg_region = result[y_start_clamped:y_end, x_start_clamped:x_end]
-    result[y_start_clamped:y_end, x_start_clamped:x_end] = fg * alpha + bg_region * (1 - alpha)
-    
-    # Composite foreground layer on top (if provided)
-    if foreground_rgba is not None:
-        fg_h, fg_w = foreground_rgba.shape[:2]
+        # Clamp the avatar box to the frame
+        x_end = min(x_start + new_w, w)
+        y_end = min(y_start + new_h, h)
+        x0, y0 = max(0, x_start), max(0, y_start)
+        av_x, av_y = x0 - x_start, y0 - y_start
+        avatar_slice = avatar_resized[av_y:av_y + (y_end - y0), av_x:av_x + (x_end - x0)]
+        
+        acc = self._acc
+        np.copyto(acc, self._bg)
+        region = acc[y0:y_end, x0:x_end]
+        alpha = avatar_slice[:, :, 3:4] * np.float32(1 / 255.0)
+        # bg + (fg - bg) * alpha, in place on the region view
+        blend = avatar_slice[:, :, :3].astype(np.float32)
+        blend -= region
+        blend *= alpha
+        region += blend
         
-        # Resize foreground to match output if needed
-        if fg_h != h or fg_w != w:
-            foreground_rgba = cv2.resize(foreground_rgba, (w, h), interpolation=cv2.INTER_LANCZOS4)
+        if self._fg_premul is not None:
+            acc *= self._fg_keep
+            acc += self._fg_premul
         
-        fg_alpha = foreground_rgba[:, :, 3:4].astype(float) / 255.0
-        fg_rgb = foreground_rgba[:, :, :3].astype(float)
+        if self._vignette is not None:
+            acc *= self._vignette
+        if "glow" in self.effects:
+            placement = (x0, y0, x_end, y_end)
+            if placement != self._placement:
+                self._glow = self._glow_layer(placement)
+                self._placement = placement
+            acc += self._glow
+        if self._tint is not None:
+            acc *= self._tint
         
-        result = fg_rgb * fg_alpha + result * (1 - fg_alpha)
-    
-    # Apply effects
-    if effects:
-        if "vignette" in effects:
-            result = apply_vignette(result, strength=effects.get("vignette_strength", 0.3))
-        if "glow" in effects:
-            # For layered scenes, apply glow based on avatar position
-            glow_mask = np.zeros((h, w), dtype=np.uint8)
-            if avatar_zone:
-                # Create approximate mask at avatar position
-                cv2.rectangle(glow_mask, 
-                             (x_start_clamped, y_start_clamped), 
-                             (x_end, y_end), 
-                             255, -1)
-                glow_mask = cv2.GaussianBlur(glow_mask, (51, 51), 0)
-            result = apply_edge_glow(result, glow_mask, 
-                                    color=effects.get("glow_color", (200, 100, 50)))
-        if "warm_tint" in effects:
-            result = apply_warm_tint(result, strength=effects.get("warm_tint_strength", 0.1))
-    
-    return np.clip(result, 0, 255).astype(np.uint8)
+        np.clip(acc, 0, 255, out=acc)
+        np.copyto(self._out, acc, casting="unsafe")
+        return self._out
+
+
+def warm_tint_gains(strength=0.1):
+    """Per-channel RGB gains for apply_warm_tint."""
+    warm = np.array([1.05, 1.0, 0.9], dtype=np.float32)  # Slightly boost red, reduce blue
+    return 1 + (warm - 1) * np.float32(strength)
 
 
 def apply_warm_tint(frame, strength=0.1):
     """Add a warm color tint to match dojo lighting."""
-    warm = np.array([1.05, 1.0, 0.9])  # Slightly boost red, reduce blue
-    result = frame.copy()
-    for c in range(3):
-        result[:, :, c] = result[:, :, c] * (1 + (warm[c] - 1) * strength)
-    return result
+    return frame * warm_tint_gains(strength)
 
 
 ###############################################################################
@@ -321,6 +370,148 @@ def remove_bg_grabcut(frame_rgb):
     return rgba
 
 
+REMOVE_METHODS = {
+    "rembg": remove_bg_rembg,
+    "luminance": remove_bg_luminance,
+    "grabcut": remove_bg_grabcut,
+}
+
+
+def get_remove_fn(method):
+    if method not in REMOVE_METHODS:
+        raise ValueError(f"Unknown method: {method}")
+    return REMOVE_METHODS[method]
+
+
+###############################################################################
+# Matting pipeline
+###############################################################################
+
+_worker_remove_fn = None
+
+
+def _rembg_session(intra_op_threads):
+    """rembg's default u2net session with onnxruntime capped at intra_op_threads.
+
+    rembg.new_session() builds its own SessionOptions, so the session class
+    is constructed directly to pass ours in.
+    """
+    import onnxruntime as ort
+    from rembg.sessions.u2net import U2netSession
+    sess_options = ort.SessionOptions()
+    sess_options.intra_op_num_threads = intra_op_threads
+    sess_options.inter_op_num_threads = 1
+    return U2netSession("u2net", sess_options)
+
+
+def _init_matting_worker(method, intra_op_threads=1):
+    """Pool initializer: each worker process holds its own remover (and rembg session).
+
+    Workers split the cores between them (intra_op_threads each) instead of
+    every onnxruntime session spinning up a thread per core.
+    """
+    global _worker_remove_fn
+    import_deps()
+    if method == "rembg":
+        from rembg import remove as rembg_remove
+        session = _rembg_session(intra_op_threads)
+        _worker_remove_fn = lambda frame_rgb: np.array(
+            rembg_remove(Image.fromarray(frame_rgb), session=session))
+    else:
+        _worker_remove_fn = get_remove_fn(method)
+
+
+def _matte_in_worker(item):
+    i, frame_rgb = item
+    return i, _worker_remove_fn(frame_rgb)
+
+
+def prefetch(items, depth):
+    """
+    Iterate items on a background reader thread, at most depth items ahead.
+    Exceptions from the source are re-raised in the consumer.
+    """
+    q = queue.Queue(maxsize=max(1, depth))
+    done = object()
+    stop = threading.Event()
+
+    def reader():
+        try:
+            for item in items:
+                while not stop.is_set():
+                    try:
+                        q.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+            q.put(done)
+        except BaseException as e:  # handed to the consumer
+            q.put(e)
+
+    thread = threading.Thread(target=reader, name="ninja-bg-reader", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+class MattingPipeline:
+    """
+    Bounded decode → matte → consume pipeline for per-frame background removal.
+    
+    A reader thread pulls frames from the source, a pool of worker processes
+    mattes them (each worker holding its own rembg session), and run() yields
+    (index, rgba) strictly in frame order. At most queue_depth frames wait in
+    the reader queue and at most max(queue_depth, workers) are in flight in
+    the pool (so no worker idles behind a shallow queue), keeping memory
+    bounded however far decode runs ahead of the consumer.
+    With workers <= 1 frames are matted in-process, still behind the reader.
+    """
+    
+    def __init__(self, method="rembg", workers=None, queue_depth=None):
+        self.method = method
+        self.workers = MATTE_WORKERS if workers is None else workers
+        self.queue_depth = max(1, MATTE_QUEUE_DEPTH if queue_depth is None else queue_depth)
+        self.max_in_flight = 0  # exposed for tests
+    
+    def run(self, frames_rgb):
+        """Yield (i, avatar_rgba) for each RGB frame of frames_rgb, in order."""
+        if self.workers <= 1:
+            remove_fn = get_remove_fn(self.method)
+            for i, frame_rgb in enumerate(prefetch(frames_rgb, self.queue_depth)):
+                yield i, remove_fn(frame_rgb)
+            return
+        
+        # Pool first: forking after the reader thread starts would copy its lock state
+        intra_op_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        pool = multiprocessing.Pool(self.workers, initializer=_init_matting_worker,
+                                    initargs=(self.method, intra_op_threads))
+        in_flight_limit = max(self.queue_depth, self.workers)
+        try:
+            # Results are collected in submission (= frame) order, so frames
+            # matted out of order by different workers are reordered here.
+            pending = deque()
+            for item in enumerate(prefetch(frames_rgb, self.queue_depth)):
+                pending.append(pool.apply_async(_matte_in_worker, (item,)))
+                self.max_in_flight = max(self.max_in_flight, len(pending))
+                if len(pending) >= in_flight_limit:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+        finally:
+            pool.terminate()
+            pool.join()
+
+
 ###############################################################################
 # Compositing
 ###############################################################################
@@ -330,90 +521,412 @@ def composite_frame(avatar_rgba, background_rgb, effects=None):
     Composite avatar (RGBA) over background (RGB).
     Returns RGB numpy array.
     """
-    h, w = avatar_rgba.shape[:2]
-    bg_h, bg_w = background_rgb.shape[:2]
-
-    # Resize background to match avatar if needed
-    if bg_h != h or bg_w != w:
-        bg_resized = cv2.resize(background_rgb, (w, h), interpolation=cv2.INTER_LANCZOS4)
-    else:
-        bg_resized = background_rgb.copy()
+    return FrameCompositor(effects).composite(avatar_rgba, background_rgb)
 
-    # Extract alpha as float [0, 1]
-    alpha = avatar_rgba[:, :, 3:4].astype(float) / 255.0
-    fg = avatar_rgba[:, :, :3].astype(float)
-    bg = bg_resized.astype(float)
 
-    # Alpha blend
-    result = fg * alpha + bg * (1 - alpha)
-
-    # Apply effects
-    if effects:
-        if "vignette" in effects:
-            result = apply_vignette(result, strength=effects.get("vignette_strength", 0.3))
-        if "glow" in effects:
-            result = apply_edge_glow(result, avatar_rgba[:, :, 3], color=effects.get("glow_color", (0, 180, 255)))
-        if "ambient" in effects:
-            result = apply_ambient_light(result, avatar_rgba[:, :, 3], color=effects.get("ambient_color", (0, 100, 200)))
-
-    return np.clip(result, 0, 255).astype(np.uint8)
+class FrameCompositor:
+    """
+    Per-video compositing state for composite_frame.
+    
+    Blends in float32 into preallocated buffers and keeps the effect layers
+    (vignette, edge glow, ambient light) until the frame size or alpha mask
+    changes, which with a cached mask means they are built once per video.
+    composite() returns a uint8 buffer that is overwritten by the next call.
+    """
+    
+    def __init__(self, effects=None):
+        self.effects = effects or {}
+        self._shape = None
+        self._alpha_for_layers = None
+        self._effect_layer = None
+        self._vignette = None
+    
+    def _allocate(self, h, w):
+        self._shape = (h, w)
+        self._fg = np.empty((h, w, 3), dtype=np.float32)
+        self._bg = np.empty((h, w, 3), dtype=np.float32)
+        self._alpha = np.empty((h, w, 1), dtype=np.float32)
+        self._out = np.empty((h, w, 3), dtype=np.uint8)
+        self._alpha_for_layers = None
+        if "vignette" in self.effects:
+            self._vignette = vignette_mask(h, w, self.effects.get("vignette_strength", 0.3))
+    
+    def _effect_layers(self, alpha_mask):
+        """Summed additive glow + ambient layer for this alpha mask (None if no such effects)."""
+        if self._alpha_for_layers is not None and np.array_equal(alpha_mask, self._alpha_for_layers):
+            return self._effect_layer
+        layer = None
+        if "glow" in self.effects:
+            layer = edge_glow_layer(alpha_mask, color=self.effects.get("glow_color", (0, 180, 255)))
+        if "ambient" in self.effects:
+            ambient = ambient_light_layer(alpha_mask, color=self.effects.get("ambient_color", (0, 100, 200)))
+            layer = ambient if layer is None else layer + ambient
+        self._alpha_for_layers = alpha_mask.copy()
+        self._effect_layer = layer
+        return layer
+    
+    def composite(self, avatar_rgba, background_rgb):
+        h, w = avatar_rgba.shape[:2]
+        if self._shape != (h, w):
+            self._allocate(h, w)
+        
+        # Resize background to match avatar if needed
+        if background_rgb.shape[:2] != (h, w):
+            background_rgb = cv2.resize(background_rgb, (w, h), interpolation=cv2.INTER_LANCZOS4)
+        
+        # bg + (fg - bg) * alpha
+        fg, bg, alpha = self._fg, self._bg, self._alpha
+        np.multiply(avatar_rgba[:, :, 3:4], np.float32(1 / 255.0), out=alpha)
+        np.copyto(fg, avatar_rgba[:, :, :3])
+        np.copyto(bg, background_rgb)
+        fg -= bg
+        fg *= alpha
+        fg += bg
+        
+        # Apply effects
+        if self._vignette is not None:
+            fg *= self._vignette
+        if "glow" in self.effects or "ambient" in self.effects:
+            fg += self._effect_layers(avatar_rgba[:, :, 3])
+        
+        np.clip(fg, 0, 255, out=fg)
+        np.copyto(self._out, fg, casting="unsafe")
+        return self._out
 
 
 ###############################################################################
 # Visual effects
 ###############################################################################
 
-def apply_vignette(frame, strength=0.3):
-    """Add a subtle vignette darkening at edges."""
-    h, w = frame.shape[:2]
+@functools.lru_cache(maxsize=8)
+def vignette_mask(h, w, strength=0.3):
+    """Float32 (h, w, 1) vignette gain, built once per resolution and strength."""
     Y, X = np.ogrid[:h, :w]
     cx, cy = w / 2, h / 2
     dist = np.sqrt(((X - cx) / cx) ** 2 + ((Y - cy) / cy) ** 2)
     vignette = 1.0 - strength * np.clip(dist - 0.5, 0, 1) ** 2
-    vignette = np.expand_dims(vignette, axis=2)
-    return frame * vignette
+    mask = np.expand_dims(vignette, axis=2).astype(np.float32)
+    mask.flags.writeable = False  # shared between callers
+    return mask
 
 
-def apply_edge_glow(frame, alpha_mask, color=(0, 180, 255), intensity=0.4, blur_size=11):
-    """Add a colored glow around the avatar edges."""
+def apply_vignette(frame, strength=0.3):
+    """Add a subtle vignette darkening at edges."""
+    h, w = frame.shape[:2]
+    return frame * vignette_mask(h, w, strength)
+
+
+def edge_glow_layer(alpha_mask, color=(0, 180, 255), intensity=0.4, blur_size=11):
+    """Float32 (h, w, 3) colored glow around the edges of an alpha mask."""
     # Find edges of the alpha mask
     edges = cv2.Canny(alpha_mask, 50, 150)
     edges = cv2.dilate(edges, None, iterations=2)
     edges_blur = cv2.GaussianBlur(edges, (blur_size*2+1, blur_size*2+1), 0)
 
-    # Create colored glow
-    glow = np.zeros_like(frame)
-    edge_float = edges_blur.astype(float) / 255.0
-    for c in range(3):
-        glow[:, :, c] = color[c] * edge_float * intensity
+    edge_float = edges_blur.astype(np.float32)[:, :, None] / 255.0
+    return edge_float * (np.asarray(color, dtype=np.float32) * np.float32(intensity))
 
-    return frame + glow
 
+def apply_edge_glow(frame, alpha_mask, color=(0, 180, 255), intensity=0.4, blur_size=11):
+    """Add a colored glow around the avatar edges."""
+    return frame + edge_glow_layer(alpha_mask, color, intensity, blur_size)
 
-def apply_ambient_light(frame, alpha_mask, color=(0, 100, 200), intensity=0.15):
-    """Add subtle ambient colored light spill on the background around the avatar."""
+
+def ambient_light_layer(alpha_mask, color=(0, 100, 200), intensity=0.15):
+    """Float32 (h, w, 3) light spill on the background around an alpha mask."""
     # Create a dilated mask of the avatar
     kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (30, 30))
     dilated = cv2.dilate(alpha_mask, kernel, iterations=3)
     dilated = cv2.GaussianBlur(dilated, (81, 81), 0)
 
     # Only apply to background (where alpha is low)
-    bg_mask = 1.0 - (alpha_mask.astype(float) / 255.0)
-    spill_mask = (dilated.astype(float) / 255.0) * bg_mask
+    bg_mask = 1.0 - (alpha_mask.astype(np.float32) / 255.0)
+    spill_mask = (dilated.astype(np.float32) / 255.0) * bg_mask
+    return spill_mask[:, :, None] * (np.asarray(color, dtype=np.float32) * np.float32(intensity))
 
-    ambient = np.zeros_like(frame)
-    for c in range(3):
-        ambient[:, :, c] = color[c] * spill_mask * intensity
 
-    return frame + ambient
+def apply_ambient_light(frame, alpha_mask, color=(0, 100, 200), intensity=0.15):
+    """Add subtle ambient colored light spill on the background around the avatar."""
+    return frame + ambient_light_layer(alpha_mask, color, intensity)
 
 
 ###############################################################################
 # Video processing
 ###############################################################################
 
+class FFmpegFrameWriter:
+    """
+    Encode composited frames once: raw BGR frames are piped into a single
+    ffmpeg process that runs libx264 and muxes the source audio in the same pass.
+    
+    Writes block while ffmpeg's stdin pipe is full, so the frame loop can never
+    run further ahead of the encoder than one pipe buffer.
+    
+    ffmpeg encodes to a ".partial" sibling that only replaces output_path once
+    encoding succeeds, so a failed or interrupted render never leaves a
+    truncated file behind under the real name.
+    """
+    
+    def __init__(self, output_path, width, height, fps, audio_source=None,
+                 preset="medium", crf=18):
+        self.output_path = output_path
+        root, ext = os.path.splitext(output_path)
+        self.partial_path = f"{root}.partial{ext}"
+        self.frame_bytes = width * height * 3
+        cmd = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24",
+            "-s", f"{width}x{height}", "-framerate", f"{fps}",
+            "-i", "-",
+        ]
+        if audio_source:
+            cmd += ["-i", audio_source, "-map", "0:v:0", "-map", "1:a:0?",
+                    "-c:a", "aac", "-b:a", "128k", "-shortest"]
+        cmd += [
+            "-c:v", "libx264", "-preset", preset, "-crf", str(crf),
+            "-pix_fmt", "yuv420p",
+            self.partial_path,
+        ]
+        # stderr goes to a file: an unread pipe could fill up and stall ffmpeg
+        self._stderr = tempfile.TemporaryFile()
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=self._stderr)
+    
+    def _error(self):
+        self._stderr.seek(0)
+        return self._stderr.read().decode(errors="replace")[-500:]
+    
+    def write(self, frame_bgr):
+        if frame_bgr.nbytes != self.frame_bytes:
+            raise ValueError(f"Frame is {frame_bgr.shape}, writer expects {self.frame_bytes} bytes")
+        try:
+            self.proc.stdin.write(memoryview(np.ascontiguousarray(frame_bgr)).cast("B"))
+        except BrokenPipeError:
+            self.proc.wait()
+            raise RuntimeError(f"ffmpeg exited while encoding: {self._error()}")
+    
+    def close(self):
+        """Flush and wait for ffmpeg; raises RuntimeError if encoding failed."""
+        if self.proc.stdin and not self.proc.stdin.closed:
+            try:
+                self.proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        returncode = self.proc.wait()
+        error = self._error()
+        self._stderr.close()
+        if returncode != 0:
+            self._discard_partial()
+            raise RuntimeError(f"ffmpeg failed ({returncode}): {error}")
+        os.replace(self.partial_path, self.output_path)
+        return self.output_path
+    
+    def abort(self):
+        """Kill ffmpeg and drop the partial output."""
+        self.proc.kill()
+        self.proc.wait()
+        self._stderr.close()
+        self._discard_partial()
+    
+    def _discard_partial(self):
+        try:
+            os.remove(self.partial_path)
+        except FileNotFoundError:
+            pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class BackgroundVideoReader:
+    """
+    Looping background video read strictly forward.
+    
+    Output frame i shows the background frame at the same timestamp,
+    int(i * bg_fps / out_fps), wrapped at the background's length. Skipped
+    frames are grabbed without decoding to pixels, repeated ones reuse the last
+    converted frame, and the capture is rewound only when the loop wraps, so
+    there is no per-frame seek or keyframe re-decode.
+    """
+    
+    def __init__(self, path, out_fps, size):
+        self.path = path
+        self.size = size
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Cannot open background video: {path}")
+        bg_fps = self.cap.get(cv2.CAP_PROP_FPS) or out_fps
+        self.step = bg_fps / out_fps if out_fps else 1.0
+        # Container frame counts can be wrong; corrected on the first real EOF
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+        self.rewinds = 0  # exposed for tests/benchmarks
+        self._pos = 0          # index of the next frame the capture will return
+        self._last_idx = None
+        self._last_rgb = None
+    
+    def source_index(self, i):
+        """Background frame index shown at output frame i."""
+        idx = int(i * self.step + 1e-6)
+        return idx % self.frame_count if self.frame_count else idx
+    
+    def _rewind(self):
+        if not self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0):
+            self.cap.release()
+            self.cap = cv2.VideoCapture(self.path)
+        self._pos = 0
+        self.rewinds += 1
+    
+    def read(self, i):
+        """RGB background frame for output frame i, resized to self.size."""
+        idx = self.source_index(i)
+        if idx == self._last_idx:
+            return self._last_rgb
+        if idx < self._pos:
+            self._rewind()
+        while self._pos < idx:
+            if not self.cap.grab():
+                break
+            self._pos += 1
+        ret, frame = self.cap.read()
+        if not ret:
+            if self._pos == 0:
+                raise RuntimeError(f"Cannot read background video: {self.path}")
+            # Real end of stream: learn the true length and wrap
+            self.frame_count = self._pos
+            idx = self.source_index(i)
+            self._rewind()
+            while self._pos < idx and self.cap.grab():
+                self._pos += 1
+            ret, frame = self.cap.read()
+            if not ret:
+                raise RuntimeError(f"Cannot read background video: {self.path}")
+        self._pos += 1
+        frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_LANCZOS4)
+        self._last_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self._last_idx = idx
+        return self._last_rgb
+    
+    def release(self):
+        self.cap.release()
+
+
+class AdaptiveMasker:
+    """
+    Temporal mask reuse with motion gating.
+    
+    The alpha mask is recomputed (a keyframe) only when the downscaled frame
+    has drifted more than threshold from the last keyframe, or keyframe_interval
+    frames have passed. In between, the keyframe mask is shifted by the
+    translation phase correlation finds between the keyframe and the current
+    frame, so a moving avatar keeps a mask that follows it.
+    """
+    
+    def __init__(self, remove_fn, threshold=MASK_DIFF_THRESHOLD,
+                 keyframe_interval=MASK_KEYFRAME_INTERVAL):
+        self.remove_fn = remove_fn
+        self.threshold = threshold
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.recomputes = 0  # exposed for tests / logging
+        self._key_index = None
+        self._key_small = None
+        self._key_mask = None
+        self._window = None
+    
+    def _downscale(self, frame_rgb):
+        h, w = frame_rgb.shape[:2]
+        small_w = min(w, MASK_DIFF_WIDTH)
+        small_h = max(1, round(h * small_w / w))
+        gray = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2GRAY)
+        return cv2.resize(gray, (small_w, small_h), interpolation=cv2.INTER_AREA).astype(np.float32)
+    
+    def avatar_rgba(self, i, frame_rgb):
+        """RGBA for frame i: fresh matte on keyframes, tracked keyframe mask otherwise."""
+        small = self._downscale(frame_rgb)
+        if (self._key_index is None
+                or i - self._key_index >= self.keyframe_interval
+                or float(np.mean(np.abs(small - self._key_small))) > self.threshold):
+            rgba = self.remove_fn(frame_rgb)
+            self._key_index, self._key_small = i, small
+            self._key_mask = rgba[:, :, 3].copy()
+            self.recomputes += 1
+            return rgba
+        
+        h, w = frame_rgb.shape[:2]
+        if self._window is None or self._window.shape != small.shape:
+            self._window = cv2.createHanningWindow(small.shape[::-1], cv2.CV_32F)
+        (dx, dy), _ = cv2.phaseCorrelate(self._key_small, small, self._window)
+        scale = w / small.shape[1]
+        if abs(dx) < 0.05 and abs(dy) < 0.05:
+            mask = self._key_mask
+        else:
+            shift = np.float32([[1, 0, dx * scale], [0, 1, dy * scale]])
+            mask = cv2.warpAffine(self._key_mask, shift, (w, h), flags=cv2.INTER_LINEAR,
+                                  borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+        rgba = np.empty((h, w, 4), dtype=np.uint8)
+        rgba[:, :, :3] = frame_rgb
+        rgba[:, :, 3] = mask
+        return rgba
+
+
+def read_frames_rgb(cap, frame_count):
+    """Decode up to frame_count frames from a cv2 capture as RGB arrays."""
+    for _ in range(frame_count):
+        ret, frame = cap.read()
+        if not ret:
+            return
+        yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def iter_avatar_frames(cap, frame_count, method="rembg", cache_mask=True,
+                       workers=None, queue_depth=None, log_prefix="[Background]",
+                       adaptive_mask=False, mask_threshold=MASK_DIFF_THRESHOLD,
+                       mask_interval=MASK_KEYFRAME_INTERVAL):
+    """
+    Yield (i, avatar_rgba) for each input frame.
+    
+    With adaptive_mask, an AdaptiveMasker re-mattes only on motion or every
+    mask_interval frames. With cache_mask the first frame is matted and its
+    alpha reused for every later frame (the yielded RGBA buffer is reused, so
+    consume it before the next iteration). Otherwise every frame goes through
+    a MattingPipeline.
+    """
+    frames = read_frames_rgb(cap, frame_count)
+    if adaptive_mask:
+        masker = AdaptiveMasker(get_remove_fn(method), mask_threshold, mask_interval)
+        i = -1
+        for i, frame_rgb in enumerate(frames):
+            yield i, masker.avatar_rgba(i, frame_rgb)
+        print(f"{log_prefix} Adaptive mask: {masker.recomputes} recomputes over {i + 1} frames")
+        return
+    
+    if not cache_mask:
+        pipeline = MattingPipeline(method, workers=workers, queue_depth=queue_depth)
+        yield from pipeline.run(frames)
+        return
+    
+    remove_fn = get_remove_fn(method)
+    avatar_rgba = None
+    for i, frame_rgb in enumerate(frames):
+        if avatar_rgba is None:
+            avatar_rgba = remove_fn(frame_rgb)
+            cached_mask = avatar_rgba[:, :, 3].copy()
+            print(f"{log_prefix} Mask cached from frame 0")
+        else:
+            # Reuse cached alpha mask with current frame colors
+            avatar_rgba[:, :, :3] = frame_rgb
+            avatar_rgba[:, :, 3] = cached_mask
+        yield i, avatar_rgba
+
+
 def process_video(input_path, bg_path, output_path, method="rembg",
-                  effects=None, bg_is_video=False, cache_mask=True):
+                  effects=None, bg_is_video=False, cache_mask=True,
+                  workers=None, queue_depth=None, adaptive_mask=False,
+                  mask_threshold=MASK_DIFF_THRESHOLD, mask_interval=MASK_KEYFRAME_INTERVAL):
     """
     Process entire video: remove background and composite over new background.
 
@@ -425,6 +938,11 @@ def process_video(input_path, bg_path, output_path, method="rembg",
         effects: Dict of effects to apply
         bg_is_video: Whether background is a video file
         cache_mask: If True, compute mask once and reuse (faster for talking heads)
+        workers: Matting processes when cache_mask is off (default: MATTE_WORKERS)
+        queue_depth: Frames buffered ahead of / in flight in the matting pool
+        adaptive_mask: Re-matte only on motion (see AdaptiveMasker); overrides cache_mask
+        mask_threshold: Downscaled frame difference that triggers a re-matte
+        mask_interval: Re-matte at least every this many frames
     """
     import_deps()
 
@@ -436,128 +954,63 @@ def process_video(input_path, bg_path, output_path, method="rembg",
     cap = cv2.VideoCapture(input_path)
     if not cap.isOpened():
         raise RuntimeError(f"Cannot open video: {input_path}")
+    bg_reader = None
 
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    print(f"[Background] Input: {width}x{height}, {fps}fps, {frame_count} frames")
-
-    # Load background
-    if bg_is_video:
-        bg_cap = cv2.VideoCapture(bg_path)
-        if not bg_cap.isOpened():
-            raise RuntimeError(f"Cannot open background video: {bg_path}")
-        bg_frame_count = int(bg_cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    else:
-        bg_img = cv2.imread(bg_path)
-        if bg_img is None:
-            raise RuntimeError(f"Cannot load background: {bg_path}")
-        # Resize background to match input video dimensions
-        bg_img = cv2.resize(bg_img, (width, height), interpolation=cv2.INTER_LANCZOS4)
-
-    # Setup output - write to temp file first, then mux audio
-    temp_dir = tempfile.mkdtemp(prefix="ninja_bg_")
-    temp_video = os.path.join(temp_dir, "video_no_audio.mp4")
-
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    writer = cv2.VideoWriter(temp_video, fourcc, fps, (width, height))
-
-    # Background removal function
-    if method == "rembg":
-        remove_fn = remove_bg_rembg
-    elif method == "luminance":
-        remove_fn = remove_bg_luminance
-    elif method == "grabcut":
-        remove_fn = remove_bg_grabcut
-    else:
-        raise ValueError(f"Unknown method: {method}")
-
-    cached_mask = None
-    start_time = time.time()
-
-    for i in range(frame_count):
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        # Remove background
-        if cache_mask and cached_mask is not None:
-            # Reuse cached alpha mask with current frame colors
-            avatar_rgba = np.zeros((*frame_rgb.shape[:2], 4), dtype=np.uint8)
-            avatar_rgba[:, :, :3] = frame_rgb
-            avatar_rgba[:, :, 3] = cached_mask
-        else:
-            avatar_rgba = remove_fn(frame_rgb)
-            if cache_mask and i == 0:
-                # Cache the mask from first frame
-                cached_mask = avatar_rgba[:, :, 3].copy()
-                print(f"[Background] Mask cached from frame 0")
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        print(f"[Background] Input: {width}x{height}, {fps}fps, {frame_count} frames")
 
-        # Get background frame
+        # Load background
         if bg_is_video:
-            bg_idx = i % bg_frame_count
-            bg_cap.set(cv2.CAP_PROP_POS_FRAMES, bg_idx)
-            ret_bg, bg_frame = bg_cap.read()
-            if not ret_bg:
-                bg_cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                _, bg_frame = bg_cap.read()
-            bg_frame = cv2.resize(bg_frame, (width, height), interpolation=cv2.INTER_LANCZOS4)
-            bg_rgb = cv2.cvtColor(bg_frame, cv2.COLOR_BGR2RGB)
+            bg_reader = BackgroundVideoReader(bg_path, fps, (width, height))
         else:
+            bg_img = cv2.imread(bg_path)
+            if bg_img is None:
+                raise RuntimeError(f"Cannot load background: {bg_path}")
+            # Resize background to match input video dimensions
+            bg_img = cv2.resize(bg_img, (width, height), interpolation=cv2.INTER_LANCZOS4)
             bg_rgb = cv2.cvtColor(bg_img, cv2.COLOR_BGR2RGB)
 
-        # Composite
-        result = composite_frame(avatar_rgba, bg_rgb, effects)
-        result_bgr = cv2.cvtColor(result, cv2.COLOR_RGB2BGR)
-        writer.write(result_bgr)
-
-        # Progress
-        if (i + 1) % 50 == 0 or i == frame_count - 1:
-            elapsed = time.time() - start_time
-            fps_actual = (i + 1) / elapsed if elapsed > 0 else 0
-            eta = (frame_count - i - 1) / fps_actual if fps_actual > 0 else 0
-            print(f"[Background] Frame {i+1}/{frame_count} ({fps_actual:.1f} fps, ETA: {eta:.0f}s)")
-
-    cap.release()
-    writer.release()
-    if bg_is_video:
-        bg_cap.release()
+        get_remove_fn(method)  # fail on an unknown method before starting ffmpeg
+
+        compositor = FrameCompositor(effects)
+        result_bgr = None
+        start_time = time.time()
+
+        # Setup output - frames are encoded once, with the original audio muxed in
+        with FFmpegFrameWriter(output_path, width, height, fps, audio_source=input_path) as writer:
+            # Remove background (cached mask, or per-frame through the matting pipeline)
+            for i, avatar_rgba in iter_avatar_frames(cap, frame_count, method, cache_mask,
+                                                     workers=workers, queue_depth=queue_depth,
+                                                     adaptive_mask=adaptive_mask,
+                                                     mask_threshold=mask_threshold,
+                                                     mask_interval=mask_interval):
+                # Get background frame
+                if bg_reader is not None:
+                    bg_rgb = bg_reader.read(i)
+
+                # Composite
+                result = compositor.composite(avatar_rgba, bg_rgb)
+                result_bgr = cv2.cvtColor(result, cv2.COLOR_RGB2BGR, dst=result_bgr)
+                writer.write(result_bgr)
+
+                # Progress
+                if (i + 1) % 50 == 0 or i == frame_count - 1:
+                    elapsed = time.time() - start_time
+                    fps_actual = (i + 1) / elapsed if elapsed > 0 else 0
+                    eta = (frame_count - i - 1) / fps_actual if fps_actual > 0 else 0
+                    print(f"[Background] Frame {i+1}/{frame_count} ({fps_actual:.1f} fps, ETA: {eta:.0f}s)")
+    finally:
+        cap.release()
+        if bg_reader is not None:
+            bg_reader.release()
 
     elapsed = time.time() - start_time
     print(f"[Background] Video processing done in {elapsed:.1f}s")
 
-    # Mux audio from original video
-    print(f"[Background] Muxing audio...")
-    mux_cmd = [
-        "ffmpeg", "-y",
-        "-i", temp_video,
-        "-i", input_path,
-        "-c:v", "libx264", "-preset", "medium", "-crf", "18",
-        "-map", "0:v:0", "-map", "1:a:0?",
-        "-c:a", "aac", "-b:a", "128k",
-        "-shortest",
-        output_path
-    ]
-
-    result = subprocess.run(mux_cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"[Background] ffmpeg warning: {result.stderr[-500:]}")
-        # Try without audio if it fails
-        print("[Background] Retrying without audio...")
-        mux_cmd2 = [
-            "ffmpeg", "-y",
-            "-i", temp_video,
-            "-c:v", "libx264", "-preset", "medium", "-crf", "18",
-            output_path
-        ]
-        subprocess.run(mux_cmd2, check=True, capture_output=True)
-
-    # Cleanup
-    shutil.rmtree(temp_dir, ignore_errors=True)
-
     output_size = os.path.getsize(output_path)
     print(f"[Background] Output: {output_path} ({output_size // 1024}KB)")
     return output_path
@@ -603,7 +1056,9 @@ def resolve_background(bg_arg, style_arg):
 ###############################################################################
 
 def process_video_layered(input_path, scene_name, output_path, method="rembg",
-                          effects=None, cache_mask=True):
+                          effects=None, cache_mask=True, workers=None, queue_depth=None,
+                          adaptive_mask=False, mask_threshold=MASK_DIFF_THRESHOLD,
+                          mask_interval=MASK_KEYFRAME_INTERVAL):
     """
     Process video with layered scene compositing (background → avatar → foreground).
     
@@ -614,6 +1069,11 @@ def process_video_layered(input_path, scene_name, output_path, method="rembg",
         method: Background removal method
         effects: Dict of effects to apply
         cache_mask: Cache mask for faster processing
+        workers: Matting processes when cache_mask is off (default: MATTE_WORKERS)
+        queue_depth: Frames buffered ahead of / in flight in the matting pool
+        adaptive_mask: Re-matte only on motion (see AdaptiveMasker); overrides cache_mask
+        mask_threshold: Downscaled frame difference that triggers a re-matte
+        mask_interval: Re-matte at least every this many frames
     """
     import_deps()
     
@@ -635,130 +1095,71 @@ def process_video_layered(input_path, scene_name, output_path, method="rembg",
     if not cap.isOpened():
         raise RuntimeError(f"Cannot open video: {input_path}")
     
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    src_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    src_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        src_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        src_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     
-    # Output at scene resolution
-    out_width = config.get("resolution", {}).get("width", FINAL_W)
-    out_height = config.get("resolution", {}).get("height", FINAL_H)
+        # Output at scene resolution
+        out_width = config.get("resolution", {}).get("width", FINAL_W)
+        out_height = config.get("resolution", {}).get("height", FINAL_H)
     
-    print(f"[Scene] Input: {src_width}x{src_height}, {fps}fps, {frame_count} frames")
-    print(f"[Scene] Output: {out_width}x{out_height}")
+        print(f"[Scene] Input: {src_width}x{src_height}, {fps}fps, {frame_count} frames")
+        print(f"[Scene] Output: {out_width}x{out_height}")
     
-    # Load background image
-    bg_img = cv2.imread(scene["background_path"])
-    if bg_img is None:
-        raise RuntimeError(f"Cannot load background: {scene['background_path']}")
-    bg_img = cv2.resize(bg_img, (out_width, out_height), interpolation=cv2.INTER_LANCZOS4)
-    bg_rgb = cv2.cvtColor(bg_img, cv2.COLOR_BGR2RGB)
-    
-    # Load foreground image if exists
-    fg_rgba = None
-    if scene["foreground_path"]:
-        fg_img = cv2.imread(scene["foreground_path"], cv2.IMREAD_UNCHANGED)
-        if fg_img is not None:
-            fg_img = cv2.resize(fg_img, (out_width, out_height), interpolation=cv2.INTER_LANCZOS4)
-            if fg_img.shape[2] == 4:
-                fg_rgba = cv2.cvtColor(fg_img, cv2.COLOR_BGRA2RGBA)
-            else:
-                # No alpha, create full opacity
-                fg_rgba = np.zeros((out_height, out_width, 4), dtype=np.uint8)
-                fg_rgba[:, :, :3] = cv2.cvtColor(fg_img, cv2.COLOR_BGR2RGB)
-                fg_rgba[:, :, 3] = 255
-    
-    # Setup output
-    temp_dir = tempfile.mkdtemp(prefix="ninja_scene_")
-    temp_video = os.path.join(temp_dir, "video_no_audio.mp4")
-    
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    writer = cv2.VideoWriter(temp_video, fourcc, fps, (out_width, out_height))
-    
-    # Background removal function
-    if method == "rembg":
-        remove_fn = remove_bg_rembg
-    elif method == "luminance":
-        remove_fn = remove_bg_luminance
-    elif method == "grabcut":
-        remove_fn = remove_bg_grabcut
-    else:
-        raise ValueError(f"Unknown method: {method}")
+        # Load background image
+        bg_img = cv2.imread(scene["background_path"])
+        if bg_img is None:
+            raise RuntimeError(f"Cannot load background: {scene['background_path']}")
+        bg_img = cv2.resize(bg_img, (out_width, out_height), interpolation=cv2.INTER_LANCZOS4)
+        bg_rgb = cv2.cvtColor(bg_img, cv2.COLOR_BGR2RGB)
     
-    cached_mask = None
-    start_time = time.time()
+        # Load foreground image if exists
+        fg_rgba = None
+        if scene["foreground_path"]:
+            fg_img = cv2.imread(scene["foreground_path"], cv2.IMREAD_UNCHANGED)
+            if fg_img is not None:
+                fg_img = cv2.resize(fg_img, (out_width, out_height), interpolation=cv2.INTER_LANCZOS4)
+                if fg_img.shape[2] == 4:
+                    fg_rgba = cv2.cvtColor(fg_img, cv2.COLOR_BGRA2RGBA)
+                else:
+                    # No alpha, create full opacity
+                    fg_rgba = np.zeros((out_height, out_width, 4), dtype=np.uint8)
+                    fg_rgba[:, :, :3] = cv2.cvtColor(fg_img, cv2.COLOR_BGR2RGB)
+                    fg_rgba[:, :, 3] = 255
     
-    for i in range(frame_count):
-        ret, frame = cap.read()
-        if not ret:
-            break
-        
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Remove background
-        if cache_mask and cached_mask is not None:
-            avatar_rgba = np.zeros((*frame_rgb.shape[:2], 4), dtype=np.uint8)
-            avatar_rgba[:, :, :3] = frame_rgb
-            avatar_rgba[:, :, 3] = cached_mask
-        else:
-            avatar_rgba = remove_fn(frame_rgb)
-            if cache_mask and i == 0:
-                cached_mask = avatar_rgba[:, :, 3].copy()
-                print(f"[Scene] Mask cached from frame 0")
-        
-        # Layered composite
-        result = composite_frame_layered(
-            avatar_rgba, 
-            bg_rgb, 
-            foreground_rgba=fg_rgba,
-            avatar_zone=avatar_zone,
-            effects=effects
-        )
-        
-        result_bgr = cv2.cvtColor(result, cv2.COLOR_RGB2BGR)
-        writer.write(result_bgr)
-        
-        # Progress
-        if (i + 1) % 50 == 0 or i == frame_count - 1:
-            elapsed = time.time() - start_time
-            fps_actual = (i + 1) / elapsed if elapsed > 0 else 0
-            eta = (frame_count - i - 1) / fps_actual if fps_actual > 0 else 0
-            print(f"[Scene] Frame {i+1}/{frame_count} ({fps_actual:.1f} fps, ETA: {eta:.0f}s)")
+        get_remove_fn(method)  # fail on an unknown method before starting ffmpeg
     
-    cap.release()
-    writer.release()
+        compositor = SceneCompositor(bg_rgb, foreground_rgba=fg_rgba, avatar_zone=avatar_zone, effects=effects)
+        result_bgr = None
+        start_time = time.time()
+        
+        # Setup output (single encode, original audio muxed in)
+        with FFmpegFrameWriter(output_path, out_width, out_height, fps, audio_source=input_path) as writer:
+            for i, avatar_rgba in iter_avatar_frames(cap, frame_count, method, cache_mask,
+                                                     workers=workers, queue_depth=queue_depth,
+                                                     log_prefix="[Scene]",
+                                                     adaptive_mask=adaptive_mask,
+                                                     mask_threshold=mask_threshold,
+                                                     mask_interval=mask_interval):
+                # Layered composite
+                result = compositor.composite(avatar_rgba)
+                result_bgr = cv2.cvtColor(result, cv2.COLOR_RGB2BGR, dst=result_bgr)
+                writer.write(result_bgr)
+                
+                # Progress
+                if (i + 1) % 50 == 0 or i == frame_count - 1:
+                    elapsed = time.time() - start_time
+                    fps_actual = (i + 1) / elapsed if elapsed > 0 else 0
+                    eta = (frame_count - i - 1) / fps_actual if fps_actual > 0 else 0
+                    print(f"[Scene] Frame {i+1}/{frame_count} ({fps_actual:.1f} fps, ETA: {eta:.0f}s)")
+    finally:
+        cap.release()
     
     elapsed = time.time() - start_time
     print(f"[Scene] Video processing done in {elapsed:.1f}s")
     
-    # Mux audio from original video
-    print(f"[Scene] Muxing audio...")
-    mux_cmd = [
-        "ffmpeg", "-y",
-        "-i", temp_video,
-        "-i", input_path,
-        "-c:v", "libx264", "-preset", "medium", "-crf", "18",
-        "-map", "0:v:0", "-map", "1:a:0?",
-        "-c:a", "aac", "-b:a", "128k",
-        "-shortest",
-        output_path
-    ]
-    
-    result = subprocess.run(mux_cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"[Scene] ffmpeg warning: {result.stderr[-500:]}")
-        print("[Scene] Retrying without audio...")
-        mux_cmd2 = [
-            "ffmpeg", "-y",
-            "-i", temp_video,
-            "-c:v", "libx264", "-preset", "medium", "-crf", "18",
-            output_path
-        ]
-        subprocess.run(mux_cmd2, check=True, capture_output=True)
-    
-    # Cleanup
-    shutil.rmtree(temp_dir, ignore_errors=True)
-    
     output_size = os.path.getsize(output_path)
     print(f"[Scene] Output: {output_path} ({output_size // 1024}KB)")
     return output_path
@@ -866,6 +1267,16 @@ Examples:
     parser.add_argument("--no-effects", action="store_true", help="Disable all effects")
     parser.add_argument("--no-cache", action="store_true",
                         help="Don't cache mask (slower but handles moving subjects)")
+    parser.add_argument("--adaptive-mask", action="store_true",
+                        help="Re-matte only when the avatar moves (tracks the mask in between)")
+    parser.add_argument("--mask-threshold", type=float, default=MASK_DIFF_THRESHOLD,
+                        help=f"Frame difference that triggers a re-matte (default: {MASK_DIFF_THRESHOLD})")
+    parser.add_argument("--mask-interval", type=int, default=MASK_KEYFRAME_INTERVAL,
+                        help=f"Re-matte at least every N frames (default: {MASK_KEYFRAME_INTERVAL})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"Matting processes with --no-cache (default: {MATTE_WORKERS})")
+    parser.add_argument("--queue-depth", type=int, default=None,
+                        help=f"Frames buffered per pipeline stage with --no-cache (default: {MATTE_QUEUE_DEPTH})")
     parser.add_argument("--list-styles", action="store_true", help="List available background styles and scenes")
 
     # Allow --list-styles without requiring --input/--output
@@ -931,6 +1342,11 @@ def main():
             method=args.method,
             effects=effects,
             cache_mask=not args.no_cache,
+            workers=args.workers,
+            queue_depth=args.queue_depth,
+            adaptive_mask=args.adaptive_mask,
+            mask_threshold=args.mask_threshold,
+            mask_interval=args.mask_interval,
         )
         return
 
@@ -956,6 +1372,11 @@ def main():
         effects=effects,
         bg_is_video=bg_is_video,
         cache_mask=not args.no_cache,
+        workers=args.workers,
+        queue_depth=args.queue_depth,
+        adaptive_mask=args.adaptive_mask,
+        mask_threshold=args.mask_threshold,
+        mask_interval=args.mask_interval,
     )
 
 
@@ -26,17 +26,27 @@ Usage:
     
     # With thumbnail and auto-publish
     ninja-content --auto --thumbnail --publish youtube
+
+    # NDJSON progress events (stage, pct, output_path) on an inherited fd
+    ninja-content --script-file script.txt --progress-fd 3
+
+    # Keep stages in a named work dir; re-run the same command after a failure
+    # to reuse every stage whose inputs are unchanged
+    ninja-content --script-file script.txt --resume output/work/my_video
 """
 
 import argparse
+import hashlib
 import json
 import os
+import shutil
 import subprocess
 import sys
 import time
 import tempfile
 import requests
 import keyring
+from contextlib import contextmanager, suppress
 from pathlib import Path
 
 # Normalize fal.ai env var names (Swarm uses FAL_KEY, fal_client expects FAL_KEY)
@@ -48,11 +58,41 @@ elif os.environ.get('FAL_KEY') and not os.environ.get('FAL_AI_API_KEY'):
 # Add scripts directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
+from ninja_stage_cache import StageCache, file_digest  # noqa: E402
+
 # Rasengan pipeline stage emitter (fire-and-forget, never blocks)
 _RASENGAN_URL = os.environ.get("RASENGAN_URL", "http://127.0.0.1:8050")
 
+# Structured progress (--progress-fd / --progress-json): newline-delimited JSON
+# events the Dojo reads instead of scraping stdout. "t" is seconds since start.
+_progress_stream = None
+_progress_t0 = time.monotonic()
+STAGE_PCT = {"tts": 5, "avatar": 15, "broll": 70, "captions": 80, "music": 90}
+
+
+def open_progress_stream(fd=None, path=None) -> None:
+    """Route progress events to an inherited file descriptor or an NDJSON file."""
+    global _progress_stream
+    if fd is not None:
+        _progress_stream = os.fdopen(fd, "w", buffering=1)
+    elif path:
+        _progress_stream = open(path, "a", buffering=1)
+
+
+def _emit_progress(event: str, **fields) -> None:
+    """Write one progress event line. Never raises."""
+    if _progress_stream is None:
+        return
+    try:
+        record = {"event": event, "t": round(time.monotonic() - _progress_t0, 3), **fields}
+        _progress_stream.write(json.dumps(record) + "\n")
+    except (OSError, ValueError):
+        pass
+
+
 def _pipeline_stage(job_id: str, stage: str) -> None:
-    """Emit a pipeline.stage_entered event to Rasengan. Never raises."""
+    """Emit a stage progress event + pipeline.stage_entered to Rasengan. Never raises."""
+    _emit_progress("stage", stage=stage, pct=STAGE_PCT.get(stage))
     if not job_id:
         return
     try:
@@ -70,6 +110,8 @@ SCRIPT_DIR = Path(__file__).parent
 PROJECT_DIR = SCRIPT_DIR.parent
 ASSETS_DIR = PROJECT_DIR / "assets"
 OUTPUT_DIR = PROJECT_DIR / "output"
+# Resumable per-job work directories (stage artifacts + manifest.json)
+WORK_DIR = Path(os.environ.get("NINJA_WORK_DIR", OUTPUT_DIR / "work"))
 
 # Character reference image
 CHARACTER_IMAGE = ASSETS_DIR / "reference" / "ninja_pixar_user_example.mp4"  # Will extract frame
@@ -77,6 +119,16 @@ CHARACTER_IMAGE_STILL = ASSETS_DIR / "scenes" / "news_studio" / "ninja_concept.j
 
 # Config
 DEFAULT_VOICE_ID = "aQspKon0UdKOuBZQQrEE"  # Neurodivergent Ninja Remix voice (use with eleven_v3)
+ELEVENLABS_API_BASE = os.environ.get("ELEVENLABS_API_BASE", "https://api.elevenlabs.io")
+TTS_MODEL_ID = "eleven_v3"
+
+# Processed TTS audio, content-addressed by everything that affects the output
+# (text, voice, model, settings, trim/pad params) — unchanged re-renders skip ElevenLabs.
+TTS_CACHE_DIR = Path(os.environ.get("NINJA_TTS_CACHE_DIR", Path.home() / ".cache" / "ninja_tts"))
+# Entries unused for TTS_CACHE_TTL_SEC are dropped; past TTS_CACHE_MAX_BYTES the
+# least recently used go first (a hit refreshes the file's mtime)
+TTS_CACHE_TTL_SEC = float(os.environ.get("NINJA_TTS_CACHE_TTL_SEC", str(30 * 24 * 3600)))
+TTS_CACHE_MAX_BYTES = int(os.environ.get("NINJA_TTS_CACHE_MAX_MB", "512")) * 1024 * 1024
 
 
 def extract_topic_from_script(script_text: str) -> str:
@@ -287,58 +339,186 @@ def resolve_broll_clips(moments, broll_dir=None, broll_map=None, broll_clips=Non
     return moments
 
 
+# Crop-mode probe: a few tiny grayscale frames, compared in memory
+CROP_PROBE_W, CROP_PROBE_H = 96, 54
+CROP_PROBE_POINTS = (0.2, 0.4, 0.6, 0.8)   # fractions of clip duration
+STILL_MOTION_THRESHOLD = 1.5               # mean |Δ| in gray levels (0-255)
+
+
+def _probe_gray_frames(clip_path: str, duration: float):
+    """Decode one downscaled gray frame at each CROP_PROBE_POINTS offset.
+
+    Single ffmpeg run: one input-seeked read per sample point, concatenated
+    and piped out as rawvideo — no temp files. Returns an (n, H, W) uint8
+    array, or None.
+    """
+    import numpy as np
+
+    cmd = ["ffmpeg", "-v", "error"]
+    for frac in CROP_PROBE_POINTS:
+        cmd += ["-ss", f"{max(0.1, duration * frac):.3f}", "-i", clip_path]
+    chains = [
+        f"[{i}:v]trim=end_frame=1,setpts=PTS-STARTPTS,"
+        f"scale={CROP_PROBE_W}:{CROP_PROBE_H},format=gray[f{i}]"
+        for i in range(len(CROP_PROBE_POINTS))
+    ]
+    labels = "".join(f"[f{i}]" for i in range(len(CROP_PROBE_POINTS)))
+    cmd += [
+        "-filter_complex", ";".join(chains) + f";{labels}concat=n={len(CROP_PROBE_POINTS)}:v=1:a=0[v]",
+        "-map", "[v]", "-vsync", "passthrough",  # keep every sample; cfr would drop some
+        "-f", "rawvideo", "-pix_fmt", "gray", "pipe:1",
+    ]
+    result = subprocess.run(cmd, capture_output=True, timeout=10)
+    frame_bytes = CROP_PROBE_W * CROP_PROBE_H
+    n = len(result.stdout) // frame_bytes
+    if result.returncode != 0 or n < 2:
+        return None
+    return np.frombuffer(result.stdout[:n * frame_bytes], dtype=np.uint8).reshape(n, CROP_PROBE_H, CROP_PROBE_W)
+
+
 def _detect_crop_mode(clip_path: str) -> str:
     """Detect whether a B-roll clip is a still image/UI screenshot or real footage.
 
     Returns "ui_crop" for stills/low-motion (menus, screenshots, slides) or
     "center" for gameplay/cinematics with actual motion.
+
+    Samples a few tiny gray frames (see _probe_gray_frames), drops letterbox /
+    pillarbox bars — rows and columns that stay dark with ~zero variance in
+    every sample — and measures frame-to-frame change over what remains, so
+    black bars don't dilute the motion score.
     """
     try:
-        # Quick motion check: extract 2 frames and compare file sizes
-        with tempfile.TemporaryDirectory() as td:
-            probe = subprocess.run([
-                "ffprobe", "-v", "quiet", "-show_entries", "format=duration",
-                "-of", "csv=p=0", clip_path
-            ], capture_output=True, text=True, timeout=10)
-            try:
-                duration = float(probe.stdout.strip())
-            except (ValueError, AttributeError):
-                return "center"
-
-            if duration < 0.5:
-                return "center"
-
-            t1 = max(0.1, duration * 0.2)
-            t2 = max(0.2, duration * 0.8)
-            f1 = os.path.join(td, "a.jpg")
-            f2 = os.path.join(td, "b.jpg")
-            for ts, fp in [(t1, f1), (t2, f2)]:
-                subprocess.run([
-                    "ffmpeg", "-y", "-ss", str(ts), "-i", clip_path,
-                    "-vframes", "1", "-q:v", "2", fp
-                ], capture_output=True, timeout=10)
-
-            if os.path.exists(f1) and os.path.exists(f2):
-                s1 = os.path.getsize(f1)
-                s2 = os.path.getsize(f2)
-                if max(s1, s2) == 0:
-                    return "center"
-                size_ratio = min(s1, s2) / max(s1, s2)
-                if size_ratio > 0.95:
-                    return "ui_crop"
+        probe = subprocess.run([
+            "ffprobe", "-v", "quiet", "-show_entries", "format=duration",
+            "-of", "csv=p=0", clip_path
+        ], capture_output=True, text=True, timeout=10)
+        try:
+            duration = float(probe.stdout.strip())
+        except (ValueError, AttributeError):
+            return "center"
+
+        if duration < 0.5:
+            return "center"
+
+        frames = _probe_gray_frames(clip_path, duration)
+        if frames is None:
+            return "center"
+        frames = frames.astype("float32")
+
+        # Border bars: near-black and flat across all samples
+        rows = (frames.mean(axis=(0, 2)) > 16) | (frames.std(axis=(0, 2)) > 4)
+        cols = (frames.mean(axis=(0, 1)) > 16) | (frames.std(axis=(0, 1)) > 4)
+        if not rows.any() or not cols.any():
+            return "center"
+        active = frames[:, rows][:, :, cols]
+
+        motion = max(abs(active[i + 1] - active[i]).mean() for i in range(len(active) - 1))
+        if motion < STILL_MOTION_THRESHOLD:
+            return "ui_crop"
     except Exception:
         pass
     return "center"
 
 
+def _broll_vf(width, height, dur, crop_mode, fps="30"):
+    """Scale/crop filter that fits a B-roll clip into the avatar frame."""
+    if height > width:
+        if crop_mode == "ui_crop":
+            # UI screenshot: scale to fill height, then horizontal pan left→right
+            # so the viewer sees the full 16:9 content at readable zoom
+            return (
+                f"scale=-1:{height},"
+                f"crop={width}:{height}:'(iw-{width})*t/{dur}':0,"
+                f"fps={fps}"
+            )
+        # Standard center-crop for gameplay/cinematics
+        return f"scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height},fps={fps}"
+    # Landscape — scale+pad (preserve letterbox)
+    return f"scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:-1:-1,fps={fps}"
+
+
+# Set NINJA_BROLL_SINGLE_PASS=0 to force the per-segment assembly path
+BROLL_SINGLE_PASS = os.environ.get("NINJA_BROLL_SINGLE_PASS", "1") != "0"
+
+
 def assemble_with_broll(avatar_video, moments, output_path, crossfade=0.15):
     """Cut avatar video at B-roll timestamps and splice in B-roll clips.
 
     Audio plays continuously from the original avatar video over everything.
     B-roll replaces avatar frames (doesn't add time).
+
+    Tries a single filter_complex encode first; if ffmpeg rejects the graph
+    (odd inputs, missing streams) it falls back to the per-segment path.
     """
     print(f"🎬 Assembling video with {len(moments)} B-roll cutaways...")
 
+    if BROLL_SINGLE_PASS:
+        if _assemble_with_broll_single_pass(avatar_video, moments, output_path):
+            return True
+        print("   ⚠️ Single-pass assembly failed, falling back to per-segment encode")
+    return _assemble_with_broll_segments(avatar_video, moments, output_path)
+
+
+def _assemble_with_broll_single_pass(avatar_video, moments, output_path):
+    """One ffmpeg run: overlay B-roll onto the avatar timeline and mux its audio.
+
+    The avatar is decoded once as the base layer; each clip is shifted to its
+    timestamp and shown via overlay enable=between(t, start, end). Frames are
+    encoded exactly once and nothing is written besides output_path. (A
+    trim+concat graph needs every span open at once and buffers frames for
+    the not-yet-reached spans — memory grows with video length.)
+    """
+    probe = subprocess.run([
+        "ffprobe", "-v", "quiet", "-select_streams", "v:0",
+        "-show_entries", "stream=width,height,r_frame_rate:format=duration",
+        "-of", "json", avatar_video
+    ], capture_output=True, text=True)
+    try:
+        info = json.loads(probe.stdout)
+        stream = info["streams"][0]
+        width, height = int(stream["width"]), int(stream["height"])
+        fps = stream.get("r_frame_rate") or "30"
+        avatar_dur = float(info["format"]["duration"])
+    except (ValueError, KeyError, IndexError, TypeError):
+        return False
+
+    inputs = ["-i", avatar_video]
+    filters = [f"[0:v]fps={fps},setsar=1[base]"]
+    prev = "base"
+    for i, m in enumerate(moments):
+        ts, dur = m["timestamp"], m["duration"]
+        vf = _broll_vf(width, height, dur, m.get("crop_mode", "center"), fps)
+        inputs += ["-i", m["clip_path"]]
+        # Reset to t=0 before scaling (ui_crop pans on t), then shift onto the timeline
+        filters.append(
+            f"[{i + 1}:v]trim=duration={dur},setpts=PTS-STARTPTS,{vf},setsar=1,"
+            f"setpts=PTS+{ts}/TB[b{i}]"
+        )
+        out = "v" if i == len(moments) - 1 else f"o{i}"
+        filters.append(
+            f"[{prev}][b{i}]overlay=enable='between(t,{ts},{ts + dur})':eof_action=pass[{out}]"
+        )
+        prev = out
+    if not moments:
+        filters[-1] = filters[-1].replace("[base]", "[v]")
+
+    result = subprocess.run([
+        "ffmpeg", "-y", *inputs,
+        "-filter_complex", ";".join(filters),
+        "-map", "[v]", "-map", "0:a:0",
+        "-c:v", "libx264", "-crf", "18", "-preset", "fast",
+        "-c:a", "aac", "-b:a", "192k",
+        "-shortest",
+        output_path
+    ], capture_output=True)
+    if result.returncode != 0 or not Path(output_path).exists():
+        return False
+    print(f"   ✅ Assembled: {output_path} ({avatar_dur:.1f}s, single pass)")
+    return True
+
+
+def _assemble_with_broll_segments(avatar_video, moments, output_path):
+    """Per-segment fallback: encode each span to a temp file, concat, then mux audio."""
     with tempfile.TemporaryDirectory() as tmpdir:
         tmpdir = Path(tmpdir)
 
@@ -383,22 +563,7 @@ def assemble_with_broll(avatar_video, moments, output_path, crossfade=0.15):
 
             # B-roll segment (scaled to match avatar dimensions)
             broll_file = tmpdir / f"broll_{i}.mp4"
-            crop_mode = m.get("crop_mode", "center")
-            if height > width:
-                if crop_mode == "ui_crop":
-                    # UI screenshot: scale to fill height, then horizontal pan left→right
-                    # so the viewer sees the full 16:9 content at readable zoom
-                    broll_vf = (
-                        f"scale=-1:{height},"
-                        f"crop={width}:{height}:'(iw-{width})*t/{dur}':0,"
-                        f"fps=30"
-                    )
-                else:
-                    # Standard center-crop for gameplay/cinematics
-                    broll_vf = f"scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height},fps=30"
-            else:
-                # Landscape — scale+pad (preserve letterbox)
-                broll_vf = f"scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:-1:-1,fps=30"
+            broll_vf = _broll_vf(width, height, dur, m.get("crop_mode", "center"))
             subprocess.run([
                 "ffmpeg", "-y", "-i", clip_path,
                 "-t", str(dur),
@@ -585,10 +750,85 @@ def inject_expressive_tags(script_text):
     return '\n'.join(tagged_lines)
 
 
+# Shorten gaps >0.6s down to 0.3s: strip only the excess portion of long silences,
+# keeping natural breathing room but cutting dead air.
+TTS_SILENCE_FILTER = (
+    "silenceremove="
+    "stop_periods=-1:"
+    "stop_duration=0.6:"       # Only touch silences longer than 0.6s
+    "stop_threshold=-35dB:"    # Conservative threshold
+    "stop_silence=0.3"         # Leave 0.3s of silence in place
+)
+
+
+def _tts_filter_chain(pad_start):
+    """Single -af chain: trim long pauses, then pad the start (prevents first-word cutoff)."""
+    filters = [TTS_SILENCE_FILTER]
+    if pad_start > 0:
+        delay_ms = int(pad_start * 1000)
+        filters.append(f"adelay={delay_ms}|{delay_ms},apad=pad_dur={pad_start}")
+    return ",".join(filters)
+
+
+def _tts_cache_path(text, voice_id, model_id, voice_settings, filter_chain):
+    key = json.dumps({
+        "text": text,
+        "voice_id": voice_id,
+        "model_id": model_id,
+        "voice_settings": voice_settings,
+        "filters": filter_chain,
+    }, sort_keys=True)
+    return TTS_CACHE_DIR / f"{hashlib.sha256(key.encode()).hexdigest()}.mp3"
+
+
+def _store_tts_cache(output_path, cache_path):
+    """Copy processed audio into the cache (write-then-rename), then prune it."""
+    TTS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Unique per writer: TTS runs on threads, so two turns can fill one key at once
+    with tempfile.NamedTemporaryFile(dir=TTS_CACHE_DIR, prefix=cache_path.stem + ".",
+                                     suffix=".tmp", delete=False) as tmp:
+        tmp_cache = tmp.name
+    try:
+        shutil.copyfile(output_path, tmp_cache)
+        os.replace(tmp_cache, cache_path)
+    except OSError:
+        with suppress(OSError):
+            os.remove(tmp_cache)
+        raise
+    _prune_tts_cache()
+
+
+def _prune_tts_cache():
+    """Drop expired entries, then the least recently used ones past TTS_CACHE_MAX_BYTES."""
+    now = time.time()
+    entries = []
+    for path in TTS_CACHE_DIR.glob("*.mp3"):
+        try:
+            st = path.stat()
+        except FileNotFoundError:  # pruned by a concurrent writer
+            continue
+        if now - st.st_mtime > TTS_CACHE_TTL_SEC:
+            with suppress(FileNotFoundError):
+                path.unlink()
+        else:
+            entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda e: e[0]):
+        if total <= TTS_CACHE_MAX_BYTES:
+            break
+        with suppress(FileNotFoundError):
+            path.unlink()
+        total -= size
+
+
 def generate_tts(script_text, output_path, voice_id=DEFAULT_VOICE_ID, pad_start=0.5,
                  voice_style="expressive"):
     """Generate TTS audio using ElevenLabs with Expressive Mode support.
 
+    The processed audio is cached under TTS_CACHE_DIR, keyed by a hash of the
+    tagged text, voice, model, voice settings and trim/pad filters, so an
+    unchanged re-render makes no HTTP call and runs no ffmpeg.
+
     Args:
         voice_style: Expressiveness preset:
             "expressive" (default) - High energy, emotional range (style=0.8, stability=0.3)
@@ -614,20 +854,31 @@ def generate_tts(script_text, output_path, voice_id=DEFAULT_VOICE_ID, pad_start=
     if tagged_text != script_text:
         print("   🎭 Injected expressive audio tags")
 
+    filter_chain = _tts_filter_chain(pad_start)
+    cache_path = _tts_cache_path(tagged_text, voice_id, TTS_MODEL_ID, voice_settings, filter_chain)
+    try:
+        if cache_path.stat().st_size > 0:
+            shutil.copyfile(cache_path, output_path)
+            os.utime(cache_path)  # most recently used — last to be pruned
+            print(f"   ♻️  TTS cache hit: {cache_path.name}")
+            return output_path
+    except FileNotFoundError:  # miss, or pruned between stat and copy
+        pass
+
     keys = get_api_keys()
     if not keys['elevenlabs']:
         print("   ❌ ElevenLabs API key not found")
         return None
 
     response = requests.post(
-        f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}",
+        f"{ELEVENLABS_API_BASE}/v1/text-to-speech/{voice_id}",
         headers={
             "xi-api-key": keys['elevenlabs'],
             "Content-Type": "application/json"
         },
         json={
             "text": tagged_text,
-            "model_id": "eleven_v3",
+            "model_id": TTS_MODEL_ID,
             "voice_settings": voice_settings
         }
     )
@@ -637,46 +888,27 @@ def generate_tts(script_text, output_path, voice_id=DEFAULT_VOICE_ID, pad_start=
         raw_path = output_path + ".raw.mp3"
         with open(raw_path, "wb") as f:
             f.write(response.content)
-        
-        # Step 1: Trim excessive silences (shorten gaps >0.6s down to 0.3s)
-        compressed_path = output_path + ".compressed.mp3"
-        print(f"   🔇 Trimming long pauses (>0.6s → 0.3s)...")
-        # Use silenceremove to strip only the excess portion of long silences
-        # Keep natural breathing room but cut dead air
-        subprocess.run([
+
+        # One ffmpeg pass: trim long pauses (>0.6s → 0.3s) + start padding
+        print(f"   🔇 Trimming long pauses (>0.6s → 0.3s), adding {pad_start}s padding at start...")
+        result = subprocess.run([
             "ffmpeg", "-y",
             "-i", raw_path,
-            "-af", (
-                "silenceremove="
-                "stop_periods=-1:"
-                "stop_duration=0.6:"       # Only touch silences longer than 0.6s
-                "stop_threshold=-35dB:"    # Conservative threshold
-                "stop_silence=0.3"         # Leave 0.3s of silence in place
-            ),
+            "-af", filter_chain,
             "-c:a", "libmp3lame", "-q:a", "2",
-            compressed_path
+            output_path
         ], capture_output=True)
-        
-        # Step 2: Add padding at start to prevent first word cutoff
-        source = compressed_path if os.path.exists(compressed_path) else raw_path
-        if pad_start > 0:
-            print(f"   🔇 Adding {pad_start}s padding at start...")
-            delay_ms = int(pad_start * 1000)
-            subprocess.run([
-                "ffmpeg", "-y",
-                "-i", source,
-                "-af", f"adelay={delay_ms}|{delay_ms},apad=pad_dur={pad_start}",
-                "-c:a", "libmp3lame", "-q:a", "2",
-                output_path
-            ], capture_output=True)
+        if result.returncode != 0 or not os.path.exists(output_path):
+            print("   ⚠️ Audio post-processing failed, using raw TTS audio")
+            os.replace(raw_path, output_path)
         else:
-            os.rename(source, output_path)
-        
-        # Cleanup temp files
-        for tmp in [raw_path, compressed_path]:
-            if os.path.exists(tmp) and tmp != output_path:
-                os.remove(tmp)
-        
+            os.remove(raw_path)
+            # Cache only fully processed audio (write-then-rename so readers never see partial files)
+            try:
+                _store_tts_cache(output_path, cache_path)
+            except OSError as e:
+                print(f"   ⚠️ Could not write TTS cache: {e}")
+
         size = os.path.getsize(output_path)
         print(f"   ✅ Audio saved: {output_path} ({size/1024:.0f}KB)")
         return output_path
@@ -1023,8 +1255,28 @@ def combine_video_audio(video_path, audio_path, output_path):
     return output_path
 
 
+CAPTION_WHISPER_MODEL = "tiny"
+
+
+def warm_caption_model():
+    """Start loading the caption Whisper model in the background.
+
+    Called when a run will burn captions, so the load overlaps TTS / avatar
+    generation instead of sitting in front of burn_captions.
+    """
+    try:
+        from ninja_synced_captions import warm_up
+    except ImportError:
+        return None
+    return warm_up(CAPTION_WHISPER_MODEL)
+
+
 def burn_captions(video_path, script_text, output_path, audio_path=None, style="animated"):
-    """Burn animated Instagram-style captions into video using Whisper word sync."""
+    """Burn animated Instagram-style captions into video using Whisper word sync.
+
+    The Whisper model comes from ninja_synced_captions' process-wide cache, so
+    repeated caption jobs in one process load it once.
+    """
     print(f"📝 Burning {style} captions...")
     
     # Prefer Whisper-synced captions for accurate word-by-word highlighting
@@ -1033,7 +1285,8 @@ def burn_captions(video_path, script_text, output_path, audio_path=None, style="
             from ninja_synced_captions import burn_synced_captions
             print("   🎙️ Using Whisper word-sync for accurate timing...")
             # Pass original script to avoid transcription errors (e.g., 'Genie' -> 'G & E')
-            burn_synced_captions(video_path, audio_path, output_path, model_size="tiny", original_script=script_text)
+            burn_synced_captions(video_path, audio_path, output_path, model_size=CAPTION_WHISPER_MODEL,
+                                 original_script=script_text)
             print(f"   ✅ Synced captions burned: {output_path}")
             return output_path
         except Exception as e:
@@ -1431,9 +1684,44 @@ def generate_capcut_draft(video_path, audio_path, broll_clips, captions_srt, out
     return draft_id
 
 
-def run_pipeline(script_text, reference_image=None, output_name="ninja_content", multiclip=False, no_music=False, no_captions=True, broll=False, capcut=False, lip_sync=True, kenburns=False, motion=False, kling_model="standard", broll_dir=None, broll_map=None, broll_clips=None, broll_count=4, broll_duration=10.0, voice_style="expressive"):
+def default_job_dir(output_name):
+    """A fresh work dir per run, so concurrent runs of one output_name never share (or delete) it."""
+    WORK_DIR.mkdir(parents=True, exist_ok=True)
+    return Path(tempfile.mkdtemp(prefix=f"{output_name}_", dir=WORK_DIR))
+
+
+@contextmanager
+def _job_work_dir(job_dir, keep_on_failure=False):
+    """Yield a StageCache for job_dir, removing the directory when the run ends.
+
+    With keep_on_failure (the caller named the dir via job_dir / --resume) a
+    failed or interrupted run leaves its completed stages behind, so the same
+    `--resume <job_dir>` picks up at the first stage whose key changed or whose
+    artifact is missing. Throwaway default dirs are always removed, so failed
+    runs nobody will resume don't pile up under WORK_DIR.
+    """
+    cache = StageCache(job_dir)
+    print(f"📁 Work dir: {cache.job_dir}")
+    try:
+        yield cache
+    finally:
+        if cache.finished or not keep_on_failure:
+            shutil.rmtree(cache.job_dir, ignore_errors=True)
+        else:
+            print(f"💾 Completed stages kept — resume with: --resume {cache.job_dir}")
+
+
+def run_pipeline(script_text, reference_image=None, output_name="ninja_content", multiclip=False, no_music=False, no_captions=True, broll=False, capcut=False, lip_sync=True, kenburns=False, motion=False, kling_model="standard", broll_dir=None, broll_map=None, broll_clips=None, broll_count=4, broll_duration=10.0, voice_style="expressive", job_dir=None):
     """Run the full content pipeline.
     
+    Stage artifacts live in a per-job work directory (job_dir, default a
+    fresh WORK_DIR/<output_name>_* dir) with a manifest of stage cache keys,
+    so a re-run with the same job_dir skips every stage whose inputs are
+    unchanged. Keys chain off the digest of the upstream artifact, so a
+    regenerated upstream stage invalidates everything built from it. The
+    directory is removed once the final output is written; a default dir is
+    removed after a failure too, a caller-supplied job_dir is kept to resume.
+
     Args:
         lip_sync: If True (default), use Kling Avatar for lip-synced video.
                   If False, use Veo looping background video.
@@ -1458,14 +1746,22 @@ def run_pipeline(script_text, reference_image=None, output_name="ninja_content",
         if len(parts) >= 3:
             _job_id = parts[2]  # the 8-char job_id prefix
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmpdir = Path(tmpdir)
+    if not no_captions and not capcut:
+        warm_caption_model()
+
+    with _job_work_dir(job_dir or default_job_dir(output_name), keep_on_failure=job_dir is not None) as cache:
+        workdir = cache.job_dir
 
         # 1. Generate TTS
         _pipeline_stage(_job_id, "tts")
-        audio_path = tmpdir / "voice.mp3"
-        if not generate_tts(script_text, str(audio_path), voice_style=voice_style):
-            return None
+        audio_path = workdir / "voice.mp3"
+        tts_key = cache.key("tts", None, script=script_text, voice_id=DEFAULT_VOICE_ID,
+                            voice_style=voice_style)
+        if not cache.hit("tts", tts_key, audio_path):
+            if not generate_tts(script_text, str(audio_path), voice_style=voice_style):
+                return None
+            cache.record("tts", tts_key, audio_path)
+        audio_digest = file_digest(audio_path)
         
         audio_duration = get_audio_duration(str(audio_path))
         print(f"   Audio duration: {audio_duration:.1f}s")
@@ -1476,13 +1772,17 @@ def run_pipeline(script_text, reference_image=None, output_name="ninja_content",
             # Generates lip-synced video directly from image + audio
             # No looping needed - video matches audio duration perfectly
             _pipeline_stage(_job_id, "avatar")
-            lip_sync_video = tmpdir / "lip_sync_video.mp4"
+            lip_sync_video = workdir / "lip_sync_video.mp4"
             
             if not reference_image or not Path(reference_image).exists():
                 print("   ❌ Lip-sync requires a reference image (--image)")
                 return None
             
-            if not generate_kling_avatar_video(
+            video_key = cache.key("avatar", audio_digest, mode="lip_sync", kling_model=kling_model,
+                                  image=file_digest(reference_image))
+            if cache.hit("avatar", video_key, lip_sync_video):
+                pass
+            elif not generate_kling_avatar_video(
                 reference_image, 
                 str(audio_path), 
                 str(lip_sync_video),
@@ -1492,20 +1792,30 @@ def run_pipeline(script_text, reference_image=None, output_name="ninja_content",
                 print("   💡 Tip: Re-run the command to retry Kling.")
                 return None
             else:
-                # Lip-sync video already has audio baked in!
-                # Skip straight to captions
-                combined = lip_sync_video
-
-                # B-roll cutaways for lip-sync mode
-                if broll:
-                    _pipeline_stage(_job_id, "broll")
+                cache.record("avatar", video_key, lip_sync_video)
+
+            # Lip-sync video already has audio baked in!
+            # Skip straight to captions
+            combined = lip_sync_video
+
+            # B-roll cutaways for lip-sync mode
+            if broll:
+                _pipeline_stage(_job_id, "broll")
+                broll_out = workdir / "with_broll.mp4"
+                broll_key = cache.key("broll", file_digest(combined), count=broll_count, duration=broll_duration,
+                                      broll_dir=broll_dir, broll_map=broll_map, broll_clips=broll_clips)
+                if cache.hit("broll", broll_key, broll_out):
+                    combined = broll_out
+                    # SFX layer reads the cut points from here when enabled
+                    moments = cache.get("broll", "moments", [])
+                else:
                     print("\n🎬 Adding B-roll cutaways to lip-sync video...")
                     moments = identify_broll_moments(script_text, audio_duration, broll_count, broll_duration)
                     moments = resolve_broll_clips(moments, broll_dir, broll_map, broll_clips)
                     valid = [m for m in moments if 'clip_path' in m]
                     if valid:
-                        broll_out = tmpdir / "with_broll.mp4"
                         if assemble_with_broll(str(combined), valid, str(broll_out)):
+                            cache.record("broll", broll_key, broll_out, moments=moments)
                             combined = broll_out
                             print(f"   ✅ Inserted {len(valid)} B-roll cutaways")
                         else:
@@ -1523,11 +1833,15 @@ def run_pipeline(script_text, reference_image=None, output_name="ninja_content",
                 return None
             
             print("🎬 Using Ken Burns effect (no lip-sync)...")
-            kenburns_video = tmpdir / "kenburns_video.mp4"
-            kenburns_with_audio = tmpdir / "kenburns_with_audio.mp4"
+            kenburns_video = workdir / "kenburns_video.mp4"
+            kenburns_with_audio = workdir / "kenburns_with_audio.mp4"
+            video_key = cache.key("avatar", audio_digest, mode="kenburns",
+                                  image=file_digest(reference_image))
             
             # Generate Ken Burns effect matching audio duration
-            if not generate_kenburns_video(
+            if cache.hit("avatar", video_key, kenburns_with_audio):
+                pass
+            elif not generate_kenburns_video(
                 reference_image,
                 str(kenburns_video),
                 audio_duration,
@@ -1537,13 +1851,15 @@ def run_pipeline(script_text, reference_image=None, output_name="ninja_content",
                 return None
             
             # Add audio track
-            if not add_audio_to_video(
+            elif not add_audio_to_video(
                 str(kenburns_video),
                 str(audio_path),
                 str(kenburns_with_audio)
             ):
                 print("   ❌ Failed to add audio to Ken Burns video")
                 return None
+            else:
+                cache.record("avatar", video_key, kenburns_with_audio)
             
             combined = kenburns_with_audio
         
@@ -1558,52 +1874,60 @@ def run_pipeline(script_text, reference_image=None, output_name="ninja_content",
                 return None
             
             print("🎬 Using Kling motion animation (no lip-sync)...")
-            motion_video = tmpdir / "motion_video.mp4"
-            motion_looped = tmpdir / "motion_looped.mp4"
-            motion_with_audio = tmpdir / "motion_with_audio.mp4"
+            motion_video = workdir / "motion_video.mp4"
+            motion_looped = workdir / "motion_looped.mp4"
+            motion_with_audio = workdir / "motion_with_audio.mp4"
+            video_key = cache.key("avatar", audio_digest, mode="motion",
+                                  image=file_digest(reference_image))
             
-            # Generate 5s motion clip (will be looped)
-            if not generate_motion_video(
-                reference_image,
-                str(motion_video),
-                duration=5
-            ):
-                print("   ❌ Motion video generation failed")
-                return None
-            
-            # Loop to match audio duration
-            loop_video_to_duration(str(motion_video), audio_duration, str(motion_looped))
-            
-            # Add audio track
-            if not add_audio_to_video(
-                str(motion_looped),
-                str(audio_path),
-                str(motion_with_audio)
-            ):
-                print("   ❌ Failed to add audio to motion video")
-                return None
+            if not cache.hit("avatar", video_key, motion_with_audio):
+                # Generate 5s motion clip (will be looped)
+                if not generate_motion_video(
+                    reference_image,
+                    str(motion_video),
+                    duration=5
+                ):
+                    print("   ❌ Motion video generation failed")
+                    return None
+                
+                # Loop to match audio duration
+                loop_video_to_duration(str(motion_video), audio_duration, str(motion_looped))
+                
+                # Add audio track
+                if not add_audio_to_video(
+                    str(motion_looped),
+                    str(audio_path),
+                    str(motion_with_audio)
+                ):
+                    print("   ❌ Failed to add audio to motion video")
+                    return None
+                cache.record("avatar", video_key, motion_with_audio)
             
             combined = motion_with_audio
         
         if not lip_sync and not kenburns and not motion:
             # === VEO MODE: Generate background video and loop ===
-            if multiclip:
-                # Import and use multi-clip generator
-                from ninja_multiclip import generate_multiclip
+            looped_video = workdir / "looped_video.mp4"
+            video_key = cache.key("avatar", audio_digest, mode="veo", multiclip=multiclip,
+                                  image=file_digest(reference_image))
+            if not cache.hit("avatar", video_key, looped_video):
+                if multiclip:
+                    # Import and use multi-clip generator
+                    from ninja_multiclip import generate_multiclip
                 
-                # Calculate how many clips we need (8s each, want ~30s unique)
-                num_clips = min(4, max(2, int(audio_duration / 8) + 1))
-                print(f"🎬 Generating {num_clips} varied clips for more natural movement...")
+                    # Calculate how many clips we need (8s each, want ~30s unique)
+                    num_clips = min(4, max(2, int(audio_duration / 8) + 1))
+                    print(f"🎬 Generating {num_clips} varied clips for more natural movement...")
                 
-                raw_video = tmpdir / "raw_video.mp4"
-                # Use Vertex AI for higher rate limits
-                if not generate_multiclip(reference_image, str(raw_video), num_clips, use_vertex=True):
-                    print("   ⚠️ Multi-clip failed, falling back to single clip...")
-                    multiclip = False
+                    raw_video = workdir / "raw_video.mp4"
+                    # Use Vertex AI for higher rate limits
+                    if not generate_multiclip(reference_image, str(raw_video), num_clips, use_vertex=True):
+                        print("   ⚠️ Multi-clip failed, falling back to single clip...")
+                        multiclip = False
             
-            if not multiclip:
-                # Single clip mode
-                video_prompt = """Animate this 3D Pixar-style ninja character at the tech news desk.
+                if not multiclip:
+                    # Single clip mode
+                    video_prompt = """Animate this 3D Pixar-style ninja character at the tech news desk.
 CONTINUOUS SEAMLESS IDLE LOOP: Character breathes naturally, subtle rhythmic body sway,
 periodic slow eye blinks, gentle micro-movements that flow smoothly and loop seamlessly.
 Head perfectly still, eyes locked on camera, facing directly forward throughout.
@@ -1611,16 +1935,16 @@ Professional news anchor posture. Animation must START and END in identical neut
 for seamless looping. Smooth Pixar-quality animation with no pauses or freezes.
 Camera locked in static medium shot. No camera movement. Studio background unchanged."""
                 
-                raw_video = tmpdir / "raw_video.mp4"
-                # Request short clip to create multiple loops → more B-roll insertion points
-                # Veo minimum is 4s. A 4s clip looped for ~40s audio = ~10 loops = many seams for B-roll
-                veo_clip_duration = 4
-                if not generate_veo_video(video_prompt, veo_clip_duration, str(raw_video), reference_image):
-                    return None
+                    raw_video = workdir / "raw_video.mp4"
+                    # Request short clip to create multiple loops → more B-roll insertion points
+                    # Veo minimum is 4s. A 4s clip looped for ~40s audio = ~10 loops = many seams for B-roll
+                    veo_clip_duration = 4
+                    if not generate_veo_video(video_prompt, veo_clip_duration, str(raw_video), reference_image):
+                        return None
             
-            # 3. Loop video to match audio (muted for CapCut, with audio for normal)
-            looped_video = tmpdir / "looped_video.mp4"
-            loop_video_to_duration(str(raw_video), audio_duration, str(looped_video))
+                # 3. Loop video to match audio (muted for CapCut, with audio for normal)
+                loop_video_to_duration(str(raw_video), audio_duration, str(looped_video))
+                cache.record("avatar", video_key, looped_video)
         
         # 6. Veo B-roll cutaways — only for non-lip-sync mode (Veo looping background)
         # In lip-sync mode, file-based B-roll was already assembled above via assemble_with_broll
@@ -1629,7 +1953,7 @@ Camera locked in static medium shot. No camera movement. Studio background uncha
             from ninja_broll_veo import generate_broll_clips  # Veo-generated video B-roll
 
             print("\n🎬 Generating B-roll cutaways...")
-            broll_dir = tmpdir / "broll"
+            broll_dir = workdir / "broll"
             broll_clips = generate_broll_clips(script_text, str(broll_dir), num_clips=4)
 
             if broll_clips:
@@ -1682,6 +2006,7 @@ Camera locked in static medium shot. No camera movement. Studio background uncha
                 print(f"   - {len(final_broll)} B-roll clips")
             print("="*60 + "\n")
             
+            cache.finished = True
             return str(capcut_dir)
         
         # Normal mode: burn captions and composite
@@ -1693,7 +2018,7 @@ Camera locked in static medium shot. No camera movement. Studio background uncha
         elif kenburns or motion:
             pass  # combined already set with audio in their respective blocks
         else:
-            combined = tmpdir / "combined.mp4"
+            combined = workdir / "combined.mp4"
             combine_video_audio(str(looped_video), str(audio_path), str(combined))
         
         # 5. Burn captions (optional - skipped by default)
@@ -1701,15 +2026,20 @@ Camera locked in static medium shot. No camera movement. Studio background uncha
             print("📝 Skipping captions (--no-captions)")
             video_for_broll = combined
         else:
-            captioned = tmpdir / "captioned.mp4"
-            burn_captions(str(combined), script_text, str(captioned), audio_path=str(audio_path))
+            _pipeline_stage(_job_id, "captions")
+            captioned = workdir / "captioned.mp4"
+            captions_key = cache.key("captions", file_digest(combined), script=script_text)
+            if not cache.hit("captions", captions_key, captioned):
+                burn_captions(str(combined), script_text, str(captioned), audio_path=str(audio_path))
+                if captioned.exists():
+                    cache.record("captions", captions_key, captioned)
             video_for_broll = captioned
         
         # Composite B-roll if generated
         video_for_music = video_for_broll
         if broll_paths:
             from ninja_broll_compositor import compose_with_broll
-            broll_composed = tmpdir / "with_broll.mp4"
+            broll_composed = workdir / "with_broll.mp4"
             # Pass the base clip duration so compositor knows where loop seams are
             base_clip_dur = 4.0  # Matches veo_clip_duration set earlier
             if compose_with_broll(str(video_for_broll), broll_paths, str(broll_composed), 
@@ -1724,13 +2054,14 @@ Camera locked in static medium shot. No camera movement. Studio background uncha
         # To re-enable: uncomment below and add ~0.3s padding to first cue in add_sfx_layer()
         # _broll_moments = locals().get("moments", None)
         # if _broll_moments or script_text:
-        #     sfx_out = tmpdir / "with_sfx.mp4"
+        #     sfx_out = workdir / "with_sfx.mp4"
         #     add_sfx_layer(str(video_for_sfx), str(sfx_out),
         #                   broll_moments=_broll_moments, script_text=script_text)
         #     if sfx_out.exists() and sfx_out.stat().st_size > 0:
         #         video_for_sfx = sfx_out
 
         # 8. Add background music
+        _pipeline_stage(_job_id, "music")
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         final_output = OUTPUT_DIR / f"{output_name}_{timestamp}.mp4"
 
@@ -1742,6 +2073,8 @@ Camera locked in static medium shot. No camera movement. Studio background uncha
         else:
             add_background_music(str(video_for_sfx), str(final_output))
         
+        cache.finished = True
+        _emit_progress("done", pct=100, output_path=str(final_output))
         print("\n" + "="*60)
         print(f"✅ DONE! Output: {final_output}")
         print(f"   Size: {final_output.stat().st_size / 1024:.0f}KB")
@@ -1808,8 +2141,17 @@ def main():
     parser.add_argument("--voice-style", default="expressive",
                         choices=["expressive", "natural", "calm"],
                         help="ElevenLabs voice expressiveness: expressive (high energy), natural (balanced), calm (steady)")
+    progress = parser.add_mutually_exclusive_group()
+    progress.add_argument("--progress-fd", type=int, default=None,
+                          help="Write newline-delimited JSON progress events (stage, pct, output_path) to this inherited fd")
+    progress.add_argument("--progress-json", type=str, default=None,
+                          help="Append newline-delimited JSON progress events to this file")
+    parser.add_argument("--resume", type=str, default=None, metavar="JOB_DIR",
+                        help="Keep stage artifacts in JOB_DIR (created if missing) and reuse those whose "
+                             "inputs are unchanged; the dir survives a failed run so it can be resumed")
     
     args = parser.parse_args()
+    open_progress_stream(args.progress_fd, args.progress_json)
     
     # Find reference image
     ref_image = None
@@ -1854,27 +2196,36 @@ def main():
     # Run pipeline
     # Captions are disabled by default; use --captions to enable
     skip_captions = not args.captions
-    output = run_pipeline(
-        script_text,
-        ref_image,
-        args.output,
-        multiclip=args.multiclip,
-        no_music=args.no_music,
-        no_captions=skip_captions,
-        broll=args.broll,
-        capcut=args.capcut,
-        lip_sync=not args.no_lip_sync and not args.kenburns and not args.motion,
-        kenburns=args.kenburns,
-        motion=args.motion,
-        kling_model=args.kling_model,
-        broll_dir=args.broll_dir,
-        broll_map=args.broll_map,
-        broll_clips=args.broll_clips,
-        broll_count=args.broll_count,
-        broll_duration=args.broll_duration,
-        voice_style=args.voice_style,
-    )
+    try:
+        output = run_pipeline(
+            script_text,
+            ref_image,
+            args.output,
+            multiclip=args.multiclip,
+            no_music=args.no_music,
+            no_captions=skip_captions,
+            broll=args.broll,
+            capcut=args.capcut,
+            lip_sync=not args.no_lip_sync and not args.kenburns and not args.motion,
+            kenburns=args.kenburns,
+            motion=args.motion,
+            kling_model=args.kling_model,
+            broll_dir=args.broll_dir,
+            broll_map=args.broll_map,
+            broll_clips=args.broll_clips,
+            broll_count=args.broll_count,
+            broll_duration=args.broll_duration,
+            voice_style=args.voice_style,
+            job_dir=args.resume,
+        )
+    except BaseException as e:
+        # Surface crashes to the progress reader too, not only a non-zero exit code
+        _emit_progress("error", error=f"{type(e).__name__}: {e}")
+        raise
     
+    if not output:
+        _emit_progress("error", error="pipeline returned no output")
+
     if output:
         print(f"\n🎉 Content ready: {output}")
         
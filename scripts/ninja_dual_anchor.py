@@ -22,15 +22,20 @@ Usage:
 """
 
 import argparse
+import json
 import math
 import os
 import re
+import shutil
 import struct
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import wave
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 from pathlib import Path
 
@@ -436,7 +441,7 @@ def setup_fal_key():
     return False
 
 
-def mask_other_character(reference_path, character_to_hide, angle_key, work_dir):
+def mask_other_character(reference_path, character_to_hide, angle_key, work_dir, turn_index=None):
     """Create a version of the reference with one character painted over.
 
     Instead of cropping (which causes alignment issues), we keep the FULL
@@ -445,6 +450,8 @@ def mask_other_character(reference_path, character_to_hide, angle_key, work_dir)
 
     Args:
         character_to_hide: "NINJA" or "GLITCH" — which character to mask out.
+        turn_index: Prefixes the output name, so turns rendering in parallel
+            with the same angle never share a file.
 
     Returns image path, or None if no mask defined.
     """
@@ -478,7 +485,8 @@ def mask_other_character(reference_path, character_to_hide, angle_key, work_dir)
 
     # Soften the mask edges with a slight blur on the boundary
     # (prevents a hard rectangle edge from confusing Kling)
-    out_path = str(work_dir / f"masked_{character_to_hide.lower()}_{angle_key.lower()}.jpg")
+    prefix = f"turn_{turn_index:02d}_" if turn_index is not None else ""
+    out_path = str(work_dir / f"{prefix}masked_{character_to_hide.lower()}_{angle_key.lower()}.jpg")
     img.save(out_path, quality=95)
     img.close()
 
@@ -705,11 +713,40 @@ def prepare_listener_clip(loop_path: str, duration: float, output_path: str) ->
     return output_path
 
 
-def videochat_render_turn(turn_index, turn, work_dir, kling_model="pro", use_loops=True):
+class ProviderSlots:
+    """Cap on in-flight jobs for one provider (e.g. Kling renders).
+
+    A turn that submits several jobs takes all its slots at once under a lock,
+    so two turns each holding one slot can never deadlock waiting for a second.
+    A request for more slots than the limit is clamped to the limit.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._sem = threading.Semaphore(self.limit)
+        self._take_lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, jobs: int = 1):
+        n = min(max(1, jobs), self.limit)
+        with self._take_lock:
+            for _ in range(n):
+                self._sem.acquire()
+        try:
+            yield
+        finally:
+            for _ in range(n):
+                self._sem.release()
+
+
+def videochat_render_turn(turn_index, turn, work_dir, kling_model="pro", use_loops=True,
+                          kling_slots=None):
     """Render one dialogue turn in VIDEO CHAT format.
 
     Speaker gets Pro Kling + TTS audio. Listener uses pre-rendered loops
     (or falls back to Standard Kling + 60Hz tone when use_loops=False).
+    kling_slots (ProviderSlots) is held for every Kling job from submit until
+    its result is back.
 
     Returns path to composited clip, or None on failure.
     """
@@ -730,66 +767,68 @@ def videochat_render_turn(turn_index, turn, work_dir, kling_model="pro", use_loo
     speaker_img_url = fal_client.upload(open(speaker_ref_path, "rb").read(), "image/png")
     speech_audio_url = fal_client.upload(open(audio_path, "rb").read(), "audio/mpeg")
 
-    sp_model = f"fal-ai/kling-video/ai-avatar/v2/{kling_model}"
-    print(f"   Submitting {speaker} (speaking, {kling_model}) to Kling...")
-    speaker_handle = fal_client.submit(
-        sp_model,
-        arguments={
-            "image_url": speaker_img_url,
-            "audio_url": speech_audio_url,
-            "prompt": VIDEOCHAT_SPEAKER_PROMPTS[speaker],
-            "negative_prompt": NEGATIVE_PROMPT,
-            "cfg_scale": CFG_SCALE,
-        },
-    )
-
-    # --- Listener: pre-rendered loop (default) or fresh Kling render ---
-    ls_video_path = str(work_dir / f"turn_{turn_index:02d}_{non_speaker.lower()}_listen.mp4")
-
-    if use_loops:
-        loop_path = get_listener_loop(non_speaker, turn_index)
-        print(f"   Listener: using loop {Path(loop_path).name} (no Kling call)")
-        prepared = prepare_listener_clip(loop_path, duration, ls_video_path)
-        if not prepared:
-            print(f"   ERROR: Failed to prepare listener loop — aborting turn")
-            return None
-    else:
-        # Fallback: full Kling render for listener (original behavior)
-        tone_path = str(work_dir / f"tone_{turn_index:02d}.wav")
-        generate_60hz_tone_wav(duration, tone_path)
-
-        listener_ref_path = VIDEOCHAT_GLITCH_REF if speaker == "NINJA" else VIDEOCHAT_NINJA_REF
-        listener_img_url = fal_client.upload(open(listener_ref_path, "rb").read(), "image/png")
-        tone_audio_url = fal_client.upload(open(tone_path, "rb").read(), "audio/wav")
-
-        ls_model = "fal-ai/kling-video/ai-avatar/v2/standard"
-        print(f"   Submitting {non_speaker} (listening, standard) to Kling...")
-        listener_handle = fal_client.submit(
-            ls_model,
+    kling_jobs = 1 if use_loops else 2
+    with kling_slots.hold(kling_jobs) if kling_slots else nullcontext():
+        sp_model = f"fal-ai/kling-video/ai-avatar/v2/{kling_model}"
+        print(f"   Submitting {speaker} (speaking, {kling_model}) to Kling...")
+        speaker_handle = fal_client.submit(
+            sp_model,
             arguments={
-                "image_url": listener_img_url,
-                "audio_url": tone_audio_url,
-                "prompt": VIDEOCHAT_LISTENER_PROMPTS[non_speaker],
-                "negative_prompt": LISTENER_NEGATIVE_PROMPT,
-                "cfg_scale": LISTENER_CFG_SCALE,
+                "image_url": speaker_img_url,
+                "audio_url": speech_audio_url,
+                "prompt": VIDEOCHAT_SPEAKER_PROMPTS[speaker],
+                "negative_prompt": NEGATIVE_PROMPT,
+                "cfg_scale": CFG_SCALE,
             },
         )
 
-    # --- Wait for speaker render ---
-    t0 = time.time()
-    speaker_result = speaker_handle.get()
-    sp_dur = speaker_result.get("duration", "?")
-    print(f"   {speaker} render done ({sp_dur}s, {time.time()-t0:.0f}s wall)")
+        # --- Listener: pre-rendered loop (default) or fresh Kling render ---
+        ls_video_path = str(work_dir / f"turn_{turn_index:02d}_{non_speaker.lower()}_listen.mp4")
+
+        if use_loops:
+            loop_path = get_listener_loop(non_speaker, turn_index)
+            print(f"   Listener: using loop {Path(loop_path).name} (no Kling call)")
+            prepared = prepare_listener_clip(loop_path, duration, ls_video_path)
+            if not prepared:
+                print(f"   ERROR: Failed to prepare listener loop — aborting turn")
+                return None
+        else:
+            # Fallback: full Kling render for listener (original behavior)
+            tone_path = str(work_dir / f"tone_{turn_index:02d}.wav")
+            generate_60hz_tone_wav(duration, tone_path)
+
+            listener_ref_path = VIDEOCHAT_GLITCH_REF if speaker == "NINJA" else VIDEOCHAT_NINJA_REF
+            listener_img_url = fal_client.upload(open(listener_ref_path, "rb").read(), "image/png")
+            tone_audio_url = fal_client.upload(open(tone_path, "rb").read(), "audio/wav")
+
+            ls_model = "fal-ai/kling-video/ai-avatar/v2/standard"
+            print(f"   Submitting {non_speaker} (listening, standard) to Kling...")
+            listener_handle = fal_client.submit(
+                ls_model,
+                arguments={
+                    "image_url": listener_img_url,
+                    "audio_url": tone_audio_url,
+                    "prompt": VIDEOCHAT_LISTENER_PROMPTS[non_speaker],
+                    "negative_prompt": LISTENER_NEGATIVE_PROMPT,
+                    "cfg_scale": LISTENER_CFG_SCALE,
+                },
+            )
 
-    # --- Wait for listener render (only if not using loops) ---
-    if not use_loops:
-        listener_result = listener_handle.get()
-        ls_dur = listener_result.get("duration", "?")
-        print(f"   {non_speaker} render done ({ls_dur}s, {time.time()-t0:.0f}s wall)")
+        # --- Wait for speaker render ---
+        t0 = time.time()
+        speaker_result = speaker_handle.get()
+        sp_dur = speaker_result.get("duration", "?")
+        print(f"   {speaker} render done ({sp_dur}s, {time.time()-t0:.0f}s wall)")
 
-        r = req.get(listener_result["video"]["url"])
-        with open(ls_video_path, "wb") as f:
-            f.write(r.content)
+        # --- Wait for listener render (only if not using loops) ---
+        if not use_loops:
+            listener_result = listener_handle.get()
+            ls_dur = listener_result.get("duration", "?")
+            print(f"   {non_speaker} render done ({ls_dur}s, {time.time()-t0:.0f}s wall)")
+
+            r = req.get(listener_result["video"]["url"])
+            with open(ls_video_path, "wb") as f:
+                f.write(r.content)
 
     # --- Download speaker video ---
     sp_video_path = str(work_dir / f"turn_{turn_index:02d}_{speaker.lower()}_speak.mp4")
@@ -808,7 +847,7 @@ def videochat_render_turn(turn_index, turn, work_dir, kling_model="pro", use_loo
     return result
 
 
-def dual_render_turn(turn_index, turn, work_dir, kling_model="pro"):
+def dual_render_turn(turn_index, turn, work_dir, kling_model="pro", kling_slots=None):
     """Render one dialogue turn using dual parallel Kling Avatar sessions.
 
     Paint-over approach (v3):
@@ -819,6 +858,9 @@ def dual_render_turn(turn_index, turn, work_dir, kling_model="pro"):
     3. Download both animated videos
     4. Composite via vertical split (each side from the render where that character is visible)
 
+    kling_slots (ProviderSlots) is held for both Kling jobs from submit until
+    their results are back.
+
     Returns path to composited clip, or None on failure.
     """
     import fal_client
@@ -836,11 +878,11 @@ def dual_render_turn(turn_index, turn, work_dir, kling_model="pro"):
     # 1. Create masked images (paint over the character we DON'T want Kling to see)
     # Speaker's image: hide the non-speaker so Kling only animates the speaker
     speaker_masked = mask_other_character(
-        reference_path, non_speaker, angle_key, work_dir,
+        reference_path, non_speaker, angle_key, work_dir, turn_index,
     )
     # Listener's image: hide the speaker so Kling only animates the listener
     listener_masked = mask_other_character(
-        reference_path, speaker, angle_key, work_dir,
+        reference_path, speaker, angle_key, work_dir, turn_index,
     )
 
     if not speaker_masked:
@@ -871,45 +913,47 @@ def dual_render_turn(turn_index, turn, work_dir, kling_model="pro"):
     sp_prompt = SPEAKER_PROMPTS.get(speaker, "Character speaking to camera.")
     ls_prompt = LISTENER_PROMPTS.get(non_speaker, "Character listening.")
 
-    print(f"   Submitting {speaker} (speaking) to Kling {kling_model}...")
-    speaker_handle = fal_client.submit(
-        model_id,
-        arguments={
-            "image_url": sp_img_url,
-            "audio_url": sp_audio_url,
-            "prompt": sp_prompt,
-            "negative_prompt": NEGATIVE_PROMPT,
-            "cfg_scale": CFG_SCALE,
-        },
-    )
-
-    listener_handle = None
-    if ls_img_url:
-        print(f"   Submitting {non_speaker} (listening) to Kling {kling_model}...")
-        listener_handle = fal_client.submit(
+    kling_jobs = 2 if ls_img_url else 1
+    with kling_slots.hold(kling_jobs) if kling_slots else nullcontext():
+        print(f"   Submitting {speaker} (speaking) to Kling {kling_model}...")
+        speaker_handle = fal_client.submit(
             model_id,
             arguments={
-                "image_url": ls_img_url,
-                "audio_url": ls_audio_url,
-                "prompt": ls_prompt,
+                "image_url": sp_img_url,
+                "audio_url": sp_audio_url,
+                "prompt": sp_prompt,
                 "negative_prompt": NEGATIVE_PROMPT,
                 "cfg_scale": CFG_SCALE,
             },
         )
 
-    print(f"   Both renders submitted — waiting for parallel completion...")
+        listener_handle = None
+        if ls_img_url:
+            print(f"   Submitting {non_speaker} (listening) to Kling {kling_model}...")
+            listener_handle = fal_client.submit(
+                model_id,
+                arguments={
+                    "image_url": ls_img_url,
+                    "audio_url": ls_audio_url,
+                    "prompt": ls_prompt,
+                    "negative_prompt": NEGATIVE_PROMPT,
+                    "cfg_scale": CFG_SCALE,
+                },
+            )
 
-    # 5. Collect results (both run in parallel on fal.ai)
-    t0 = time.time()
-    speaker_result = speaker_handle.get()
-    sp_dur = speaker_result.get("duration", "?")
-    print(f"   {speaker} render done ({sp_dur}s, {time.time()-t0:.0f}s wall)")
+        print(f"   Both renders submitted — waiting for parallel completion...")
 
-    ls_video_path = None
-    if listener_handle:
-        listener_result = listener_handle.get()
-        ls_dur = listener_result.get("duration", "?")
-        print(f"   {non_speaker} render done ({ls_dur}s, {time.time()-t0:.0f}s wall)")
+        # 5. Collect results (both run in parallel on fal.ai)
+        t0 = time.time()
+        speaker_result = speaker_handle.get()
+        sp_dur = speaker_result.get("duration", "?")
+        print(f"   {speaker} render done ({sp_dur}s, {time.time()-t0:.0f}s wall)")
+
+        ls_video_path = None
+        if listener_handle:
+            listener_result = listener_handle.get()
+            ls_dur = listener_result.get("duration", "?")
+            print(f"   {non_speaker} render done ({ls_dur}s, {time.time()-t0:.0f}s wall)")
 
     # 6. Download videos
     sp_video_path = str(work_dir / f"turn_{turn_index:02d}_{speaker.lower()}_sp.mp4")
@@ -955,6 +999,74 @@ def dual_render_turn(turn_index, turn, work_dir, kling_model="pro"):
 # Core Pipeline Functions
 # ---------------------------------------------------------------------------
 
+# Per-provider concurrency for generate_turn_clips: turns are independent until
+# assembly, so they run in parallel, bounded by what each API tolerates.
+TTS_CONCURRENCY = int(os.environ.get("NINJA_DUAL_TTS_CONCURRENCY", "4"))      # ElevenLabs
+KLING_CONCURRENCY = int(os.environ.get("NINJA_DUAL_KLING_CONCURRENCY", "3"))  # fal.ai Kling
+TURN_RETRIES = int(os.environ.get("NINJA_DUAL_TURN_RETRIES", "1"))
+
+
+def _generate_turn(i: int, turn: dict, total: int, work_dir: Path, kling_model: str,
+                   single_render: bool, format: str, use_loops: bool,
+                   tts_slots: threading.Semaphore, kling_slots: ProviderSlots) -> str | None:
+    """TTS + render for one dialogue turn. Returns the clip path, or None on failure.
+
+    TTS output is kept on the turn, so a retry only repeats the render.
+    """
+    speaker = turn["speaker"]
+    char = CHARACTERS[speaker]
+
+    # Step 1: TTS
+    audio_path = str(work_dir / f"turn_{i:02d}_audio.mp3")
+    if not (turn.get("audio_path") and Path(turn["audio_path"]).exists()):
+        print(f"   [{i+1}/{total}] TTS: {char['name']} → {turn['text'][:60]}...")
+        with tts_slots:
+            tts_ok = generate_tts(
+                turn["text"], audio_path,
+                voice_id=char["voice_id"],
+                voice_style=char["voice_style"],
+            )
+        if not tts_ok:
+            print(f"   ERROR: TTS failed for turn {i+1}")
+            return None
+        turn["audio_path"] = audio_path
+        turn["duration"] = get_audio_duration(audio_path)
+        print(f"   [{i+1}/{total}] Duration: {turn['duration']:.1f}s")
+
+    # Step 2: Select camera angle
+    angle_image, angle_prompt, angle_key = select_angle(speaker, i, total)
+    turn["angle_image"] = angle_image
+    turn["angle_key"] = angle_key
+    print(f"   [{i+1}/{total}] Camera: {Path(angle_image).name} ({angle_key})")
+
+    # Kling slots are taken per job inside each render path (a turn may submit two)
+    if format == "videochat":
+        # Video chat format: speaker gets Kling render, listener uses pre-rendered loops
+        # (unless --no-loops: falls back to Kling + 60Hz tone for both)
+        clip_path = videochat_render_turn(i, turn, work_dir, kling_model, use_loops=use_loops,
+                                          kling_slots=kling_slots)
+    elif single_render:
+        # Old mode: single Kling render with both characters
+        clip_path = str(work_dir / f"turn_{i:02d}_{speaker.lower()}.mp4")
+        print(f"   [{i+1}/{total}] Kling: Single render with {char['name']} speaking...")
+        with kling_slots.hold(1):
+            generate_kling_avatar_video(
+                angle_image, turn["audio_path"], clip_path,
+                model=kling_model,
+                prompt=angle_prompt,
+                negative_prompt=NEGATIVE_PROMPT,
+                cfg_scale=CFG_SCALE,
+            )
+    else:
+        # Dual-render newsdesk: crop each character, parallel Kling, composite
+        clip_path = dual_render_turn(i, turn, work_dir, kling_model, kling_slots=kling_slots)
+
+    if not clip_path or not Path(clip_path).exists():
+        print(f"   ERROR: Render failed for turn {i+1}")
+        return None
+    return clip_path
+
+
 def generate_turn_clips(turns: list[dict], work_dir: Path,
                         kling_model: str = "pro",
                         single_render: bool = False,
@@ -962,6 +1074,12 @@ def generate_turn_clips(turns: list[dict], work_dir: Path,
                         use_loops: bool = True) -> list[dict]:
     """Generate clips for each dialogue turn.
 
+    Turns run concurrently on a thread pool, with at most TTS_CONCURRENCY
+    ElevenLabs calls and KLING_CONCURRENCY Kling renders in flight. Results
+    land on their own turn dict, so ordering is unchanged; failed turns are
+    retried on their own up to TURN_RETRIES times, then left with
+    clip_path=None.
+
     Formats:
       videochat (recommended): Independent renders per character, vertical stack,
         60Hz tone for listener, Standard tier for listener. No seam issues.
@@ -975,88 +1093,150 @@ def generate_turn_clips(turns: list[dict], work_dir: Path,
         mode = "SINGLE"
     else:
         mode = "DUAL-RENDER"
-    print(f"\n   Generating clips for {total} dialogue turns ({mode})...")
+    print(f"\n   Generating clips for {total} dialogue turns ({mode}, "
+          f"tts x{TTS_CONCURRENCY}, kling x{KLING_CONCURRENCY})...")
 
     if not single_render:
         if not setup_fal_key():
             print("   FATAL: Cannot proceed without fal.ai API key")
             return turns
 
-    for i, turn in enumerate(turns):
-        speaker = turn["speaker"]
-        char = CHARACTERS[speaker]
+    if not turns:
+        return turns
+
+    tts_slots = threading.BoundedSemaphore(TTS_CONCURRENCY)
+    kling_slots = ProviderSlots(KLING_CONCURRENCY)
+    pending = list(range(total))
+    with ThreadPoolExecutor(max_workers=min(total, max(TTS_CONCURRENCY, KLING_CONCURRENCY))) as pool:
+        for attempt in range(TURN_RETRIES + 1):
+            if attempt:
+                print(f"\n   Retrying {len(pending)} failed turn(s): {[i + 1 for i in pending]}")
+            futures = {
+                pool.submit(_generate_turn, i, turns[i], total, work_dir, kling_model,
+                            single_render, format, use_loops, tts_slots, kling_slots): i
+                for i in pending
+            }
+            failed = []
+            for fut in as_completed(futures):
+                i = futures[fut]
+                try:
+                    clip_path = fut.result()
+                except Exception as e:
+                    print(f"   ERROR: Turn {i+1} raised {type(e).__name__}: {e}")
+                    clip_path = None
+                turns[i]["clip_path"] = clip_path
+                if not clip_path:
+                    failed.append(i)
+            pending = sorted(failed)
+            if not pending:
+                break
+
+    return turns
 
-        print(f"\n   --- Turn {i+1}/{total}: {speaker} speaks ---")
 
-        # Step 1: TTS
-        audio_path = str(work_dir / f"turn_{i:02d}_audio.mp3")
-        print(f"   TTS: {char['name']} → {turn['text'][:60]}...")
-        generate_tts(
-            turn["text"], audio_path,
-            voice_id=char["voice_id"],
-            voice_style=char["voice_style"],
-        )
-        turn["audio_path"] = audio_path
-        turn["duration"] = get_audio_duration(audio_path)
-        print(f"   Duration: {turn['duration']:.1f}s")
-
-        # Step 2: Select camera angle
-        angle_image, angle_prompt, angle_key = select_angle(speaker, i, total)
-        turn["angle_image"] = angle_image
-        turn["angle_key"] = angle_key
-        print(f"   Camera: {Path(angle_image).name} ({angle_key})")
-
-        if format == "videochat":
-            # Video chat format: speaker gets Kling render, listener uses pre-rendered loops
-            # (unless --no-loops: falls back to Kling + 60Hz tone for both)
-            clip_path = videochat_render_turn(i, turn, work_dir, kling_model, use_loops=use_loops)
-            if not clip_path or not Path(clip_path).exists():
-                print(f"   ERROR: Videochat render failed for turn {i+1}")
-                turn["clip_path"] = None
-                continue
-            turn["clip_path"] = clip_path
-        elif single_render:
-            # Old mode: single Kling render with both characters
-            clip_path = str(work_dir / f"turn_{i:02d}_{speaker.lower()}.mp4")
-            print(f"   Kling: Single render with {char['name']} speaking...")
-            generate_kling_avatar_video(
-                angle_image, audio_path, clip_path,
-                model=kling_model,
-                prompt=angle_prompt,
-                negative_prompt=NEGATIVE_PROMPT,
-                cfg_scale=CFG_SCALE,
-            )
-            turn["clip_path"] = clip_path
-        else:
-            # Dual-render newsdesk: crop each character, parallel Kling, composite
-            clip_path = dual_render_turn(i, turn, work_dir, kling_model)
-            if not clip_path or not Path(clip_path).exists():
-                print(f"   ERROR: Dual render failed for turn {i+1}")
-                turn["clip_path"] = None
-                continue
-            turn["clip_path"] = clip_path
+# Target stream layout for normalize_clip. Concat-copy in assemble_dual_anchor
+# needs every segment to agree on all of these.
+NORM_FPS = 30
+NORM_PIX_FMT = "yuv420p"
+NORM_AUDIO_RATE = 44100
+NORM_AUDIO_CHANNELS = 2
 
-    return turns
+
+def probe_streams(clip_path: str) -> dict | None:
+    """One ffprobe call: first video/audio stream fields plus container duration.
+
+    Includes what -c copy concat needs to agree on beyond the visible layout:
+    H.264 profile/level, time_base and a hash of the SPS/PPS extradata.
+    """
+    probe = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_data_hash", "sha256",
+         "-show_entries",
+         "stream=codec_type,codec_name,profile,level,width,height,r_frame_rate,"
+         "time_base,pix_fmt,sample_aspect_ratio,sample_rate,channels,extradata_hash"
+         ":format=duration",
+         "-of", "json", clip_path],
+        capture_output=True, text=True,
+    )
+    if probe.returncode != 0:
+        return None
+    try:
+        info = json.loads(probe.stdout)
+    except ValueError:
+        return None
+    streams = info.get("streams", [])
+    return {
+        "video": next((st for st in streams if st.get("codec_type") == "video"), None),
+        "audio": [st for st in streams if st.get("codec_type") == "audio"],
+        "duration": float(info.get("format", {}).get("duration") or 0),
+    }
+
+
+def _matches_target(info: dict | None, target_w: int, target_h: int, fps: int) -> bool:
+    """True if a probed clip can go into the concat without re-encoding."""
+    if not info or not info["video"] or len(info["audio"]) != 1:
+        return False
+    v, a = info["video"], info["audio"][0]
+    num, _, den = v.get("r_frame_rate", "0/1").partition("/")
+    try:
+        rate = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return False
+    return (
+        v.get("codec_name") == "h264"
+        and (v.get("width"), v.get("height")) == (target_w, target_h)
+        and abs(rate - fps) < 0.01
+        and v.get("pix_fmt") == NORM_PIX_FMT
+        and v.get("sample_aspect_ratio", "1:1") in ("1:1", "0:1", "N/A")
+        and a.get("codec_name") == "aac"
+        and int(a.get("sample_rate", 0)) == NORM_AUDIO_RATE
+        and a.get("channels") == NORM_AUDIO_CHANNELS
+    )
+
+
+def concat_signature(info: dict | None) -> tuple | None:
+    """Stream parameters every segment of a -c copy concat must share."""
+    if not info or not info["video"] or len(info["audio"]) != 1:
+        return None
+    v, a = info["video"], info["audio"][0]
+    return (
+        v.get("codec_name"), v.get("profile"), v.get("level"),
+        v.get("width"), v.get("height"), v.get("r_frame_rate"), v.get("time_base"),
+        v.get("pix_fmt"), v.get("extradata_hash"),
+        a.get("codec_name"), a.get("profile"), str(a.get("sample_rate")), a.get("channels"),
+    )
 
 
 def normalize_clip(clip_path: str, output_path: str, duration: float,
-                   target_w: int = 1080, target_h: int = 1920) -> str:
+                   target_w: int = 1080, target_h: int = 1920,
+                   fps: int = NORM_FPS, force_transcode: bool = False) -> str:
     """Scale and pad a clip to exact target dimensions (default 9:16 for Shorts).
 
-    Handles any input aspect ratio from Kling output.
+    Handles any input aspect ratio from Kling output. Clips that already match
+    the target layout (h264/aac, size, fps, pix_fmt, SAR, audio rate/channels)
+    are passed through untouched, or stream-copied if they run past duration;
+    only mismatched clips (or all, with force_transcode) are transcoded.
     """
-    cmd = [
-        "ffmpeg", "-y",
-        "-i", clip_path,
-        "-vf", (
-            f"scale={target_w}:{target_h}:force_original_aspect_ratio=decrease,"
-            f"pad={target_w}:{target_h}:(ow-iw)/2:(oh-ih)/2:color={BG_COLOR}"
-        ),
-        "-c:v", "libx264", "-crf", "18", "-preset", "fast",
-        "-c:a", "aac", "-b:a", "192k",
-        "-t", f"{duration:.3f}",
-        output_path,
-    ]
+    info = probe_streams(clip_path)
+    if not force_transcode and _matches_target(info, target_w, target_h, fps):
+        if info["duration"] <= duration + 1.0 / fps:
+            return clip_path
+        cmd = ["ffmpeg", "-y", "-i", clip_path, "-map", "0:v:0", "-map", "0:a:0",
+               "-c", "copy", "-t", f"{duration:.3f}", output_path]
+    else:
+        cmd = [
+            "ffmpeg", "-y",
+            "-i", clip_path,
+            "-vf", (
+                f"scale={target_w}:{target_h}:force_original_aspect_ratio=decrease,"
+                f"pad={target_w}:{target_h}:(ow-iw)/2:(oh-ih)/2:color={BG_COLOR},setsar=1"
+            ),
+            "-r", str(fps), "-pix_fmt", NORM_PIX_FMT,
+            "-c:v", "libx264", "-crf", "18", "-preset", "fast",
+            "-c:a", "aac", "-b:a", "192k",
+            "-ar", str(NORM_AUDIO_RATE), "-ac", str(NORM_AUDIO_CHANNELS),
+            "-t", f"{duration:.3f}",
+            output_path,
+        ]
     result = subprocess.run(cmd, capture_output=True, text=True)
     if result.returncode != 0:
         print(f"   ERROR normalizing: {result.stderr[:200]}")
@@ -1064,6 +1244,31 @@ def normalize_clip(clip_path: str, output_path: str, duration: float,
     return output_path
 
 
+def normalize_clips(clips: list[str], durations: list[float], work_dir: Path,
+                    target_w: int = 1080, target_h: int = 1920,
+                    fps: int = NORM_FPS) -> list[str | None]:
+    """normalize_clip every clip, making sure the results can be concatenated with -c copy.
+
+    Passthrough only pays off if every segment shares one concat_signature:
+    clips from different encoders (Kling output next to our crf18 transcodes)
+    differ in profile/level and SPS/PPS even when size and fps match, and a
+    copy-concat of those breaks or stutters. If the signatures disagree, the
+    clips that were passed through are transcoded too.
+    """
+    outputs = [
+        normalize_clip(clip, str(work_dir / f"norm_{i:02d}.mp4"), duration, target_w, target_h, fps)
+        for i, (clip, duration) in enumerate(zip(clips, durations))
+    ]
+    signatures = {concat_signature(probe_streams(out)) for out in outputs if out}
+    if len(signatures) > 1:
+        print("   Clip stream parameters differ — re-encoding passthrough clips for the concat")
+        for i, (clip, duration) in enumerate(zip(clips, durations)):
+            if outputs[i] and _matches_target(probe_streams(clip), target_w, target_h, fps):
+                outputs[i] = normalize_clip(clip, str(work_dir / f"norm_{i:02d}.mp4"), duration,
+                                            target_w, target_h, fps, force_transcode=True)
+    return outputs
+
+
 def assemble_dual_anchor(composite_paths: list[str], output_path: str) -> str:
     """Concatenate all composited turns into final video using FFmpeg concat demuxer."""
     print(f"\n   Assembling {len(composite_paths)} segments into final video...")
@@ -1092,11 +1297,39 @@ def assemble_dual_anchor(composite_paths: list[str], output_path: str) -> str:
 # Main Pipeline Orchestrator
 # ---------------------------------------------------------------------------
 
+def burn_turn_captions(turns: list[dict], video_path: str, output_path: str,
+                       work_dir: Path) -> str | None:
+    """Burn word-synced captions for all turns with one batched Whisper pass.
+
+    Turns are hard-cut back to back, so turn i starts at the sum of the
+    previous segment lengths: the probed length of each normalized clip
+    ("clip_duration") when known, since a passed-through clip is not trimmed
+    to its audio duration, else the audio duration.
+    """
+    from ninja_synced_captions import burn_ass, create_synced_ass, get_word_timestamps_batch, shift_words
+
+    per_turn = get_word_timestamps_batch(
+        [t["audio_path"] for t in turns],
+        [t["text"] for t in turns],
+    )
+    starts, t = [], 0.0
+    for turn in turns:
+        starts.append(t)
+        t += turn.get("clip_duration") or turn["duration"]
+    words = shift_words(per_turn, starts)
+    print(f"   Captions: {len(words)} words across {len(turns)} turns")
+
+    ass_path = str(work_dir / "captions.ass")
+    create_synced_ass(words, ass_path)
+    return burn_ass(video_path, ass_path, output_path)
+
+
 def run_dual_anchor_pipeline(script_text: str, output_name: str = "ninja_dual",
                               kling_model: str = "pro",
                               single_render: bool = False,
                               format: str = "videochat",
-                              use_loops: bool = True) -> str | None:
+                              use_loops: bool = True,
+                              captions: bool = False) -> str | None:
     """Full dual-anchor pipeline: parse → TTS → angle select → render → concat.
 
     Formats:
@@ -1104,6 +1337,8 @@ def run_dual_anchor_pipeline(script_text: str, output_name: str = "ninja_dual",
       newsdesk: Side-by-side news desk with feathered split.
       --single-render: Old single-session mode (legacy).
 
+    With captions=True, word-synced captions are burned over the final cut.
+
     Returns path to final video, or None on failure.
     """
     if format == "videochat":
@@ -1147,18 +1382,26 @@ def run_dual_anchor_pipeline(script_text: str, output_name: str = "ninja_dual",
 
         # 3. Normalize clips to consistent dimensions
         normalized = []
+        kept_turns = []
         print(f"\n   Normalizing {len(turns)} clips...")
+        present = []
         for i, turn in enumerate(turns):
             clip = turn.get("clip_path")
             if not clip or not Path(clip).exists():
                 print(f"   WARNING: Skipping missing clip for turn {i+1}")
                 continue
-            norm_path = str(work_dir / f"norm_{i:02d}.mp4")
-            result = normalize_clip(clip, norm_path, turn["duration"])
-            if result:
-                normalized.append(result)
-            else:
+            present.append(i)
+        results = normalize_clips([turns[i]["clip_path"] for i in present],
+                                  [turns[i]["duration"] for i in present], work_dir)
+        for i, result in zip(present, results):
+            if not result:
                 print(f"   WARNING: Skipping failed normalize for turn {i+1}")
+                continue
+            # Captions are offset by what actually lands in the cut, trimmed or not
+            info = probe_streams(result)
+            turns[i]["clip_duration"] = info["duration"] if info else None
+            normalized.append(result)
+            kept_turns.append(turns[i])
 
         if not normalized:
             print("ERROR: All clips failed")
@@ -1167,12 +1410,19 @@ def run_dual_anchor_pipeline(script_text: str, output_name: str = "ninja_dual",
         # 4. Concatenate into final video
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         final_path = str(OUTPUT_DIR / f"{output_name}_{timestamp}.mp4")
-        result = assemble_dual_anchor(normalized, final_path)
+        assembled_path = str(work_dir / "assembled.mp4") if captions else final_path
+        result = assemble_dual_anchor(normalized, assembled_path)
 
         if not result:
             print("ERROR: Assembly failed")
             return None
 
+        # 5. Word-synced captions over the whole cut
+        if captions:
+            if not burn_turn_captions(kept_turns, assembled_path, final_path, work_dir):
+                print("   WARNING: Caption burn failed, keeping uncaptioned video")
+                shutil.copy(assembled_path, final_path)
+
     elapsed = time.time() - start_time
     total_duration = sum(t.get("duration", 0) for t in turns)
     if format == "videochat":
@@ -1221,6 +1471,8 @@ if __name__ == "__main__":
                         help="Use single Kling render per turn (legacy, may have ghost mouthing)")
     parser.add_argument("--no-loops", action="store_true",
                         help="Disable pre-rendered listener loops (fall back to Kling renders)")
+    parser.add_argument("--captions", action="store_true",
+                        help="Burn word-synced captions (one batched Whisper pass over all turns)")
     args = parser.parse_args()
 
     script_text = Path(args.script_file).read_text()
@@ -1231,6 +1483,7 @@ if __name__ == "__main__":
         single_render=args.single_render,
         format=args.format,
         use_loops=not args.no_loops,
+        captions=args.captions,
     )
 
     if result:
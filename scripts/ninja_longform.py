@@ -377,6 +377,31 @@ def assemble_video(segments: list[dict], work_dir: Path, output_path: str, cross
     return output_path
 
 
+def burn_segment_captions(segments: list[dict], video_path: str, output_path: str,
+                          work_dir: Path, crossfade: float = 0.5) -> str | None:
+    """Burn word-synced captions for every segment in one Whisper pass.
+
+    Segment i starts at sum(durations[:i]) - i * crossfade on the final timeline
+    (each xfade overlaps neighbours by `crossfade`).
+    """
+    from ninja_synced_captions import burn_ass, create_synced_ass, get_word_timestamps_batch, shift_words
+
+    per_segment = get_word_timestamps_batch(
+        [s["audio_path"] for s in segments],
+        [s["text"] for s in segments],
+    )
+    starts, t = [], 0.0
+    for seg in segments:
+        starts.append(t)
+        t += seg["duration"] - crossfade
+    words = shift_words(per_segment, starts)
+    print(f"    Captions: {len(words)} words across {len(segments)} segments")
+
+    ass_path = str(work_dir / "captions.ass")
+    create_synced_ass(words, ass_path, width=1920, height=1080)
+    return burn_ass(video_path, ass_path, output_path)
+
+
 def assemble_concat_fallback(segment_files: list[str], output_path: str) -> str:
     """Fallback: simple concat demuxer (no crossfade)."""
     with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
@@ -429,6 +454,8 @@ def main():
     parser.add_argument("--voice-style", default="expressive",
                         choices=["expressive", "natural", "calm"],
                         help="ElevenLabs voice expressiveness: expressive (high energy), natural (balanced), calm (steady)")
+    parser.add_argument("--captions", action="store_true",
+                        help="Burn word-synced captions (one batched Whisper pass over all segments)")
     args = parser.parse_args()
 
     avatar_image = args.image
@@ -503,7 +530,16 @@ def main():
     output_path = str(OUTPUT_DIR / f"{args.output}_{timestamp}.mp4")
 
     print(f"\n[STEP 5] Assembling final video...")
-    result = assemble_video(segments, work_dir, output_path, args.crossfade)
+    assembled_path = str(work_dir / "assembled.mp4") if args.captions else output_path
+    result = assemble_video(segments, work_dir, assembled_path, args.crossfade)
+
+    if result and args.captions:
+        print("\n[STEP 6] Burning word-synced captions...")
+        result = burn_segment_captions(segments, assembled_path, output_path, work_dir, args.crossfade)
+        if not result:
+            print("    WARNING: Caption burn failed, keeping uncaptioned video")
+            shutil.copy(assembled_path, output_path)
+            result = output_path
 
     if result:
         print(f"\n{'='*60}")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Stage-level render cache for ninja_content.run_pipeline.
+
+Each pipeline stage (tts → avatar → broll → captions → ...) writes its artifact
+into a per-job work directory and records it in manifest.json under a key
+derived from the stage's inputs, its parameters and the digest of the upstream
+stage's artifact. Because keys chain through artifact contents, changing any
+input (or regenerating an upstream artifact) invalidates that stage and
+everything downstream of it, while untouched upstream stages are reused on
+--resume.
+
+    cache = StageCache(job_dir)
+    key = cache.key("tts", None, script=text, voice_style="expressive")
+    audio = cache.path("voice.mp3")
+    if not cache.hit("tts", key, audio):
+        generate_tts(text, str(audio))
+        cache.record("tts", key, audio)
+    avatar_key = cache.key("avatar", file_digest(audio), model="pro")
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+MANIFEST = "manifest.json"
+
+
+def file_digest(path):
+    """sha256 of a file's bytes (for inputs like reference images), or None if missing."""
+    if not path or not Path(path).exists():
+        return None
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class StageCache:
+    """Manifest-backed artifact cache rooted at a job work directory."""
+
+    def __init__(self, job_dir):
+        self.job_dir = Path(job_dir)
+        self.finished = False  # set by the pipeline once the final output exists
+        self.job_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.job_dir / MANIFEST
+        try:
+            self.manifest = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            self.manifest = {"stages": {}}
+
+    @staticmethod
+    def key(stage, upstream_digest, **params):
+        """Deterministic key for a stage: its name, its params and the upstream artifact digest."""
+        raw = json.dumps([stage, upstream_digest, params], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def path(self, name):
+        return self.job_dir / name
+
+    def hit(self, stage, key, artifact):
+        """True if stage was recorded under key and its artifact is still on disk."""
+        entry = self.manifest["stages"].get(stage)
+        if not entry or entry.get("key") != key:
+            return False
+        artifact = Path(artifact)
+        if entry.get("artifact") != artifact.name or not artifact.exists():
+            return False
+        if artifact.is_file() and artifact.stat().st_size == 0:
+            return False
+        print(f"   ♻️  Reusing cached {stage} stage: {artifact.name}")
+        return True
+
+    def get(self, stage, field, default=None):
+        """Extra metadata stored alongside a stage's artifact."""
+        return self.manifest["stages"].get(stage, {}).get(field, default)
+
+    def record(self, stage, key, artifact, **meta):
+        """Record a completed stage; the manifest is replaced atomically."""
+        self.manifest["stages"][stage] = {"key": key, "artifact": Path(artifact).name, **meta}
+        tmp = self.manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.manifest, indent=2, sort_keys=True))
+        os.replace(tmp, self.manifest_path)
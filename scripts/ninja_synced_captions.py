@@ -5,73 +5,189 @@ ninja_synced_captions.py — Word-synced animated captions using Whisper
 Creates Instagram Reels-style captions that highlight each word AS it's spoken.
 """
 
+import bisect
+import functools
 import os
 import subprocess
+import threading
 import whisper
 from pathlib import Path
 
+# Loaded models kept per process, keyed by (model name, device)
+WHISPER_CACHE_SIZE = int(os.environ.get("NINJA_WHISPER_CACHE_SIZE", "2"))
 
-def get_word_timestamps(audio_path, model_size="tiny", padding_offset=0.5, original_script=None):
-    """Get word-level timestamps from audio using Whisper.
-    
-    If original_script is provided, use those words instead of Whisper's
-    transcription (which can have errors like 'Genie' -> 'G & E').
-    """
+_model_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=WHISPER_CACHE_SIZE)
+def _load_model_cached(model_size, device):
     print(f"🎙️ Loading Whisper ({model_size})...")
-    model = whisper.load_model(model_size)
-    
-    print("📝 Transcribing for word timestamps...")
-    result = model.transcribe(audio_path, word_timestamps=True)
-    
-    # Extract Whisper's words and timing
-    whisper_words = []
+    return whisper.load_model(model_size, device=device)
+
+
+def load_whisper_model(model_size="tiny", device=None):
+    """Process-wide Whisper model: loaded on first use, then reused (LRU).
+
+    The lock keeps a background warm-up and a caption job from loading the
+    same weights twice.
+    """
+    with _model_lock:
+        return _load_model_cached(model_size, device)
+
+
+def warm_up(model_size="tiny", device=None, background=True):
+    """Load a model ahead of the first caption job (e.g. at worker boot).
+
+    With background=True the load runs on a daemon thread and the call
+    returns immediately; failures are left for the real caption job to hit.
+    """
+    if not background:
+        return load_whisper_model(model_size, device)
+
+    def _load():
+        try:
+            load_whisper_model(model_size, device)
+        except Exception as e:
+            print(f"   ⚠️ Whisper warm-up failed: {e}")
+
+    thread = threading.Thread(target=_load, name="whisper-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def _whisper_words(result, offset=0.0):
+    """Flatten a transcribe() result into [{word, start, end}], shifted by offset."""
+    words = []
     for segment in result["segments"]:
         for word in segment.get("words", []):
-            whisper_words.append({
+            words.append({
                 "word": word["word"].strip(),
-                "start": word["start"] + padding_offset,
-                "end": word["end"] + padding_offset
+                "start": word["start"] + offset,
+                "end": word["end"] + offset
             })
+    return words
+
+
+def _apply_script_words(whisper_words, original_script):
+    """Swap Whisper's words for the script's, keeping (or interpolating) Whisper timing."""
+    if not original_script:
+        return whisper_words
+    script_words = original_script.split()
     
-    # If original script provided, use those words with Whisper's timing
-    if original_script:
-        script_words = original_script.split()
-        
-        # If counts match reasonably, replace words but keep timing
-        if len(script_words) > 0 and len(whisper_words) > 0:
-            # Scale timing to fit script words if counts differ
-            if len(script_words) != len(whisper_words):
-                print(f"   ⚠️ Word count mismatch: script={len(script_words)}, whisper={len(whisper_words)}")
-                # Interpolate timing for script words
-                if len(whisper_words) >= 2:
-                    total_duration = whisper_words[-1]["end"] - whisper_words[0]["start"]
-                    start_time = whisper_words[0]["start"]
-                    word_duration = total_duration / len(script_words)
-                    
-                    words = []
-                    for i, word in enumerate(script_words):
-                        words.append({
-                            "word": word,
-                            "start": start_time + (i * word_duration),
-                            "end": start_time + ((i + 1) * word_duration)
-                        })
-                    print(f"   ✅ Using script words with interpolated timing")
-                    return words
-            else:
-                # Counts match - use script words with Whisper timing
+    # If counts match reasonably, replace words but keep timing
+    if len(script_words) > 0 and len(whisper_words) > 0:
+        # Scale timing to fit script words if counts differ
+        if len(script_words) != len(whisper_words):
+            print(f"   ⚠️ Word count mismatch: script={len(script_words)}, whisper={len(whisper_words)}")
+            # Interpolate timing for script words
+            if len(whisper_words) >= 2:
+                total_duration = whisper_words[-1]["end"] - whisper_words[0]["start"]
+                start_time = whisper_words[0]["start"]
+                word_duration = total_duration / len(script_words)
+                
                 words = []
-                for i, script_word in enumerate(script_words):
+                for i, word in enumerate(script_words):
                     words.append({
-                        "word": script_word,
-                        "start": whisper_words[i]["start"],
-                        "end": whisper_words[i]["end"]
+                        "word": word,
+                        "start": start_time + (i * word_duration),
+                        "end": start_time + ((i + 1) * word_duration)
                     })
-                print(f"   ✅ Using script words with Whisper timing")
+                print(f"   ✅ Using script words with interpolated timing")
                 return words
+        else:
+            # Counts match - use script words with Whisper timing
+            words = []
+            for i, script_word in enumerate(script_words):
+                words.append({
+                    "word": script_word,
+                    "start": whisper_words[i]["start"],
+                    "end": whisper_words[i]["end"]
+                })
+            print(f"   ✅ Using script words with Whisper timing")
+            return words
     
     return whisper_words
 
 
+def get_word_timestamps(audio_path, model_size="tiny", padding_offset=0.5, original_script=None):
+    """Get word-level timestamps from audio using Whisper.
+    
+    If original_script is provided, use those words instead of Whisper's
+    transcription (which can have errors like 'Genie' -> 'G & E').
+    """
+    model = load_whisper_model(model_size)
+    
+    print("📝 Transcribing for word timestamps...")
+    result = model.transcribe(audio_path, word_timestamps=True)
+    
+    whisper_words = _whisper_words(result, padding_offset)
+    return _apply_script_words(whisper_words, original_script)
+
+
+# whisper.load_audio always resamples to 16 kHz mono float32
+SAMPLE_RATE = 16000
+# Silence between segments in the batched transcription, so words never
+# straddle a boundary and each segment starts from a clean context
+BATCH_GAP_SEC = 1.0
+
+
+def get_word_timestamps_batch(audio_paths, scripts=None, model_size="tiny", padding_offset=0.5):
+    """Word timestamps for several segment audio files in one transcription.
+
+    Each file is decoded once, the clips are concatenated with BATCH_GAP_SEC of
+    silence between them, and Whisper runs once over the whole buffer. Words
+    are split back per segment by their recorded offsets and made relative to
+    their own segment, so the result matches calling get_word_timestamps() on
+    each file: a list of word lists, in the order of audio_paths.
+    """
+    import numpy as np
+
+    audio_paths = list(audio_paths)
+    if not audio_paths:
+        return []
+    scripts = list(scripts) if scripts is not None else [None] * len(audio_paths)
+    if len(scripts) != len(audio_paths):
+        raise ValueError("scripts must match audio_paths one-to-one")
+
+    model = load_whisper_model(model_size)
+
+    gap = np.zeros(int(BATCH_GAP_SEC * SAMPLE_RATE), dtype=np.float32)
+    chunks, offsets = [], []
+    cursor = 0
+    for i, path in enumerate(audio_paths):
+        audio = whisper.load_audio(str(path))
+        if i:
+            chunks.append(gap)
+            cursor += len(gap)
+        offsets.append(cursor / SAMPLE_RATE)
+        chunks.append(audio)
+        cursor += len(audio)
+
+    print(f"📝 Transcribing {len(audio_paths)} segments in one pass for word timestamps...")
+    result = model.transcribe(np.concatenate(chunks), word_timestamps=True)
+
+    per_segment = [[] for _ in audio_paths]
+    for word in _whisper_words(result):
+        # Owner is the last segment starting at or before the word's midpoint
+        mid = (word["start"] + word["end"]) / 2
+        idx = max(0, bisect.bisect_right(offsets, mid) - 1)
+        per_segment[idx].append({
+            "word": word["word"],
+            "start": word["start"] - offsets[idx] + padding_offset,
+            "end": word["end"] - offsets[idx] + padding_offset,
+        })
+
+    return [_apply_script_words(words, script) for words, script in zip(per_segment, scripts)]
+
+
+def shift_words(per_segment_words, segment_starts):
+    """Place per-segment word lists onto one timeline (segment i starts at segment_starts[i])."""
+    timeline = []
+    for words, start in zip(per_segment_words, segment_starts):
+        timeline.extend({**w, "start": w["start"] + start, "end": w["end"] + start} for w in words)
+    return timeline
+
+
 def format_ass_time(seconds):
     """Format seconds as ASS timestamp."""
     hours = int(seconds // 3600)
@@ -194,7 +310,11 @@ def burn_synced_captions(video_path, audio_path, output_path, model_size="tiny",
     ass_path = "/tmp/synced_captions.ass"
     create_synced_ass(words, ass_path)
     
-    # Burn into video
+    return burn_ass(video_path, ass_path, output_path)
+
+
+def burn_ass(video_path, ass_path, output_path):
+    """Burn an ASS subtitle file into video (audio stream copied)."""
     print("🎬 Burning synced captions...")
     ass_escaped = ass_path.replace(':', '\\:')
     
@@ -0,0 +1,11 @@
+"""Shared setup for the scripts tests.
+
+ninja_synced_captions imports whisper at module level, and the test modules
+import it (directly or via ninja_dual_anchor) at collection time — before any
+fixture could run — so the stub is installed when this conftest loads. Only the
+module attribute has to exist; tests swap in their own model stubs.
+"""
+import sys
+import types
+
+sys.modules.setdefault("whisper", types.ModuleType("whisper"))
@@ -0,0 +1,249 @@
+"""
+Tests for ninja_background compositing against the original float64 math.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("PIL")
+
+import ninja_background  # noqa: E402
+
+ninja_background.import_deps()
+
+H, W = 160, 96
+
+
+def _avatar(seed, center=(48, 80)):
+    rng = np.random.default_rng(seed)
+    rgba = np.zeros((H, W, 4), dtype=np.uint8)
+    rgba[:, :, :3] = rng.integers(0, 256, (H, W, 3), dtype=np.uint8)
+    alpha = np.zeros((H, W), dtype=np.uint8)
+    cv2.ellipse(alpha, center, (30, 60), 0, 0, 360, 255, -1)
+    rgba[:, :, 3] = cv2.GaussianBlur(alpha, (9, 9), 0)
+    return rgba
+
+
+def _background(seed, h=H, w=W):
+    return np.random.default_rng(seed).integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+
+def _reference_composite(avatar_rgba, background_rgb, effects):
+    """The original float64 composite_frame pipeline."""
+    h, w = avatar_rgba.shape[:2]
+    alpha = avatar_rgba[:, :, 3:4].astype(float) / 255.0
+    result = avatar_rgba[:, :, :3].astype(float) * alpha + background_rgb.astype(float) * (1 - alpha)
+    if "vignette" in effects:
+        Y, X = np.ogrid[:h, :w]
+        dist = np.sqrt(((X - w / 2) / (w / 2)) ** 2 + ((Y - h / 2) / (h / 2)) ** 2)
+        result = result * (1.0 - effects["vignette_strength"] * np.clip(dist - 0.5, 0, 1) ** 2)[:, :, None]
+    mask = avatar_rgba[:, :, 3]
+    if "glow" in effects:
+        edges = cv2.GaussianBlur(cv2.dilate(cv2.Canny(mask, 50, 150), None, iterations=2), (23, 23), 0)
+        result = result + (edges.astype(float) / 255.0)[:, :, None] * np.array(effects["glow_color"]) * 0.4
+    if "ambient" in effects:
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (30, 30))
+        dilated = cv2.GaussianBlur(cv2.dilate(mask, kernel, iterations=3), (81, 81), 0)
+        spill = (dilated.astype(float) / 255.0) * (1.0 - mask.astype(float) / 255.0)
+        result = result + spill[:, :, None] * np.array(effects["ambient_color"]) * 0.15
+    return np.clip(result, 0, 255).astype(np.uint8)
+
+
+def _max_lsb(a, b):
+    return int(np.abs(a.astype(int) - b.astype(int)).max())
+
+
+@pytest.mark.parametrize("preset", ["none", "minimal", "cyberpunk", "dojo"])
+def test_composite_frame_matches_float64_within_one_lsb(preset):
+    effects = ninja_background.EFFECT_PRESETS[preset]
+    avatar, bg = _avatar(1), _background(2)
+    out = ninja_background.composite_frame(avatar, bg, effects)
+    assert out.dtype == np.uint8 and out.shape == (H, W, 3)
+    assert _max_lsb(out, _reference_composite(avatar, bg, effects)) <= 1
+
+
+def test_compositor_reuses_buffers_and_tracks_mask_changes():
+    effects = ninja_background.EFFECT_PRESETS["cyberpunk"]
+    compositor = ninja_background.FrameCompositor(effects)
+    first = compositor.composite(_avatar(1), _background(2))
+    for seed, center in [(3, (48, 80)), (4, (40, 70))]:  # same mask, then a moved one
+        avatar, bg = _avatar(seed, center), _background(seed + 10)
+        out = compositor.composite(avatar, bg)
+        assert out is first  # one output buffer for the whole video
+        assert _max_lsb(out, _reference_composite(avatar, bg, effects)) <= 1
+
+
+def test_vignette_mask_is_built_once_per_resolution():
+    ninja_background.vignette_mask.cache_clear()
+    for _ in range(3):
+        ninja_background.composite_frame(_avatar(1), _background(2), {"vignette": True, "vignette_strength": 0.3})
+    info = ninja_background.vignette_mask.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+
+def test_layered_composite_matches_float64_within_one_lsb():
+    out_h, out_w = 320, 180
+    effects = ninja_background.EFFECT_PRESETS["dojo_layered"]
+    zone = {"scale": 0.6, "x_center": 0.5, "y_center": 0.45}
+    avatar, bg = _avatar(1), _background(2, out_h, out_w)
+    fg = np.zeros((out_h, out_w, 4), dtype=np.uint8)
+    fg[:, :, :3] = _background(3, out_h, out_w)
+    fg[int(out_h * 0.75):, :, 3] = 255  # table across the bottom quarter
+
+    out = ninja_background.composite_frame_layered(avatar, bg, fg, zone, effects)
+
+    # Original float64 math
+    new_w, new_h, x0, y0 = ninja_background.avatar_placement(avatar.shape, bg.shape, zone)
+    resized = cv2.resize(avatar, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
+    ref = bg.astype(float)
+    a = resized[:, :, 3:4].astype(float) / 255.0
+    ref[y0:y0 + new_h, x0:x0 + new_w] = resized[:, :, :3] * a + ref[y0:y0 + new_h, x0:x0 + new_w] * (1 - a)
+    fa = fg[:, :, 3:4].astype(float) / 255.0
+    ref = fg[:, :, :3].astype(float) * fa + ref * (1 - fa)
+    Y, X = np.ogrid[:out_h, :out_w]
+    dist = np.sqrt(((X - out_w / 2) / (out_w / 2)) ** 2 + ((Y - out_h / 2) / (out_h / 2)) ** 2)
+    ref = ref * (1.0 - 0.25 * np.clip(dist - 0.5, 0, 1) ** 2)[:, :, None]
+    glow_mask = np.zeros((out_h, out_w), dtype=np.uint8)
+    cv2.rectangle(glow_mask, (x0, y0), (x0 + new_w, y0 + new_h), 255, -1)
+    glow_mask = cv2.GaussianBlur(glow_mask, (51, 51), 0)
+    edges = cv2.GaussianBlur(cv2.dilate(cv2.Canny(glow_mask, 50, 150), None, iterations=2), (23, 23), 0)
+    ref = ref + (edges.astype(float) / 255.0)[:, :, None] * np.array((200, 120, 50)) * 0.4
+    ref = ref * (1 + (np.array([1.05, 1.0, 0.9]) - 1) * 0.08)
+    ref = np.clip(ref, 0, 255).astype(np.uint8)
+
+    assert _max_lsb(out, ref) <= 1
+
+
+def _indexed_video(path, frames, fps):
+    """MJPG clip whose frame k is a flat gray of level 20*k."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (32, 32))
+    for k in range(frames):
+        writer.write(np.full((32, 32, 3), 20 * k, dtype=np.uint8))
+    writer.release()
+    return str(path)
+
+
+def _frame_index(rgb):
+    return int(round(rgb.mean() / 20))
+
+
+@pytest.mark.parametrize("bg_fps,out_fps,expected,rewinds", [
+    (10, 10, [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 0, 1], 1),   # same rate, loops
+    (10, 20, [0, 0, 1, 1, 2, 2, 3, 3], 0),                        # slower bg: duplicate
+    (10, 5, [0, 2, 4, 6, 8, 10, 0, 2], 1),                        # faster bg: skip
+])
+def test_background_reader_maps_timestamps_and_loops(tmp_path, bg_fps, out_fps, expected, rewinds):
+    path = _indexed_video(tmp_path / "bg.avi", 12, bg_fps)
+    reader = ninja_background.BackgroundVideoReader(path, out_fps, (16, 16))
+    got = [_frame_index(reader.read(i)) for i in range(len(expected))]
+    reader.release()
+    assert got == expected
+    assert reader.rewinds == rewinds  # only when the loop wraps
+
+
+def test_background_reader_recovers_from_overstated_frame_count(tmp_path):
+    path = _indexed_video(tmp_path / "bg.avi", 6, 10)
+    reader = ninja_background.BackgroundVideoReader(path, 10, (16, 16))
+    reader.frame_count = 9  # container metadata claiming more frames than exist
+    got = [_frame_index(reader.read(i)) for i in range(8)]
+    reader.release()
+    assert got == [0, 1, 2, 3, 4, 5, 0, 1]
+    assert reader.frame_count == 6
+
+
+def _numbered_frames(n, h=20, w=12):
+    """Frames whose pixel data encodes their index, for order checks."""
+    for k in range(n):
+        frame = np.random.default_rng(k).integers(0, 256, (h, w, 3), dtype=np.uint8)
+        frame[0, 0] = (k % 256, k // 256, 7)
+        yield frame
+
+
+@pytest.mark.parametrize("workers,queue_depth", [(1, 2), (2, 3), (3, 1)])
+def test_matting_pipeline_preserves_order_and_count(workers, queue_depth):
+    pipeline = ninja_background.MattingPipeline("luminance", workers=workers, queue_depth=queue_depth)
+    results = list(pipeline.run(_numbered_frames(17)))
+
+    assert [i for i, _ in results] == list(range(17))
+    for (i, rgba), frame in zip(results, _numbered_frames(17)):
+        assert tuple(rgba[0, 0, :3]) == (i % 256, i // 256, 7)
+        np.testing.assert_array_equal(rgba, ninja_background.remove_bg_luminance(frame))
+    assert pipeline.max_in_flight <= max(queue_depth, workers)
+    if workers > 1:
+        assert pipeline.max_in_flight >= workers  # every worker had a frame to matte
+
+
+def test_prefetch_stays_bounded_and_reraises():
+    produced = []
+
+    def source():
+        for k in range(20):
+            produced.append(k)
+            yield k
+        raise RuntimeError("decode failed")
+
+    consumed = 0
+    with pytest.raises(RuntimeError, match="decode failed"):
+        for k in ninja_background.prefetch(source(), depth=3):
+            time.sleep(0.005)
+            # queue holds 3, plus one item the reader is blocked on
+            assert len(produced) - consumed <= 3 + 2
+            consumed += 1
+    assert consumed == 20
+
+
+def _disc_frame(cx, cy, h=H, w=W):
+    frame = np.full((h, w, 3), 90, dtype=np.uint8)
+    frame[:, :, 0] += (np.arange(w)[None, :] % 7).astype(np.uint8)  # faint texture
+    cv2.circle(frame, (int(round(cx)), int(round(cy))), 18, (230, 200, 180), -1)
+    return frame
+
+
+def _threshold_matte(frame_rgb):
+    """Cheap deterministic stand-in for rembg: the bright disc is the subject."""
+    alpha = cv2.GaussianBlur(np.where(frame_rgb[:, :, 1] > 150, 255, 0).astype(np.uint8), (5, 5), 0)
+    return np.dstack([frame_rgb, alpha])
+
+
+def _iou(a, b):
+    a, b = a > 127, b > 127
+    union = (a | b).sum()
+    return 1.0 if union == 0 else (a & b).sum() / union
+
+
+def _run_masker(frames, **kw):
+    masker = ninja_background.AdaptiveMasker(_threshold_matte, **kw)
+    ious = [_iou(masker.avatar_rgba(i, f)[:, :, 3], _threshold_matte(f)[:, :, 3])
+            for i, f in enumerate(frames)]
+    return masker, ious
+
+
+def test_adaptive_mask_static_clip_recomputes_only_on_interval():
+    frames = [_disc_frame(48, 80)] * 40
+    masker, ious = _run_masker(frames, threshold=3.0, keyframe_interval=30)
+    assert masker.recomputes == 2  # frames 0 and 30
+    assert min(ious) == 1.0
+
+
+def test_adaptive_mask_tracks_moving_subject():
+    frames = [_disc_frame(48 + 7.5 * np.sin(k / 6), 80 + 15 * np.sin(k / 9)) for k in range(90)]
+    masker, ious = _run_masker(frames, threshold=3.0, keyframe_interval=30)
+    frame0_ious = [_iou(_threshold_matte(frames[0])[:, :, 3], _threshold_matte(f)[:, :, 3]) for f in frames]
+
+    assert masker.recomputes < len(frames) / 3
+    assert np.mean(ious) >= 0.97 and min(ious) >= 0.95
+    assert np.mean(ious) > np.mean(frame0_ious) + 0.3  # a single cached mask drifts badly
+
+
+def test_adaptive_mask_recomputes_on_scene_jump():
+    frames = [_disc_frame(30, 50)] * 20 + [_disc_frame(66, 120)] * 20 + [_disc_frame(48, 80)] * 20
+    masker, ious = _run_masker(frames, threshold=3.0, keyframe_interval=1000)
+    assert masker.recomputes == 3
+    assert min(ious) == 1.0
@@ -0,0 +1,139 @@
+"""
+Tests for the single-encode ffmpeg frame writer in ninja_background (needs ffmpeg + ffprobe).
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("PIL")
+if not (shutil.which("ffmpeg") and shutil.which("ffprobe")):
+    pytest.skip("ffmpeg/ffprobe not on PATH", allow_module_level=True)
+
+import ninja_background  # noqa: E402
+
+ninja_background.import_deps()
+
+
+def _probe(path):
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries",
+         "stream=codec_type,codec_name,width,height:format=duration", "-of", "json", str(path)],
+        capture_output=True, text=True, check=True,
+    )
+    info = json.loads(out.stdout)
+    return info["streams"], float(info["format"]["duration"])
+
+
+@pytest.fixture(scope="module")
+def avatar_clip(tmp_path_factory):
+    path = tmp_path_factory.mktemp("writer") / "avatar.mp4"
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-y",
+         "-f", "lavfi", "-i", "testsrc2=size=64x112:rate=30:duration=5",
+         "-f", "lavfi", "-i", "sine=frequency=440:duration=5",
+         "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+         "-c:a", "aac", "-shortest", str(path)],
+        check=True,
+    )
+    return str(path)
+
+
+def test_writer_without_audio_encodes_every_frame(tmp_path):
+    out = str(tmp_path / "frames.mp4")
+    with ninja_background.FFmpegFrameWriter(out, 32, 48, 10) as writer:
+        for k in range(20):
+            writer.write(np.full((48, 32, 3), k * 10, dtype=np.uint8))
+    streams, duration = _probe(out)
+    assert [(s["codec_type"], s["codec_name"]) for s in streams] == [("video", "h264")]
+    assert duration == pytest.approx(2.0, abs=0.15)
+
+
+def test_writer_rejects_wrong_frame_size(tmp_path):
+    writer = ninja_background.FFmpegFrameWriter(str(tmp_path / "x.mp4"), 32, 48, 10)
+    with pytest.raises(ValueError):
+        writer.write(np.zeros((48, 30, 3), dtype=np.uint8))
+    writer.proc.kill()
+    writer.proc.wait()
+
+
+def test_process_video_encodes_once_with_audio(tmp_path, avatar_clip, monkeypatch):
+    bg = str(tmp_path / "bg.png")
+    cv2.imwrite(bg, np.full((112, 64, 3), (40, 20, 10), dtype=np.uint8))
+    popens = []
+    real_popen = subprocess.Popen
+
+    def popen(cmd, *args, **kwargs):
+        popens.append(cmd)
+        return real_popen(cmd, *args, **kwargs)
+
+    with monkeypatch.context() as m:
+        m.setattr(ninja_background.subprocess, "Popen", popen)
+        m.setattr(ninja_background.subprocess, "run", lambda *a, **kw: pytest.fail("unexpected re-encode"))
+        out = ninja_background.process_video(avatar_clip, bg, str(tmp_path / "out.mp4"),
+                                             method="luminance",
+                                             effects=ninja_background.EFFECT_PRESETS["minimal"])
+
+    streams, duration = _probe(out)
+    assert [(s["codec_type"], s["codec_name"]) for s in streams] == [("video", "h264"), ("audio", "aac")]
+    assert (streams[0]["width"], streams[0]["height"]) == (64, 112)
+    assert duration == pytest.approx(5.0, abs=0.15)
+    assert len(popens) == 1 and popens[0][0] == "ffmpeg"  # one encoder process, no temp file
+
+
+def test_process_video_layered_encodes_once_with_audio(tmp_path, avatar_clip, monkeypatch):
+    scene_dir = tmp_path / "scenes" / "test"
+    scene_dir.mkdir(parents=True)
+    cv2.imwrite(str(scene_dir / "bg.png"), np.full((320, 180, 3), 60, dtype=np.uint8))
+    (scene_dir / "scene_config.json").write_text(json.dumps({
+        "layers": {"background": "bg.png"},
+        "resolution": {"width": 180, "height": 320},
+        "avatar_zone": {"scale": 0.6, "x_center": 0.5, "y_center": 0.45},
+    }))
+    monkeypatch.setattr(ninja_background, "SCENES_DIR", str(tmp_path / "scenes"))
+
+    out = ninja_background.process_video_layered(avatar_clip, "test", str(tmp_path / "scene.mp4"),
+                                                 method="luminance",
+                                                 effects=ninja_background.EFFECT_PRESETS["dojo_layered"])
+
+    streams, duration = _probe(out)
+    assert [(s["codec_type"], s["codec_name"]) for s in streams] == [("video", "h264"), ("audio", "aac")]
+    assert (streams[0]["width"], streams[0]["height"]) == (180, 320)
+    assert duration == pytest.approx(5.0, abs=0.15)
+
+
+def test_writer_failure_leaves_no_output(tmp_path):
+    out = tmp_path / "broken.mp4"
+    with pytest.raises(RuntimeError, match="boom"):
+        with ninja_background.FFmpegFrameWriter(str(out), 32, 48, 10) as writer:
+            writer.write(np.zeros((48, 32, 3), dtype=np.uint8))
+            raise RuntimeError("boom")
+    assert writer.proc.returncode is not None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_process_video_error_mid_render_leaves_no_output(tmp_path, avatar_clip, monkeypatch):
+    bg = str(tmp_path / "bg.png")
+    cv2.imwrite(bg, np.full((112, 64, 3), (40, 20, 10), dtype=np.uint8))
+    composite = ninja_background.FrameCompositor.composite
+    calls = 0
+
+    def flaky_composite(self, *args, **kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 40:
+            raise RuntimeError("compositor crashed")
+        return composite(self, *args, **kwargs)
+
+    monkeypatch.setattr(ninja_background.FrameCompositor, "composite", flaky_composite)
+    with pytest.raises(RuntimeError, match="compositor crashed"):
+        ninja_background.process_video(avatar_clip, bg, str(tmp_path / "out.mp4"), method="luminance")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["bg.png"]
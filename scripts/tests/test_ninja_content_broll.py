@@ -0,0 +1,72 @@
+"""
+Tests for single-pass B-roll assembly in ninja_content.assemble_with_broll.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+pytest.importorskip("requests")
+pytest.importorskip("keyring")
+
+import ninja_content  # noqa: E402
+
+
+class _Result:
+    def __init__(self, returncode=0, stdout=""):
+        self.returncode = returncode
+        self.stdout = stdout
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch):
+    calls = []
+    probe = {"streams": [{"width": 1080, "height": 1920, "r_frame_rate": "30/1"}],
+             "format": {"duration": "60.0"}}
+
+    def fake_run(cmd, *args, **kwargs):
+        calls.append(cmd)
+        if cmd[0] == "ffprobe":
+            return _Result(stdout=json.dumps(probe))
+        Path(cmd[-1]).write_bytes(b"mp4")
+        return _Result()
+
+    monkeypatch.setattr(ninja_content.subprocess, "run", fake_run)
+    return calls
+
+
+def test_single_encode_for_whole_timeline(tmp_path, fake_ffmpeg):
+    moments = [
+        {"timestamp": 5.0, "duration": 3.0, "clip_path": "a.mp4"},
+        {"timestamp": 20.0, "duration": 4.0, "clip_path": "b.mp4", "crop_mode": "ui_crop"},
+    ]
+    out = tmp_path / "out.mp4"
+    assert ninja_content.assemble_with_broll("avatar.mp4", moments, str(out))
+
+    ffmpeg = [c for c in fake_ffmpeg if c[0] == "ffmpeg"]
+    assert len(ffmpeg) == 1
+    assert len([c for c in fake_ffmpeg if c[0] == "ffprobe"]) == 1
+    cmd = ffmpeg[0]
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert cmd[1:8] == ["-y", "-i", "avatar.mp4", "-i", "a.mp4", "-i", "b.mp4"]
+    assert "[1:v]trim=duration=3.0,setpts=PTS-STARTPTS," in graph
+    assert "setpts=PTS+20.0/TB[b1]" in graph
+    assert "*t/4.0" in graph  # ui_crop pan runs on the clip's own clock
+    assert "[base][b0]overlay=enable='between(t,5.0,8.0)'" in graph
+    assert graph.endswith("[o0][b1]overlay=enable='between(t,20.0,24.0)':eof_action=pass[v]")
+    assert cmd[cmd.index("-map") + 1] == "[v]"
+    assert "0:a:0" in cmd
+
+
+def test_falls_back_to_segments_when_graph_fails(tmp_path, monkeypatch, fake_ffmpeg):
+    monkeypatch.setattr(ninja_content, "_assemble_with_broll_single_pass", lambda *a: False)
+    fallback = []
+    monkeypatch.setattr(ninja_content, "_assemble_with_broll_segments",
+                        lambda *a: fallback.append(a) or True)
+    assert ninja_content.assemble_with_broll("avatar.mp4", [], str(tmp_path / "out.mp4"))
+    assert len(fallback) == 1
@@ -0,0 +1,71 @@
+"""
+Tests for _detect_crop_mode against synthetic lavfi clips (needs ffmpeg + ffprobe).
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+pytest.importorskip("requests")
+pytest.importorskip("keyring")
+pytest.importorskip("numpy")
+if not (shutil.which("ffmpeg") and shutil.which("ffprobe")):
+    pytest.skip("ffmpeg/ffprobe not on PATH", allow_module_level=True)
+
+import ninja_content  # noqa: E402
+
+
+def _clip(path, source, vf=None):
+    cmd = ["ffmpeg", "-v", "error", "-y", "-f", "lavfi", "-i", f"{source}:rate=30:duration=3"]
+    if vf:
+        cmd += ["-vf", vf]
+    subprocess.run(cmd + ["-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", str(path)],
+                   check=True)
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def clips(tmp_path_factory):
+    d = tmp_path_factory.mktemp("crop")
+    return {
+        "still": _clip(d / "still.mp4", "smptebars=size=640x360"),
+        "still_letterboxed": _clip(d / "still_lb.mp4", "smptebars=size=640x270", "pad=640:360:-1:-1"),
+        "motion": _clip(d / "motion.mp4", "testsrc2=size=640x360"),
+        # Small moving picture in a big black frame: bars would dilute a whole-frame score
+        "motion_boxed": _clip(d / "motion_boxed.mp4", "testsrc2=size=160x90", "pad=640:360:-1:-1"),
+    }
+
+
+@pytest.mark.parametrize("name,expected", [
+    ("still", "ui_crop"),
+    ("still_letterboxed", "ui_crop"),
+    ("motion", "center"),
+    ("motion_boxed", "center"),
+])
+def test_detect_crop_mode(clips, name, expected):
+    assert ninja_content._detect_crop_mode(clips[name]) == expected
+
+
+def test_probe_pipes_frames_without_temp_files(clips, monkeypatch):
+    calls = []
+    real_run = subprocess.run
+
+    def spy(cmd, *args, **kwargs):
+        calls.append(cmd)
+        return real_run(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(ninja_content.subprocess, "run", spy)
+    monkeypatch.setattr(ninja_content.tempfile, "TemporaryDirectory",
+                        lambda *a, **k: pytest.fail("temp dir created"))
+    ninja_content._detect_crop_mode(clips["motion"])
+
+    assert [c[0] for c in calls] == ["ffprobe", "ffmpeg"]
+    assert calls[1][-1] == "pipe:1"
+    frames = ninja_content._probe_gray_frames(clips["motion"], 3.0)
+    assert frames.shape == (len(ninja_content.CROP_PROBE_POINTS),
+                            ninja_content.CROP_PROBE_H, ninja_content.CROP_PROBE_W)
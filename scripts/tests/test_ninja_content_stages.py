@@ -0,0 +1,153 @@
+"""
+Tests for the stage cache / --resume support in ninja_content.run_pipeline.
+"""
+
+import itertools
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+pytest.importorskip("requests")
+pytest.importorskip("keyring")
+
+import ninja_content  # noqa: E402
+
+
+class MusicFailed(RuntimeError):
+    pass
+
+
+@pytest.fixture
+def stages(tmp_path, monkeypatch):
+    """Stub every stage function; count calls and let tests fail the music stage.
+
+    Each call writes distinct bytes, like a real (non-deterministic) render would.
+    """
+    calls = Counter()
+    serial = itertools.count(1)
+    state = {"fail_music": False}
+
+    def writer(name, ret=True):
+        def stage(*args, **kwargs):
+            calls[name] += 1
+            out = {"tts": 1, "avatar": 2, "broll": 2, "captions": 2}[name]
+            Path(args[out]).write_bytes(f"{name}{next(serial)}".encode())
+            return ret
+        return stage
+
+    def identify(script_text, audio_duration, count, duration):
+        calls["moments"] += 1
+        return [{"topic": f"t{i}", "timestamp": 5.0 * i, "duration": duration} for i in range(count)]
+
+    def resolve(moments, *args):
+        for m in moments:
+            m["clip_path"] = f"{m['topic']}.mp4"
+        return moments
+
+    def music(video_path, output_path):
+        calls["music"] += 1
+        if state["fail_music"]:
+            raise MusicFailed()
+        Path(output_path).write_bytes(Path(video_path).read_bytes())
+        return output_path
+
+    monkeypatch.setattr(ninja_content, "OUTPUT_DIR", tmp_path / "output")
+    monkeypatch.setattr(ninja_content, "_pipeline_stage", lambda *a: None)
+    monkeypatch.setattr(ninja_content, "warm_caption_model", lambda: None)
+    monkeypatch.setattr(ninja_content, "get_audio_duration", lambda p: 30.0)
+    monkeypatch.setattr(ninja_content, "generate_tts", writer("tts", ret="voice.mp3"))
+    monkeypatch.setattr(ninja_content, "generate_kling_avatar_video", writer("avatar"))
+    monkeypatch.setattr(ninja_content, "identify_broll_moments", identify)
+    monkeypatch.setattr(ninja_content, "resolve_broll_clips", resolve)
+    monkeypatch.setattr(ninja_content, "assemble_with_broll", writer("broll"))
+    monkeypatch.setattr(ninja_content, "burn_captions", writer("captions"))
+    monkeypatch.setattr(ninja_content, "add_background_music", music)
+    return calls, state
+
+
+def _run(tmp_path, job_dir, **kwargs):
+    image = tmp_path / "ref.jpg"
+    if not image.exists():
+        image.write_bytes(b"jpeg")
+    params = dict(broll=True, no_captions=False, broll_count=2)
+    params.update(kwargs)
+    return ninja_content.run_pipeline("Script text.", str(image), "test", job_dir=str(job_dir), **params)
+
+
+def test_resume_after_music_failure_reruns_only_music(tmp_path, stages):
+    calls, state = stages
+    job_dir = tmp_path / "job"
+
+    state["fail_music"] = True
+    with pytest.raises(MusicFailed):
+        _run(tmp_path, job_dir)
+    assert calls == Counter(tts=1, avatar=1, moments=1, broll=1, captions=1, music=1)
+    assert (job_dir / "manifest.json").exists()
+
+    state["fail_music"] = False
+    calls.clear()
+    output = _run(tmp_path, job_dir)
+    assert calls == Counter(music=1)
+    assert Path(output).read_bytes().startswith(b"captions")
+    assert not job_dir.exists()  # removed once the final output exists
+
+
+def test_changed_broll_params_invalidate_only_downstream(tmp_path, stages):
+    calls, state = stages
+    job_dir = tmp_path / "job"
+
+    state["fail_music"] = True
+    with pytest.raises(MusicFailed):
+        _run(tmp_path, job_dir)
+
+    calls.clear()
+    with pytest.raises(MusicFailed):
+        _run(tmp_path, job_dir, broll_count=3)
+    assert calls == Counter(moments=1, broll=1, captions=1, music=1)
+
+    calls.clear()
+    with pytest.raises(MusicFailed):
+        _run(tmp_path, job_dir, broll_count=3, voice_style="calm")
+    assert calls == Counter(tts=1, avatar=1, moments=1, broll=1, captions=1, music=1)
+
+
+def test_regenerated_upstream_artifact_invalidates_downstream(tmp_path, stages):
+    calls, state = stages
+    job_dir = tmp_path / "job"
+
+    state["fail_music"] = True
+    with pytest.raises(MusicFailed):
+        _run(tmp_path, job_dir)
+    (job_dir / "lip_sync_video.mp4").unlink()
+
+    calls.clear()
+    with pytest.raises(MusicFailed):
+        _run(tmp_path, job_dir)
+    # The new avatar video differs, so nothing built from the old one is reused
+    assert calls == Counter(avatar=1, moments=1, broll=1, captions=1, music=1)
+
+
+def test_failed_run_without_job_dir_leaves_nothing_behind(tmp_path, stages, monkeypatch):
+    calls, state = stages
+    monkeypatch.setattr(ninja_content, "WORK_DIR", tmp_path / "work")
+    image = tmp_path / "ref.jpg"
+    image.write_bytes(b"jpeg")
+
+    state["fail_music"] = True
+    with pytest.raises(MusicFailed):
+        ninja_content.run_pipeline("Script text.", str(image), "test", broll=True, broll_count=2)
+    assert list((tmp_path / "work").iterdir()) == []
+
+
+def test_default_job_dir_is_unique_per_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(ninja_content, "WORK_DIR", tmp_path / "work")
+    first = ninja_content.default_job_dir("ninja_content")
+    second = ninja_content.default_job_dir("ninja_content")
+    assert first != second
+    assert first.parent == second.parent == tmp_path / "work"
+    assert first.name.startswith("ninja_content_")
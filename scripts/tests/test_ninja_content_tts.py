@@ -0,0 +1,141 @@
+"""
+Tests for the content-addressed TTS cache in ninja_content.generate_tts.
+"""
+
+import http.server
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+pytest.importorskip("requests")
+pytest.importorskip("keyring")
+
+import ninja_content  # noqa: E402
+
+
+class _StubElevenLabs(http.server.BaseHTTPRequestHandler):
+    posts = 0
+
+    def do_POST(self):
+        type(self).posts += 1
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b"ID3fake-mp3-bytes"
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def elevenlabs_stub(monkeypatch):
+    _StubElevenLabs.posts = 0
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StubElevenLabs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(ninja_content, "ELEVENLABS_API_BASE", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+    yield _StubElevenLabs
+    server.shutdown()
+
+
+@pytest.fixture
+def ffmpeg_calls(monkeypatch):
+    """Replace ffmpeg with a copy of its input so no binary is needed."""
+    calls = []
+
+    def fake_run(cmd, *args, **kwargs):
+        calls.append(cmd)
+        src = cmd[cmd.index("-i") + 1]
+        Path(cmd[-1]).write_bytes(Path(src).read_bytes() + b"|processed")
+
+        class Result:
+            returncode = 0
+        return Result()
+
+    monkeypatch.setattr(ninja_content.subprocess, "run", fake_run)
+    return calls
+
+
+def test_single_ffmpeg_pass_then_cache_hit(tmp_path, monkeypatch, elevenlabs_stub, ffmpeg_calls):
+    monkeypatch.setattr(ninja_content, "TTS_CACHE_DIR", tmp_path / "cache")
+    first = tmp_path / "first.mp3"
+    second = tmp_path / "second.mp3"
+
+    assert ninja_content.generate_tts("Hello ninjas.", str(first)) == str(first)
+    assert elevenlabs_stub.posts == 1
+    assert len(ffmpeg_calls) == 1
+    af = ffmpeg_calls[0][ffmpeg_calls[0].index("-af") + 1]
+    assert af.startswith("silenceremove=") and "adelay=500|500" in af
+    assert not Path(str(first) + ".raw.mp3").exists()
+
+    assert ninja_content.generate_tts("Hello ninjas.", str(second)) == str(second)
+    assert elevenlabs_stub.posts == 1
+    assert len(ffmpeg_calls) == 1
+    assert second.read_bytes() == first.read_bytes()
+
+
+def test_cache_key_covers_voice_settings_and_padding(tmp_path, monkeypatch, elevenlabs_stub, ffmpeg_calls):
+    monkeypatch.setattr(ninja_content, "TTS_CACHE_DIR", tmp_path / "cache")
+    out = str(tmp_path / "out.mp3")
+
+    ninja_content.generate_tts("Same text.", out)
+    ninja_content.generate_tts("Same text.", out, voice_style="calm")
+    ninja_content.generate_tts("Same text.", out, pad_start=0)
+    assert elevenlabs_stub.posts == 3
+    assert "adelay" not in ffmpeg_calls[-1][ffmpeg_calls[-1].index("-af") + 1]
+    assert len(list((tmp_path / "cache").glob("*.mp3"))) == 3
+
+
+def test_concurrent_writers_of_one_key_do_not_share_a_temp_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(ninja_content, "TTS_CACHE_DIR", tmp_path / "cache")
+    cache_path = tmp_path / "cache" / "key.mp3"
+    temps = []
+    real_replace = os.replace
+
+    def recording_replace(src, dst):
+        temps.append(src)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(ninja_content.os, "replace", recording_replace)
+    sources = []
+    for i in range(8):
+        src = tmp_path / f"audio{i}.mp3"
+        src.write_bytes(b"audio")
+        sources.append(src)
+    threads = [threading.Thread(target=ninja_content._store_tts_cache, args=(src, cache_path))
+               for src in sources]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(set(temps)) == 8
+    assert cache_path.read_bytes() == b"audio"
+    assert not list((tmp_path / "cache").glob("*.tmp"))
+
+
+def test_cache_is_pruned_by_age_then_least_recently_used(tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    cache.mkdir()
+    monkeypatch.setattr(ninja_content, "TTS_CACHE_DIR", cache)
+    monkeypatch.setattr(ninja_content, "TTS_CACHE_TTL_SEC", 3600)
+    monkeypatch.setattr(ninja_content, "TTS_CACHE_MAX_BYTES", 250)
+    now = time.time()
+    for name, age in [("expired", 7200), ("old", 300), ("recent", 200), ("newest", 100)]:
+        path = cache / f"{name}.mp3"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (now - age, now - age))
+
+    ninja_content._prune_tts_cache()
+
+    assert sorted(p.stem for p in cache.glob("*.mp3")) == ["newest", "recent"]
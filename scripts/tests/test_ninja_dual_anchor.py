@@ -0,0 +1,195 @@
+"""
+Tests for ninja_dual_anchor helpers (stubbed renders, no Kling / ffmpeg).
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+pytest.importorskip("requests")
+pytest.importorskip("keyring")
+
+import ninja_dual_anchor  # noqa: E402
+import ninja_synced_captions  # noqa: E402
+
+
+def test_turn_captions_use_one_batch_and_cumulative_offsets(tmp_path, monkeypatch):
+    batches = []
+    captured = {}
+
+    def fake_batch(paths, scripts):
+        batches.append(list(paths))
+        return [[{"word": s, "start": 0.5, "end": 0.9}] for s in scripts]
+
+    monkeypatch.setattr(ninja_synced_captions, "get_word_timestamps_batch", fake_batch)
+    monkeypatch.setattr(ninja_synced_captions, "create_synced_ass",
+                        lambda words, path, **kw: captured.setdefault("words", words))
+    monkeypatch.setattr(ninja_synced_captions, "burn_ass", lambda video, ass, out: out)
+
+    turns = [
+        {"audio_path": "t0.mp3", "text": "Ninja", "duration": 3.0},
+        {"audio_path": "t1.mp3", "text": "Glitch", "duration": 4.5},
+        {"audio_path": "t2.mp3", "text": "Outro", "duration": 2.0},
+    ]
+    out = ninja_dual_anchor.burn_turn_captions(turns, "in.mp4", "out.mp4", tmp_path)
+
+    assert out == "out.mp4"
+    assert batches == [["t0.mp3", "t1.mp3", "t2.mp3"]]
+    assert [(w["word"], w["start"]) for w in captured["words"]] == [
+        ("Ninja", 0.5), ("Glitch", 3.5), ("Outro", 8.0)]
+
+
+def test_caption_offsets_follow_probed_clip_lengths(tmp_path, monkeypatch):
+    import ninja_synced_captions
+
+    captured = {}
+    monkeypatch.setattr(ninja_synced_captions, "get_word_timestamps_batch",
+                        lambda paths, scripts: [[{"word": s, "start": 0.5, "end": 0.9}] for s in scripts])
+    monkeypatch.setattr(ninja_synced_captions, "create_synced_ass",
+                        lambda words, path, **kw: captured.setdefault("words", words))
+    monkeypatch.setattr(ninja_synced_captions, "burn_ass", lambda video, ass, out: out)
+
+    # Turn 0 was passed through untrimmed: 3.2s of video for 3.0s of audio
+    turns = [
+        {"audio_path": "t0.mp3", "text": "Ninja", "duration": 3.0, "clip_duration": 3.2},
+        {"audio_path": "t1.mp3", "text": "Glitch", "duration": 4.5, "clip_duration": 4.5},
+        {"audio_path": "t2.mp3", "text": "Outro", "duration": 2.0},
+    ]
+    ninja_dual_anchor.burn_turn_captions(turns, "in.mp4", "out.mp4", tmp_path)
+
+    assert [(w["word"], round(w["start"], 3)) for w in captured["words"]] == [
+        ("Ninja", 0.5), ("Glitch", 3.7), ("Outro", 8.2)]
+
+
+def _stub_turn_providers(monkeypatch, render_sec, fail_once=()):
+    """Sleeping TTS/render stubs; turns in fail_once fail their first render."""
+    calls = {"tts": [], "render": []}
+
+    def fake_tts(text, path, **kw):
+        calls["tts"].append(text)
+        open(path, "wb").close()
+        return path
+
+    def fake_render(i, turn, work_dir, kling_model, use_loops=True, kling_slots=None):
+        calls["render"].append(i)
+        with kling_slots.hold(1):
+            time.sleep(render_sec)
+        if i in fail_once and calls["render"].count(i) == 1:
+            return None
+        out = work_dir / f"turn_{i:02d}.mp4"
+        out.write_bytes(b"clip")
+        return str(out)
+
+    monkeypatch.setattr(ninja_dual_anchor, "setup_fal_key", lambda: True)
+    monkeypatch.setattr(ninja_dual_anchor, "generate_tts", fake_tts)
+    monkeypatch.setattr(ninja_dual_anchor, "get_audio_duration", lambda p: 1.0)
+    monkeypatch.setattr(ninja_dual_anchor, "select_angle",
+                        lambda speaker, i, total: ("angle.png", "prompt", "wide"))
+    monkeypatch.setattr(ninja_dual_anchor, "videochat_render_turn", fake_render)
+    return calls
+
+
+def _turns(n):
+    return [{"speaker": "NINJA" if i % 2 == 0 else "GLITCH", "text": f"line {i}"}
+            for i in range(n)]
+
+
+def test_turn_clips_run_bounded_by_kling_concurrency(tmp_path, monkeypatch):
+    monkeypatch.setattr(ninja_dual_anchor, "KLING_CONCURRENCY", 3)
+    render_sec = 0.3
+    _stub_turn_providers(monkeypatch, render_sec)
+
+    start = time.monotonic()
+    turns = ninja_dual_anchor.generate_turn_clips(_turns(7), tmp_path, format="videochat")
+    elapsed = time.monotonic() - start
+
+    # 7 turns through 3 Kling slots: ceil(7/3) = 3 rounds.
+    assert math.ceil(7 / 3) * render_sec <= elapsed < (math.ceil(7 / 3) + 1) * render_sec
+    assert [t["clip_path"] for t in turns] == [
+        str(tmp_path / f"turn_{i:02d}.mp4") for i in range(7)]
+
+
+def test_failed_turn_is_retried_alone(tmp_path, monkeypatch):
+    monkeypatch.setattr(ninja_dual_anchor, "TURN_RETRIES", 1)
+    calls = _stub_turn_providers(monkeypatch, 0.0, fail_once={2})
+
+    turns = ninja_dual_anchor.generate_turn_clips(_turns(4), tmp_path, format="videochat")
+
+    assert all(t["clip_path"] for t in turns)
+    assert sorted(calls["render"]) == [0, 1, 2, 2, 3]
+    assert sorted(calls["tts"]) == [f"line {i}" for i in range(4)]  # TTS not repeated
+
+
+def test_turn_left_empty_after_retries_exhausted(tmp_path, monkeypatch):
+    monkeypatch.setattr(ninja_dual_anchor, "TURN_RETRIES", 0)
+    _stub_turn_providers(monkeypatch, 0.0, fail_once={1})
+
+    turns = ninja_dual_anchor.generate_turn_clips(_turns(3), tmp_path, format="videochat")
+
+    assert [bool(t["clip_path"]) for t in turns] == [True, False, True]
+
+
+def test_masked_references_are_per_turn(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    ref = tmp_path / "ref.png"
+    Image.new("RGB", (90, 160), (200, 200, 200)).save(ref)
+
+    paths = [ninja_dual_anchor.mask_other_character(str(ref), "GLITCH", "CENTER", tmp_path, turn_index=i)
+             for i in (0, 1)]
+
+    # Parallel turns with the same angle must not share (and overwrite) one file
+    assert paths[0] != paths[1]
+    assert all(os.path.exists(p) for p in paths)
+
+
+def test_dual_render_counts_both_kling_jobs_against_the_limit(tmp_path, monkeypatch):
+    """Newsdesk turns submit speaker + listener jobs; both must hold a Kling slot."""
+    requests = pytest.importorskip("requests")
+    monkeypatch.setattr(ninja_dual_anchor, "KLING_CONCURRENCY", 3)
+    _stub_turn_providers(monkeypatch, 0.0)
+    lock = threading.Lock()
+    in_flight = {"now": 0, "max": 0, "jobs": 0}
+
+    class Handle:
+        def get(self):
+            time.sleep(0.05)
+            with lock:
+                in_flight["now"] -= 1
+            return {"video": {"url": "https://fal/video.mp4"}, "duration": 1}
+
+    def submit(model, arguments):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["jobs"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        return Handle()
+
+    fal = types.ModuleType("fal_client")
+    fal.upload = lambda data, mime: "https://fal/upload"
+    fal.submit = submit
+    monkeypatch.setitem(sys.modules, "fal_client", fal)
+    monkeypatch.setattr(requests, "get", lambda url: types.SimpleNamespace(content=b"mp4"))
+
+    ref = tmp_path / "ref.jpg"
+    ref.write_bytes(b"jpg")
+    monkeypatch.setattr(ninja_dual_anchor, "mask_other_character", lambda *a, **kw: str(ref))
+    monkeypatch.setattr(ninja_dual_anchor, "generate_silent_wav", lambda d, p: open(p, "wb").close() or p)
+
+    def composite(sp, ls, speaker, angle_key, out):
+        open(out, "wb").close()
+        return out
+
+    monkeypatch.setattr(ninja_dual_anchor, "composite_dual_render", composite)
+
+    turns = ninja_dual_anchor.generate_turn_clips(_turns(6), tmp_path, format="newsdesk")
+
+    assert all(t["clip_path"] for t in turns)
+    assert in_flight["jobs"] == 12
+    assert in_flight["max"] <= 3
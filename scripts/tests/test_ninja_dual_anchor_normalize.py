@@ -0,0 +1,111 @@
+"""
+Tests for normalize_clip's skip-reencode fast path against lavfi clips (needs ffmpeg + ffprobe).
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+pytest.importorskip("requests")
+pytest.importorskip("keyring")
+if not (shutil.which("ffmpeg") and shutil.which("ffprobe")):
+    pytest.skip("ffmpeg/ffprobe not on PATH", allow_module_level=True)
+
+import ninja_dual_anchor  # noqa: E402
+
+W, H = 180, 320
+_run = subprocess.run  # unpatched, for building fixtures
+
+
+def _clip(path, size, rate, seconds=1, rate_hz=44100, layout="stereo"):
+    _run(
+        ["ffmpeg", "-v", "error", "-y",
+         "-f", "lavfi", "-i", f"testsrc2=size={size}:rate={rate}:duration={seconds}",
+         "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate={rate_hz}:duration={seconds}",
+         "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+         "-c:a", "aac", "-ac", "2" if layout == "stereo" else "1",
+         "-shortest", str(path)],
+        check=True,
+    )
+    return str(path)
+
+
+@pytest.fixture
+def ffmpeg_calls(monkeypatch):
+    """Record every ffmpeg command normalize_clip runs."""
+    calls = []
+
+    def run(cmd, *args, **kwargs):
+        if cmd[0] == "ffmpeg":
+            calls.append(cmd)
+        return _run(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(ninja_dual_anchor.subprocess, "run", run)
+    return calls
+
+
+def test_matching_clip_is_passed_through(tmp_path, ffmpeg_calls):
+    clip = _clip(tmp_path / "match.mp4", f"{W}x{H}", 30)
+    out = ninja_dual_anchor.normalize_clip(clip, str(tmp_path / "norm.mp4"), 1.0, W, H)
+    assert out == clip
+    assert ffmpeg_calls == []
+
+
+def test_matching_clip_longer_than_turn_is_stream_copied(tmp_path, ffmpeg_calls):
+    clip = _clip(tmp_path / "long.mp4", f"{W}x{H}", 30, seconds=2)
+    out = ninja_dual_anchor.normalize_clip(clip, str(tmp_path / "norm.mp4"), 1.0, W, H)
+    assert out == str(tmp_path / "norm.mp4")
+    assert len(ffmpeg_calls) == 1 and "libx264" not in ffmpeg_calls[0]
+    assert ninja_dual_anchor.probe_streams(out)["duration"] < 1.5
+
+
+@pytest.mark.parametrize("size,rate,layout", [
+    ("160x160", 30, "stereo"),      # wrong size
+    (f"{W}x{H}", 24, "stereo"),     # wrong fps
+    (f"{W}x{H}", 30, "mono"),       # wrong audio layout
+])
+def test_mismatched_clip_is_transcoded(tmp_path, ffmpeg_calls, size, rate, layout):
+    clip = _clip(tmp_path / "odd.mp4", size, rate, layout=layout)
+    out = ninja_dual_anchor.normalize_clip(clip, str(tmp_path / "norm.mp4"), 1.0, W, H)
+    assert len(ffmpeg_calls) == 1 and "libx264" in ffmpeg_calls[0]
+    assert ninja_dual_anchor._matches_target(ninja_dual_anchor.probe_streams(out), W, H, 30)
+
+
+def test_clips_from_one_encoder_keep_passthrough(tmp_path, ffmpeg_calls):
+    clips = [_clip(tmp_path / f"{n}.mp4", f"{W}x{H}", 30) for n in "ab"]
+    normalized = ninja_dual_anchor.normalize_clips(clips, [1.0, 1.0], tmp_path, W, H)
+    assert normalized == clips
+    assert ffmpeg_calls == []
+
+
+def test_mixed_clips_are_all_reencoded_and_concat_plays_end_to_end(tmp_path):
+    clips = [
+        _clip(tmp_path / "a.mp4", f"{W}x{H}", 30),
+        _clip(tmp_path / "b.mp4", "160x160", 24, layout="mono"),
+        _clip(tmp_path / "c.mp4", f"{W}x{H}", 30),
+    ]
+    normalized = ninja_dual_anchor.normalize_clips(clips, [1.0, 1.0, 1.0], tmp_path, W, H)
+    # a and c match the layout but not b's transcode (profile, SPS/PPS), so they are re-encoded too
+    assert not set(normalized) & set(clips)
+    signatures = {ninja_dual_anchor.concat_signature(ninja_dual_anchor.probe_streams(p))
+                  for p in normalized}
+    assert len(signatures) == 1
+
+    final = ninja_dual_anchor.assemble_dual_anchor(normalized, str(tmp_path / "final.mp4"))
+    assert final
+
+    decode = subprocess.run(["ffmpeg", "-v", "error", "-i", final, "-f", "null", "-"],
+                            capture_output=True, text=True)
+    assert decode.returncode == 0 and decode.stderr == ""
+    frames = subprocess.run(
+        ["ffprobe", "-v", "error", "-count_frames", "-select_streams", "v:0",
+         "-show_entries", "stream=nb_read_frames", "-of", "json", final],
+        capture_output=True, text=True, check=True,
+    )
+    assert int(json.loads(frames.stdout)["streams"][0]["nb_read_frames"]) == 90
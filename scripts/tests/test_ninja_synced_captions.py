@@ -0,0 +1,181 @@
+"""
+Tests for the Whisper model cache and batched word timestamps in
+ninja_synced_captions.
+"""
+
+import os
+import sys
+import types
+import wave
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import ninja_synced_captions  # noqa: E402
+
+
+class FakeModel:
+    def __init__(self, name, device):
+        self.name = name
+        self.device = device
+
+    def transcribe(self, audio_path, word_timestamps=False):
+        return {"segments": [{"words": [
+            {"word": " hello", "start": 0.0, "end": 0.4},
+            {"word": " ninjas", "start": 0.5, "end": 0.9},
+        ]}]}
+
+
+@pytest.fixture
+def fake_whisper(monkeypatch):
+    loads = []
+
+    def load_model(name, device=None):
+        loads.append((name, device))
+        return FakeModel(name, device)
+
+    stub = types.SimpleNamespace(load_model=load_model)
+    monkeypatch.setattr(ninja_synced_captions, "whisper", stub)
+    ninja_synced_captions._load_model_cached.cache_clear()
+    yield loads
+    ninja_synced_captions._load_model_cached.cache_clear()
+
+
+def test_model_loaded_once_across_transcriptions(fake_whisper):
+    for i in range(10):
+        words = ninja_synced_captions.get_word_timestamps(f"seg_{i}.wav", original_script="Hello ninjas")
+        assert [w["word"] for w in words] == ["Hello", "ninjas"]
+        assert words[0]["start"] == pytest.approx(0.5)
+    assert fake_whisper == [("tiny", None)]
+
+
+def test_cache_keyed_by_model_and_device(fake_whisper):
+    a = ninja_synced_captions.load_whisper_model("tiny")
+    assert ninja_synced_captions.load_whisper_model("tiny") is a
+    b = ninja_synced_captions.load_whisper_model("tiny", device="cpu")
+    assert b is not a and b.device == "cpu"
+    assert fake_whisper == [("tiny", None), ("tiny", "cpu")]
+
+    # LRU: a third key evicts the least recently used one
+    ninja_synced_captions.load_whisper_model("base")
+    ninja_synced_captions.load_whisper_model("tiny", device="cpu")
+    ninja_synced_captions.load_whisper_model("tiny")
+    assert fake_whisper == [("tiny", None), ("tiny", "cpu"), ("base", None), ("tiny", None)]
+
+
+def test_background_warm_up_primes_cache(fake_whisper):
+    thread = ninja_synced_captions.warm_up("tiny")
+    thread.join(timeout=5)
+    ninja_synced_captions.get_word_timestamps("seg.wav")
+    assert fake_whisper == [("tiny", None)]
+
+
+# --- Batched word timestamps -------------------------------------------------
+
+SR = ninja_synced_captions.SAMPLE_RATE
+
+# Tone bursts (start, end) per segment file; each burst is one "word"
+SEGMENTS = [
+    (1.6, [(0.20, 0.50), (0.80, 1.10)]),
+    (0.9, [(0.10, 0.40)]),
+    (2.0, [(0.30, 0.60), (1.00, 1.50)]),
+]
+
+
+def _write_tone_wav(path, duration, bursts):
+    audio = np.zeros(int(duration * SR), dtype=np.float32)
+    for start, end in bursts:
+        t = np.arange(int(start * SR), int(end * SR))
+        audio[t] = 0.5 * np.sin(2 * np.pi * 440 * t / SR)
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SR)
+        w.writeframes((audio * 32767).astype("<i2").tobytes())
+
+
+def _load_audio(path, sr=SR):
+    with wave.open(str(path), "rb") as w:
+        return np.frombuffer(w.readframes(w.getnframes()), "<i2").astype(np.float32) / 32768
+
+
+class ToneModel:
+    """Transcribes tone bursts as words, using 10 ms RMS frames."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, audio, word_timestamps=False):
+        self.calls += 1
+        if isinstance(audio, str):
+            audio = _load_audio(audio)
+        hop = SR // 100
+        frames = audio[: len(audio) // hop * hop].reshape(-1, hop)
+        loud = np.sqrt((frames ** 2).mean(axis=1)) > 0.05
+        words, start = [], None
+        for i, on in enumerate(np.append(loud, False)):
+            if on and start is None:
+                start = i
+            elif not on and start is not None:
+                words.append({"word": f" w{len(words)}", "start": start / 100, "end": i / 100})
+                start = None
+        return {"segments": [{"words": words}]}
+
+
+@pytest.fixture
+def tone_whisper(monkeypatch, tmp_path):
+    model = ToneModel()
+    loads = []
+    stub = types.SimpleNamespace(
+        load_model=lambda name, device=None: loads.append(name) or model,
+        load_audio=_load_audio,
+    )
+    monkeypatch.setattr(ninja_synced_captions, "whisper", stub)
+    ninja_synced_captions._load_model_cached.cache_clear()
+    paths = []
+    for i, (duration, bursts) in enumerate(SEGMENTS):
+        path = tmp_path / f"seg_{i}.wav"
+        _write_tone_wav(path, duration, bursts)
+        paths.append(str(path))
+    yield model, loads, paths
+    ninja_synced_captions._load_model_cached.cache_clear()
+
+
+def test_batch_offsets_match_per_segment_timing(tone_whisper):
+    model, loads, paths = tone_whisper
+    batch = ninja_synced_captions.get_word_timestamps_batch(paths, padding_offset=0.5)
+    assert model.calls == 1
+
+    for words, (_, bursts) in zip(batch, SEGMENTS):
+        assert len(words) == len(bursts)
+        for w, (start, end) in zip(words, bursts):
+            assert w["start"] == pytest.approx(start + 0.5, abs=0.011)
+            assert w["end"] == pytest.approx(end + 0.5, abs=0.011)
+
+    single = [ninja_synced_captions.get_word_timestamps(p) for p in paths]
+    for b, s in zip(batch, single):
+        assert [t for w in b for t in (w["start"], w["end"])] == pytest.approx(
+            [t for w in s for t in (w["start"], w["end"])], abs=0.011)
+    assert loads == ["tiny"]
+
+
+def test_batch_applies_script_words_per_segment(tone_whisper):
+    _, _, paths = tone_whisper
+    batch = ninja_synced_captions.get_word_timestamps_batch(
+        paths, ["Hello ninjas", "Dojo", "Stay sharp"], padding_offset=0)
+    assert [[w["word"] for w in words] for words in batch] == [
+        ["Hello", "ninjas"], ["Dojo"], ["Stay", "sharp"]]
+
+
+def test_batch_rejects_mismatched_scripts(tone_whisper):
+    _, _, paths = tone_whisper
+    with pytest.raises(ValueError):
+        ninja_synced_captions.get_word_timestamps_batch(paths, ["only one"])
+
+
+def test_shift_words_places_segments_on_timeline():
+    per_segment = [[{"word": "a", "start": 0.1, "end": 0.2}], [{"word": "b", "start": 0.0, "end": 0.5}]]
+    words = ninja_synced_captions.shift_words(per_segment, [0.0, 3.5])
+    assert [(w["word"], w["start"], w["end"]) for w in words] == [("a", 0.1, 0.2), ("b", 3.5, 4.0)]